@@ -0,0 +1,54 @@
+import argparse
+import os
+import tempfile
+import time
+from typing import Dict
+
+from src.watcher.main import NodeHealthWatcher
+
+
+def legacy_scan(states: Dict[str, str]) -> str:
+    nodes_down_current = sorted(name for name, status in states.items() if status != "True")
+    table_lines = ["node\tready_status"] + [f"{name}\t{states.get(name, 'Unknown')}" for name in sorted(states)]
+    return ",".join(nodes_down_current) + "\n".join(table_lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-flush cost of build_payload with the maintained node index.")
+    parser.add_argument("--nodes", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--flushes", type=int, default=50)
+    parser.add_argument("--min-speedup", type=float, default=4.0, help="Fail if a flush is not this much faster than a scan.")
+    parser.add_argument("--assert-from-nodes", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.environ["INCIDENT_LOG_PATH"] = os.path.join(tmpdir, "incidents.ndjson")
+        for nodes in args.nodes:
+            watcher = NodeHealthWatcher()
+            watcher.node_states = {f"node-{index:06d}": "False" if index % 100 == 0 else "True" for index in range(nodes)}
+
+            # The first flush renders every nodes_table block once, like the old per-flush scan.
+            watcher.build_payload()
+            started = time.perf_counter()
+            for flush in range(args.flushes):
+                name = f"node-{(flush * 7919) % nodes:06d}"
+                watcher.apply_node_status(name, "False" if watcher.state.get(name) == "True" else "True")
+                watcher.build_payload()
+                watcher.state.clear_pending()
+            indexed = (time.perf_counter() - started) / args.flushes
+
+            started = time.perf_counter()
+            states = watcher.node_states
+            for _ in range(args.flushes):
+                legacy_scan(states)
+            scan = (time.perf_counter() - started) / args.flushes
+
+            print(f"nodes={nodes:<7} indexed_ms_per_flush={indexed * 1000:>8.3f} full_scan_ms_per_flush={scan * 1000:>8.3f}")
+            if nodes >= args.assert_from_nodes:
+                assert indexed * args.min_speedup <= scan, (
+                    f"build_payload at {nodes} nodes is less than {args.min_speedup}x faster than a full scan"
+                )
+
+
+if __name__ == "__main__":
+    main()
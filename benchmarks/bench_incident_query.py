@@ -0,0 +1,52 @@
+import argparse
+import json
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from src.watcher.incidents import IncidentLogWriter, iter_records
+
+
+def full_scan(path: Path, since: str, until: str) -> int:
+    matched = 0
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            if since <= json.loads(line)["datetime"] <= until:
+                matched += 1
+    return matched
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time-range query with the sparse index versus parsing every line.")
+    parser.add_argument("--records", type=int, default=500_000)
+    parser.add_argument("--window-records", type=int, default=1_000)
+    args = parser.parse_args()
+
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    stamps = [(start + timedelta(minutes=index)).strftime("%Y-%m-%dT%H:%M:%SZ") for index in range(args.records)]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "incidents.ndjson"
+        writer = IncidentLogWriter(path, batch_records=1000, fsync_policy="none")
+        writer.write_many(
+            {"datetime": stamp, "error_code": "NODE_NOT_READY", "log_message": "Nodes down: node-a", "recovery_status": "open"}
+            for stamp in stamps
+        )
+        writer.close()
+
+        middle = args.records // 2
+        since, until = stamps[middle], stamps[middle + args.window_records - 1]
+
+        started = time.perf_counter()
+        scanned = full_scan(path, since, until)
+        scan_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        indexed = sum(1 for _ in iter_records(path, since=since, until=until))
+        indexed_seconds = time.perf_counter() - started
+
+        print(f"records={args.records} matched={indexed}/{scanned} full_scan_s={scan_seconds:.3f} indexed_s={indexed_seconds:.4f}")
+
+
+if __name__ == "__main__":
+    main()
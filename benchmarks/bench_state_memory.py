@@ -0,0 +1,77 @@
+import argparse
+import tracemalloc
+from bisect import insort
+from typing import Callable, Dict, List, Set
+
+from src.watcher.state import NodeStateStore
+
+
+def dict_and_sets(nodes: int) -> object:
+    states: Dict[str, str] = {}
+    pending_down: Set[str] = set()
+    for index in range(nodes):
+        name = f"node-{index:06d}"
+        states[name] = "False" if index % 50 == 0 else "True"
+        if index % 50 == 0:
+            pending_down.add(name)
+    return states, pending_down
+
+
+def dict_sets_and_indexes(nodes: int) -> object:
+    # The dict/set state plus the sorted name, nodes_table row and down indexes build_payload relies on.
+    states: Dict[str, str] = {}
+    pending_down: Set[str] = set()
+    sorted_names: List[str] = []
+    table_rows: List[str] = []
+    down_names: List[str] = []
+    for index in range(nodes):
+        name = f"node-{index:06d}"
+        status = "False" if index % 50 == 0 else "True"
+        states[name] = status
+        sorted_names.append(name)
+        table_rows.append(f"{name}\t{status}")
+        if index % 50 == 0:
+            pending_down.add(name)
+            insort(down_names, name)
+    return states, pending_down, sorted_names, table_rows, down_names
+
+
+def store(nodes: int) -> object:
+    state = NodeStateStore()
+    for index in range(nodes):
+        name = f"node-{index:06d}"
+        state.set(name, "False" if index % 50 == 0 else "True")
+        if index % 50 == 0:
+            state.mark_down(name)
+    # The cached nodes_table blocks are part of what the store keeps between flushes.
+    state.nodes_table()
+    return state
+
+
+def measure(build: Callable[[int], object], nodes: int) -> int:
+    tracemalloc.start()
+    kept = build(nodes)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-node memory of the dict/set state versus NodeStateStore, which trades memory for flat flush cost.")
+    parser.add_argument("--nodes", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    for nodes in args.nodes:
+        legacy = measure(dict_and_sets, nodes)
+        indexed = measure(dict_sets_and_indexes, nodes)
+        compact = measure(store, nodes)
+        print(
+            f"nodes={nodes:<7} dict_sets_bytes_per_node={legacy / nodes:>7.1f} "
+            f"dict_sets_indexes_bytes_per_node={indexed / nodes:>7.1f} "
+            f"store_bytes_per_node={compact / nodes:>7.1f} store_vs_dict_sets={compact / legacy - 1:>+7.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from src.watcher.main import NodeHealthWatcher
+
+
+def simulate(nodes: int, storm_threshold: int) -> float:
+    os.environ["STORM_THRESHOLD"] = str(storm_threshold)
+    try:
+        watcher = NodeHealthWatcher()
+    finally:
+        os.environ.pop("STORM_THRESHOLD")
+    names = [f"node-{index:05d}" for index in range(nodes)]
+    watcher.node_states = {name: "True" for name in names}
+
+    started = time.process_time()
+    for name in names:
+        watcher.apply_node_status(name, "False")
+    watcher.flush_if_due(force=True)
+    return time.process_time() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulate N simultaneous NotReady transitions.")
+    parser.add_argument("--nodes", type=int, nargs="+", default=[100, 500, 2000])
+    args = parser.parse_args()
+
+    logger = logging.getLogger("node-health-watcher")
+    logger.addHandler(logging.NullHandler())
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.environ["INCIDENT_LOG_PATH"] = os.path.join(tmpdir, "incidents.ndjson")
+        for nodes in args.nodes:
+            full_lists = simulate(nodes, storm_threshold=nodes + 1)
+            storm = simulate(nodes, storm_threshold=50)
+            print(
+                f"nodes={nodes:<6} full_lists_cpu_ms={full_lists * 1000:>9.1f} storm_mode_cpu_ms={storm * 1000:>9.1f} "
+                f"per_event_us full={full_lists / nodes * 1e6:>8.1f} storm={storm / nodes * 1e6:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
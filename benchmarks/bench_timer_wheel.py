@@ -0,0 +1,90 @@
+import argparse
+import heapq
+import random
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+from src.watcher.timers import TimerWheel
+
+Scheduler = Any
+
+
+class HeapScheduler:
+    """Reference scheduler: a heap with lazy deletion keyed by a per-key generation."""
+
+    def __init__(self) -> None:
+        self.heap: List[Tuple[float, int, Hashable]] = []
+        self.generations: Dict[Hashable, int] = {}
+        self.callbacks: Dict[Hashable, Callable[[Hashable], None]] = {}
+        self.counter = 0
+
+    def schedule(self, key: Hashable, delay_seconds: float, callback: Callable[[Hashable], None]) -> None:
+        self.counter += 1
+        self.generations[key] = self.counter
+        self.callbacks[key] = callback
+        heapq.heappush(self.heap, (time.monotonic() + delay_seconds, self.counter, key))
+
+    def cancel(self, key: Hashable) -> bool:
+        self.callbacks.pop(key, None)
+        return self.generations.pop(key, None) is not None
+
+    def advance(self, now: float) -> List[Tuple[Callable[[Hashable], None], Hashable]]:
+        expired = []
+        while self.heap and self.heap[0][0] <= now:
+            _, generation, key = heapq.heappop(self.heap)
+            if self.generations.get(key) == generation:
+                del self.generations[key]
+                expired.append((self.callbacks.pop(key), key))
+        return expired
+
+
+def fill(scheduler: Scheduler, timers: int, renewals: int, delays: List[float], callback: Callable[[Hashable], None]) -> None:
+    for index in range(timers):
+        scheduler.schedule(("lease", index), delays[index], callback)
+    # Lease renewals: each one pushes an existing deadline back (cancel + insert).
+    for step in range(renewals):
+        index = (step * 7919) % timers
+        scheduler.schedule(("lease", index), delays[index] + 40, callback)
+
+
+def run(factory: Callable[[], Scheduler], timers: int, renewals: int, delays: List[float]) -> Tuple[float, float, float, int]:
+    fired: List[Hashable] = []
+    scheduler = factory()
+    started = time.perf_counter()
+    fill(scheduler, timers, renewals, delays, fired.append)
+    schedule_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    base = time.monotonic()
+    for second in range(200):
+        for callback, key in scheduler.advance(base + second):
+            callback(key)
+    drain_seconds = time.perf_counter() - started
+
+    tracemalloc.start()
+    fill(factory(), timers, renewals, delays, fired.append)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return schedule_seconds, drain_seconds, peak, len(fired)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Hashed timer wheel versus a heapq scheduler for per-node timers.")
+    parser.add_argument("--timers", type=int, default=100_000)
+    parser.add_argument("--renewals", type=int, default=500_000)
+    args = parser.parse_args()
+
+    random.seed(7)
+    delays = [random.uniform(1, 120) for _ in range(args.timers)]
+    for name, factory in (("wheel", lambda: TimerWheel(tick_seconds=0.5)), ("heapq", HeapScheduler)):
+        insert, advance, peak, fired = run(factory, args.timers, args.renewals, delays)
+        operations = args.timers + args.renewals
+        print(
+            f"{name:<6} schedule_us={insert / operations * 1e6:>6.2f} drain_s={advance:>6.3f} "
+            f"peak_bytes_per_timer={peak / args.timers:>7.1f} fired={fired}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import argparse
+import json
+import time
+from typing import Callable, Dict, List
+
+from kubernetes import watch
+
+from src.watcher.main import NodeHealthWatcher
+
+
+def synthetic_node(index: int, images: int) -> Dict[str, object]:
+    return {
+        "kind": "Node",
+        "apiVersion": "v1",
+        "metadata": {
+            "name": f"gpu-node-{index:05d}",
+            "resourceVersion": str(1000 + index),
+            "labels": {
+                "kubernetes.io/hostname": f"gpu-node-{index:05d}",
+                "topology.kubernetes.io/zone": f"zone-{index % 3}",
+                "node.kubernetes.io/instance-type": "gpu.8x",
+            },
+        },
+        "status": {
+            "addresses": [
+                {"type": "InternalIP", "address": f"10.0.{index // 256}.{index % 256}"},
+                {"type": "Hostname", "address": f"gpu-node-{index:05d}"},
+            ],
+            "capacity": {"cpu": "96", "memory": "792Gi", "nvidia.com/gpu": "8", "pods": "110"},
+            "allocatable": {"cpu": "95", "memory": "780Gi", "nvidia.com/gpu": "8", "pods": "110"},
+            "conditions": [
+                {
+                    "type": condition,
+                    "status": "True" if condition == "Ready" else "False",
+                    "reason": f"Kubelet{condition}",
+                    "message": f"kubelet reports {condition}",
+                    "lastHeartbeatTime": "2026-02-12T08:00:00Z",
+                    "lastTransitionTime": "2026-02-12T07:00:00Z",
+                }
+                for condition in ("MemoryPressure", "DiskPressure", "PIDPressure", "Ready")
+            ],
+            "images": [
+                {
+                    "names": [
+                        f"registry.example.com/ml/training-image-{image}@sha256:{image:064x}",
+                        f"registry.example.com/ml/training-image-{image}:v{image}.0.0",
+                    ],
+                    "sizeBytes": 5_000_000_000 + image,
+                }
+                for image in range(images)
+            ],
+        },
+    }
+
+
+def watch_lines(count: int, images: int) -> List[str]:
+    return [json.dumps({"type": "MODIFIED", "object": synthetic_node(index, images)}) for index in range(count)]
+
+
+def decode_model(lines: List[str]) -> None:
+    decoder = watch.Watch()
+    for line in lines:
+        event = decoder.unmarshal_event(line, "V1Node")
+        node = event["object"]
+        node.metadata.name
+        NodeHealthWatcher.ready_status(node)
+
+
+def decode_raw(lines: List[str]) -> None:
+    for line in lines:
+        event = json.loads(line)
+        raw_object = event["object"]
+        raw_object["metadata"]["name"]
+        raw_object["metadata"]["resourceVersion"]
+        NodeHealthWatcher.raw_ready_status(raw_object)
+
+
+def measure(name: str, decode: Callable[[List[str]], None], lines: List[str]) -> None:
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    decode(lines)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    print(
+        f"{name:<6} events={len(lines):<6} events_per_sec={len(lines) / wall:>10.1f} "
+        f"cpu_us_per_event={cpu / len(lines) * 1e6:>10.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare V1Node model decoding with the raw JSON watch path.")
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--images", type=int, default=150, help="container images per node (~250 bytes each)")
+    args = parser.parse_args()
+
+    lines = watch_lines(args.events, args.images)
+    average_kb = sum(len(line) for line in lines) / len(lines) / 1024
+    print(f"average event size: {average_kb:.1f} KB")
+    measure("model", decode_model, lines)
+    measure("raw", decode_raw, lines)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+import argparse
+import json
+import math
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+from src.watcher.incidents import normalize_timestamp, read_segment_records, segments_for_window
+
+# MTTR histogram buckets grow by 5%, so percentiles are within ~2.5% of the exact value.
+BUCKET_GROWTH = 1.05
+PERCENTILES = (50, 90, 99)
+LEGACY_SUMMARY = re.compile(r"^Node (incident|recovery) in (?P<cluster>.*?): (?P<nodes>.*)$")
+
+NodeEvent = Tuple[str, str, float, bool]
+
+
+def parse_time(stamp: str) -> float:
+    return datetime.fromisoformat(stamp.replace("Z", "+00:00")).timestamp()
+
+
+def duration_bucket(seconds: float) -> int:
+    return 0 if seconds < 1 else 1 + int(math.log(seconds) / math.log(BUCKET_GROWTH))
+
+
+def bucket_seconds(bucket: int) -> float:
+    return 0.0 if bucket == 0 else BUCKET_GROWTH ** (bucket - 0.5)
+
+
+def record_events(record: Dict[str, Any]) -> Iterator[NodeEvent]:
+    """Yield ``(cluster, node, timestamp, down)`` for every node a record reports.
+
+    Records written before ``nodes_down``/``nodes_recovered`` existed are read
+    from ``log_message``; their mixed flushes carry no node list and are skipped.
+    """
+    stamp = record.get("datetime")
+    if not stamp:
+        return
+    at = parse_time(stamp)
+    if "nodes_down" in record or "nodes_recovered" in record:
+        cluster = record.get("cluster", "")
+        for node in record.get("nodes_recovered") or []:
+            yield cluster, node, at, False
+        for node in record.get("nodes_down") or []:
+            yield cluster, node, at, True
+        return
+    match = LEGACY_SUMMARY.match(record.get("log_message", ""))
+    if match is None:
+        return
+    down = record.get("recovery_status") == "open"
+    for node in match.group("nodes").split(","):
+        if node:
+            yield match.group("cluster"), node, at, down
+
+
+class RepairStats:
+    """Mergeable downtime totals and a sparse log-bucket histogram of repair times."""
+
+    __slots__ = ("count", "downtime", "longest", "buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.downtime = 0.0
+        self.longest = 0.0
+        self.buckets: Dict[int, int] = {}
+
+    def add(self, seconds: float) -> None:
+        seconds = max(seconds, 0.0)
+        self.count += 1
+        self.downtime += seconds
+        self.longest = max(self.longest, seconds)
+        bucket = duration_bucket(seconds)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def merge(self, other: "RepairStats") -> None:
+        self.count += other.count
+        self.downtime += other.downtime
+        self.longest = max(self.longest, other.longest)
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+
+    def percentile(self, percent: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = math.ceil(self.count * percent / 100)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return round(min(bucket_seconds(bucket), self.longest), 3)
+        return round(self.longest, 3)
+
+
+class SegmentNode:
+    """One node's transitions within a segment, reduced to what stitching needs.
+
+    ``leading_down`` is the first down before ``first_up``; everything after
+    ``first_up`` is already folded into ``repairs`` and ``trailing_down``. How
+    the prefix is counted depends on whether the node was already down when
+    the segment started, which only the merge step knows.
+    """
+
+    __slots__ = ("leading_down", "first_up", "repairs", "trailing_down", "incidents")
+
+    def __init__(self) -> None:
+        self.leading_down: Optional[float] = None
+        self.first_up: Optional[float] = None
+        self.repairs = RepairStats()
+        self.trailing_down: Optional[float] = None
+        self.incidents = 0
+
+    def observe(self, at: float, down: bool) -> None:
+        if self.first_up is None:
+            if down:
+                if self.leading_down is None:
+                    self.leading_down = at
+                    self.incidents += 1
+            else:
+                self.first_up = at
+        elif down:
+            if self.trailing_down is None:
+                self.trailing_down = at
+                self.incidents += 1
+        elif self.trailing_down is not None:
+            self.repairs.add(at - self.trailing_down)
+            self.trailing_down = None
+
+
+class SegmentSummary:
+    def __init__(self) -> None:
+        self.nodes: Dict[Tuple[str, str], SegmentNode] = {}
+        self.first_at: Optional[float] = None
+        self.last_at: Optional[float] = None
+        self.records = 0
+        self.skipped = 0
+
+    def observe(self, record: Dict[str, Any]) -> None:
+        self.records += 1
+        events = list(record_events(record))
+        if not events:
+            self.skipped += 1
+            return
+        for cluster, node, at, down in events:
+            self.first_at = at if self.first_at is None else min(self.first_at, at)
+            self.last_at = at if self.last_at is None else max(self.last_at, at)
+            key = (cluster, node)
+            summary = self.nodes.get(key)
+            if summary is None:
+                summary = self.nodes[key] = SegmentNode()
+            summary.observe(at, down)
+
+
+def summarize_records(records: Iterable[Dict[str, Any]]) -> SegmentSummary:
+    summary = SegmentSummary()
+    for record in records:
+        summary.observe(record)
+    return summary
+
+
+def summarize_segment(segment: str, since: Optional[str] = None, until: Optional[str] = None) -> SegmentSummary:
+    return summarize_records(read_segment_records(Path(segment), since, until))
+
+
+class NodeAvailability:
+    __slots__ = ("repairs", "incidents", "down_since", "orphan_recoveries", "down_before_window_until")
+
+    def __init__(self) -> None:
+        self.repairs = RepairStats()
+        self.incidents = 0
+        self.down_since: Optional[float] = None
+        self.orphan_recoveries = 0
+        # A first event that is a recovery means the node was already down when the window started.
+        self.down_before_window_until: Optional[float] = None
+
+
+class AvailabilityAggregator:
+    """Stitches per-segment summaries, in time order, into per-node incident history.
+
+    State is one ``NodeAvailability`` per node regardless of how many records
+    are read, so a year of history aggregates in the same memory as a day.
+    """
+
+    def __init__(self) -> None:
+        self.nodes: Dict[Tuple[str, str], NodeAvailability] = {}
+        self.first_at: Optional[float] = None
+        self.last_at: Optional[float] = None
+        self.records = 0
+        self.skipped = 0
+
+    def add_records(self, records: Iterable[Dict[str, Any]]) -> None:
+        self.merge(summarize_records(records))
+
+    def merge(self, summary: SegmentSummary) -> None:
+        self.records += summary.records
+        self.skipped += summary.skipped
+        if summary.first_at is not None:
+            self.first_at = summary.first_at if self.first_at is None else min(self.first_at, summary.first_at)
+        if summary.last_at is not None:
+            self.last_at = summary.last_at if self.last_at is None else max(self.last_at, summary.last_at)
+
+        for key, part in summary.nodes.items():
+            node = self.nodes.get(key)
+            first_seen = node is None
+            if node is None:
+                node = self.nodes[key] = NodeAvailability()
+
+            if node.down_since is not None:
+                # Downs before the first recovery repeat an incident opened in an earlier segment.
+                part_incidents = part.incidents - (1 if part.leading_down is not None else 0)
+                opened_at: Optional[float] = node.down_since
+            else:
+                part_incidents = part.incidents
+                opened_at = part.leading_down
+            node.incidents += part_incidents
+
+            if part.first_up is None:
+                node.down_since = opened_at
+                continue
+            if opened_at is not None:
+                node.repairs.add(part.first_up - opened_at)
+            else:
+                node.orphan_recoveries += 1
+                if first_seen:
+                    node.down_before_window_until = part.first_up
+            node.repairs.merge(part.repairs)
+            node.down_since = part.trailing_down
+
+    def report(
+        self,
+        window_start: Optional[float] = None,
+        window_end: Optional[float] = None,
+        fleet_sizes: Optional[Dict[str, int]] = None,
+    ) -> Dict[str, Any]:
+        """Per-node and per-cluster totals over the window.
+
+        The log only names nodes that had incidents, so cluster availability
+        needs the real node count from ``fleet_sizes`` (cluster -> nodes, with
+        ``""`` for any cluster not listed) and is ``None`` without it.
+        """
+        fleet_sizes = fleet_sizes or {}
+        start = window_start if window_start is not None else self.first_at
+        end = window_end if window_end is not None else self.last_at
+        window = max((end or 0.0) - (start or 0.0), 0.0)
+
+        clusters: Dict[str, Dict[str, Any]] = {}
+        cluster_repairs: Dict[str, RepairStats] = {}
+        for (cluster_name, node_name), node in sorted(self.nodes.items()):
+            open_downtime = max((end or 0.0) - node.down_since, 0.0) if node.down_since is not None else 0.0
+            if node.down_before_window_until is not None:
+                open_downtime += max(node.down_before_window_until - (start or 0.0), 0.0)
+            downtime = node.repairs.downtime + open_downtime
+            cluster = clusters.setdefault(
+                cluster_name, {"nodes": {}, "incidents": 0, "open_incidents": 0, "downtime_seconds": 0.0}
+            )
+            cluster["nodes"][node_name] = {
+                "incidents": node.incidents,
+                "repairs": node.repairs.count,
+                "open": node.down_since is not None,
+                "orphan_recoveries": node.orphan_recoveries,
+                "downtime_seconds": round(downtime, 3),
+                "availability": availability(downtime, window),
+                "mttr_seconds": round(node.repairs.downtime / node.repairs.count, 3) if node.repairs.count else None,
+                "longest_repair_seconds": round(node.repairs.longest, 3),
+            }
+            cluster["incidents"] += node.incidents
+            cluster["open_incidents"] += 1 if node.down_since is not None else 0
+            cluster["downtime_seconds"] += downtime
+            cluster_repairs.setdefault(cluster_name, RepairStats()).merge(node.repairs)
+
+        for cluster_name, cluster in clusters.items():
+            repairs = cluster_repairs[cluster_name]
+            fleet_size = fleet_sizes.get(cluster_name, fleet_sizes.get(""))
+            cluster["fleet_size"] = fleet_size
+            cluster["availability"] = availability(cluster["downtime_seconds"], window * fleet_size) if fleet_size else None
+            cluster["downtime_seconds"] = round(cluster["downtime_seconds"], 3)
+            cluster["repairs"] = repairs.count
+            cluster["mttr_seconds"] = round(repairs.downtime / repairs.count, 3) if repairs.count else None
+            for percent in PERCENTILES:
+                cluster[f"mttr_p{percent}_seconds"] = repairs.percentile(percent)
+
+        return {
+            "window_start": start,
+            "window_end": end,
+            "window_seconds": round(window, 3),
+            "records": self.records,
+            "records_without_nodes": self.skipped,
+            "clusters": clusters,
+        }
+
+
+def availability(downtime: float, window: float) -> Optional[float]:
+    if window <= 0:
+        return None
+    return round(max(1.0 - downtime / window, 0.0), 6)
+
+
+def parse_fleet_size(value: str) -> Tuple[str, int]:
+    cluster, _, nodes = value.rpartition("=")
+    try:
+        count = int(nodes)
+    except ValueError:
+        count = 0
+    if count <= 0:
+        raise argparse.ArgumentTypeError(f"fleet size must be [CLUSTER=]NODES with NODES > 0, got {value!r}")
+    return cluster, count
+
+
+def aggregate(
+    path: Path, since: Optional[str] = None, until: Optional[str] = None, workers: int = 1
+) -> AvailabilityAggregator:
+    """Summarize every segment overlapping the window, ``workers`` at a time, and stitch them in order."""
+    segments = [str(segment) for segment in segments_for_window(path, since, until)]
+    aggregator = AvailabilityAggregator()
+    if workers <= 1 or len(segments) <= 1:
+        for segment in segments:
+            aggregator.merge(summarize_segment(segment, since, until))
+        return aggregator
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        count = len(segments)
+        for summary in pool.map(summarize_segment, segments, [since] * count, [until] * count):
+            aggregator.merge(summary)
+    return aggregator
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.watcher.availability", description="Per-node and per-cluster availability and MTTR."
+    )
+    parser.add_argument(
+        "--path",
+        type=Path,
+        default=Path(os.getenv("INCIDENT_LOG_PATH", "/var/lib/node-health-watcher/incidents.ndjson").strip()),
+    )
+    parser.add_argument("--since", type=normalize_timestamp, help="Window start (ISO-8601, UTC if no offset).")
+    parser.add_argument("--until", type=normalize_timestamp, help="Window end (ISO-8601, UTC if no offset).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--fleet-size",
+        type=parse_fleet_size,
+        action="append",
+        default=[],
+        metavar="[CLUSTER=]NODES",
+        help="Node count for cluster availability, per cluster or for all; without it only per-node availability is reported.",
+    )
+    args = parser.parse_args(argv)
+
+    aggregator = aggregate(args.path, since=args.since, until=args.until, workers=args.workers)
+    report = aggregator.report(
+        window_start=parse_time(args.since) if args.since else None,
+        window_end=parse_time(args.until) if args.until else None,
+        fleet_sizes=dict(args.fleet_size),
+    )
+    json.dump(report, sys.stdout, indent=2, sort_keys=True)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+CHECKPOINT_VERSION = 1
+
+
+def write_checkpoint(path: Path, checkpoint: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as handle:
+        json.dump({"version": CHECKPOINT_VERSION, **checkpoint}, handle, separators=(",", ":"))
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
+
+    # Persist the rename itself, not just the file contents.
+    dir_fd = os.open(path.parent, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def read_checkpoint(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with path.open("r", encoding="utf-8") as handle:
+            checkpoint = json.load(handle)
+    except FileNotFoundError:
+        return None
+
+    if not isinstance(checkpoint, dict) or checkpoint.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"unsupported checkpoint version in {path}")
+    if len(checkpoint.get("names", [])) != len(checkpoint.get("statuses", "")):
+        raise ValueError(f"checkpoint {path} has mismatched names and statuses")
+    return checkpoint
@@ -0,0 +1,86 @@
+import math
+from array import array
+from typing import Tuple
+
+from src.watcher.state import Bitset
+
+
+class FlapDamper:
+    """Route-flap damping (RFC 2439 style) per interned node ID.
+
+    Every transition adds ``penalty`` to the node's figure of merit, which
+    decays exponentially with ``half_life_seconds``. Crossing
+    ``suppress_threshold`` suppresses the node until the figure decays below
+    ``reuse_threshold``; the figure is capped so no node stays suppressed
+    longer than ``max_suppress_seconds`` after its last flap. State is two
+    ``array('d')`` slots and one bit per node.
+    """
+
+    def __init__(
+        self,
+        penalty: float = 1000.0,
+        half_life_seconds: float = 300.0,
+        suppress_threshold: float = 3000.0,
+        reuse_threshold: float = 750.0,
+        max_suppress_seconds: float = 3600.0,
+    ) -> None:
+        if not 0 < reuse_threshold < suppress_threshold or penalty <= 0 or half_life_seconds <= 0:
+            raise ValueError("flap damping needs penalty > 0, half_life > 0 and 0 < reuse < suppress")
+        self.penalty = penalty
+        self.half_life_seconds = half_life_seconds
+        self.suppress_threshold = suppress_threshold
+        self.reuse_threshold = reuse_threshold
+        self.decay_rate = math.log(2) / half_life_seconds
+        self.ceiling = max(reuse_threshold * 2 ** (max_suppress_seconds / half_life_seconds), suppress_threshold)
+
+        self.penalties = array("d")
+        self.updated_at = array("d")
+        self.suppressed = Bitset()
+
+    def _grow(self, node_id: int) -> None:
+        missing = node_id + 1 - len(self.penalties)
+        if missing > 0:
+            self.penalties.extend([0.0] * missing)
+            self.updated_at.extend([0.0] * missing)
+
+    def current(self, node_id: int, now: float) -> float:
+        if node_id >= len(self.penalties) or not self.penalties[node_id]:
+            return 0.0
+        return self.penalties[node_id] * math.exp(-self.decay_rate * max(now - self.updated_at[node_id], 0.0))
+
+    def record(self, node_id: int, now: float) -> Tuple[bool, bool]:
+        """Charge one transition; returns ``(suppressed, newly_suppressed)``."""
+        self._grow(node_id)
+        decayed = self.current(node_id, now)
+        if node_id in self.suppressed and decayed <= self.reuse_threshold:
+            self.suppressed.discard(node_id)
+        penalty = min(decayed + self.penalty, self.ceiling)
+        self.penalties[node_id] = penalty
+        self.updated_at[node_id] = now
+        if node_id in self.suppressed:
+            return True, False
+        if penalty >= self.suppress_threshold:
+            self.suppressed.add(node_id)
+            return True, True
+        return False, False
+
+    def is_suppressed(self, node_id: int) -> bool:
+        return node_id in self.suppressed
+
+    def release_if_due(self, node_id: int, now: float) -> bool:
+        if node_id not in self.suppressed or self.current(node_id, now) > self.reuse_threshold:
+            return False
+        self.suppressed.discard(node_id)
+        return True
+
+    def seconds_until_reuse(self, node_id: int, now: float) -> float:
+        penalty = self.current(node_id, now)
+        if penalty <= self.reuse_threshold:
+            return 0.0
+        return math.log(penalty / self.reuse_threshold) / self.decay_rate
+
+    def reset(self, node_id: int) -> None:
+        if node_id < len(self.penalties):
+            self.penalties[node_id] = 0.0
+            self.updated_at[node_id] = 0.0
+        self.suppressed.discard(node_id)
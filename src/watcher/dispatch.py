@@ -0,0 +1,165 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.watcher.outbox import OutboxEntry
+
+SINKS = ("airflow", "github")
+
+DispatchHandler = Callable[[Any, float], None]
+
+
+def build_http_session(pool_maxsize: int) -> requests.Session:
+    # Retries are handled by the sinks themselves; the adapter only pools keep-alive connections.
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=0)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["Connection"] = "keep-alive"
+    return session
+
+
+class DispatchJob(NamedTuple):
+    payload: Dict[str, str]
+    sinks: Tuple[str, ...] = SINKS
+    entry: Optional[OutboxEntry] = None
+    detected_at: Optional[float] = None
+
+
+class SinkResult(NamedTuple):
+    ok: bool
+    seconds: float
+    error: Optional[str] = None
+
+
+def fan_out(
+    executor: ThreadPoolExecutor, sinks: Dict[str, Callable[[], bool]], deadlines: Optional[Dict[str, float]] = None
+) -> Dict[str, SinkResult]:
+    """Run every sink concurrently and wait for each until its ``time.monotonic()`` deadline.
+
+    A sink still running at its deadline is reported as timed out. Its call
+    keeps its executor thread until it returns, since a thread cannot be
+    cancelled, but the caller is no longer held up by it.
+    """
+
+    def timed(call: Callable[[], bool]) -> SinkResult:
+        started = time.monotonic()
+        try:
+            return SinkResult(bool(call()), time.monotonic() - started)
+        except Exception as exc:
+            return SinkResult(False, time.monotonic() - started, str(exc))
+
+    started = time.monotonic()
+    deadlines = deadlines or {}
+    futures: Dict[str, "Future[SinkResult]"] = {name: executor.submit(timed, call) for name, call in sinks.items()}
+    results: Dict[str, SinkResult] = {}
+    for name in sorted(futures, key=lambda name: deadlines.get(name, float("inf"))):
+        deadline = deadlines.get(name)
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+        done, _ = wait([futures[name]], timeout=timeout)
+        if done:
+            results[name] = futures[name].result()
+        else:
+            results[name] = SinkResult(False, time.monotonic() - started, "timed out")
+    return {name: results[name] for name in futures}
+
+
+class DispatchQueue:
+    def __init__(self, handler: DispatchHandler, max_size: int = 100, workers: int = 2) -> None:
+        if max_size < 1 or workers < 1:
+            raise ValueError("dispatch queue needs max_size >= 1 and workers >= 1")
+        self.handler = handler
+        self.max_size = max_size
+        self.workers = workers
+
+        self._items: Deque[Tuple[float, Any]] = deque()
+        self._condition = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._in_flight = 0
+        self._stopping = False
+        self._on_error: Optional[Callable[[Exception], None]] = None
+
+    def start(self, on_error: Optional[Callable[[Exception], None]] = None) -> None:
+        with self._condition:
+            if self._threads:
+                return
+            self._stopping = False
+            self._on_error = on_error
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._run_worker, name=f"dispatch-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, item: Any) -> bool:
+        with self._condition:
+            if len(self._items) >= self.max_size:
+                return False
+            self._items.append((time.monotonic(), item))
+            self._condition.notify()
+            return True
+
+    def join(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self._items or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return True
+
+    def depth(self) -> int:
+        with self._condition:
+            return len(self._items)
+
+    def full(self) -> bool:
+        with self._condition:
+            return len(self._items) >= self.max_size
+
+    def oldest_age_seconds(self) -> float:
+        with self._condition:
+            if not self._items:
+                return 0.0
+            return time.monotonic() - self._items[0][0]
+
+    def stats(self) -> Dict[str, float]:
+        with self._condition:
+            oldest = time.monotonic() - self._items[0][0] if self._items else 0.0
+            return {
+                "depth": len(self._items),
+                "in_flight": self._in_flight,
+                "oldest_age_seconds": round(oldest, 3),
+            }
+
+    def _run_worker(self) -> None:
+        while True:
+            with self._condition:
+                while not self._items and not self._stopping:
+                    self._condition.wait()
+                if not self._items:
+                    return
+                enqueued_at, item = self._items.popleft()
+                self._in_flight += 1
+
+            try:
+                self.handler(item, time.monotonic() - enqueued_at)
+            except Exception as exc:
+                if self._on_error is not None:
+                    self._on_error(exc)
+            finally:
+                with self._condition:
+                    self._in_flight -= 1
+                    self._condition.notify_all()
@@ -0,0 +1,164 @@
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+NO_DOMAIN = -1
+
+Dimension = Tuple[str, str]
+
+
+class FailureDomainIndex:
+    """Failure domain of every node, per dimension, keyed by interned node ID.
+
+    Each dimension (``zone``, ``rack``, ``pool``) maps a label key to an
+    ``array('i')`` of domain indexes by node ID, so a node costs four bytes
+    per dimension however many labels it carries. Domain names are interned
+    once per dimension and node totals per domain are kept incrementally;
+    down counts are derived at flush time from the non-Ready index.
+    """
+
+    def __init__(self, dimensions: Sequence[Dimension]) -> None:
+        self.dimensions = [(name, label) for name, label in dimensions if label]
+        self.reset()
+
+    def reset(self) -> None:
+        self.assigned: List[array] = [array("i") for _ in self.dimensions]
+        self.domain_ids: List[Dict[str, int]] = [{} for _ in self.dimensions]
+        self.domain_names: List[List[str]] = [[] for _ in self.dimensions]
+        self.totals: List[array] = [array("I") for _ in self.dimensions]
+        self.counted = bytearray()
+
+    def copy(self) -> "FailureDomainIndex":
+        """A detached copy for exporting outside the state lock."""
+        clone = FailureDomainIndex(())
+        clone.dimensions = list(self.dimensions)
+        clone.assigned = [array("i", assigned) for assigned in self.assigned]
+        clone.domain_ids = [dict(domain_ids) for domain_ids in self.domain_ids]
+        clone.domain_names = [list(domain_names) for domain_names in self.domain_names]
+        clone.totals = [array("I", totals) for totals in self.totals]
+        clone.counted = bytearray(self.counted)
+        return clone
+
+    def _grow(self, node_id: int) -> None:
+        missing = node_id + 1 - len(self.counted)
+        if missing > 0:
+            self.counted.extend(bytes(missing))
+            for assigned in self.assigned:
+                assigned.extend([NO_DOMAIN] * missing)
+
+    def _domain_id(self, dimension: int, value: str) -> int:
+        domain = self.domain_ids[dimension].get(value)
+        if domain is None:
+            domain = self.domain_ids[dimension][value] = len(self.domain_names[dimension])
+            self.domain_names[dimension].append(value)
+            self.totals[dimension].append(0)
+        return domain
+
+    def update(self, node_id: int, labels: Optional[Dict[str, str]]) -> bool:
+        """Assign a node's domains from its labels; returns True when anything changed."""
+        self._grow(node_id)
+        labels = labels or {}
+        changed = not self.counted[node_id]
+        for dimension, (_, label) in enumerate(self.dimensions):
+            value = labels.get(label)
+            domain = self._domain_id(dimension, value) if value else NO_DOMAIN
+            previous = self.assigned[dimension][node_id]
+            if self.counted[node_id] and previous == domain:
+                continue
+            if self.counted[node_id] and previous != NO_DOMAIN:
+                self.totals[dimension][previous] -= 1
+            if domain != NO_DOMAIN:
+                self.totals[dimension][domain] += 1
+            self.assigned[dimension][node_id] = domain
+            changed = True
+        self.counted[node_id] = 1
+        return changed
+
+    def remove(self, node_id: int) -> None:
+        # The assignment stays so a pending transition of a deleted node is still grouped at flush.
+        if node_id >= len(self.counted) or not self.counted[node_id]:
+            return
+        for dimension in range(len(self.dimensions)):
+            domain = self.assigned[dimension][node_id]
+            if domain != NO_DOMAIN:
+                self.totals[dimension][domain] -= 1
+        self.counted[node_id] = 0
+
+    def domains_of(self, node_id: int) -> Dict[str, str]:
+        if node_id >= len(self.counted):
+            return {}
+        domains = {}
+        for dimension, (name, _) in enumerate(self.dimensions):
+            domain = self.assigned[dimension][node_id]
+            if domain != NO_DOMAIN:
+                domains[name] = self.domain_names[dimension][domain]
+        return domains
+
+    def export(self, names: Dict[str, int]) -> Dict[str, List[Optional[str]]]:
+        exported: Dict[str, List[Optional[str]]] = {}
+        for name, node_id in names.items():
+            domains = self.domains_of(node_id)
+            if domains:
+                exported[name] = [domains.get(dimension) for dimension, _ in self.dimensions]
+        return exported
+
+    def restore(self, names: Dict[str, int], exported: Dict[str, List[Optional[str]]]) -> None:
+        self.reset()
+        for name, node_id in names.items():
+            values = exported.get(name) or []
+            self.update(node_id, {label: value for (_, label), value in zip(self.dimensions, values) if value})
+
+    def group(
+        self,
+        down_ids: Iterable[int],
+        transitions: Dict[str, Iterable[int]],
+        threshold: float,
+        min_down: int,
+    ) -> Tuple[Dict[str, Dict[str, Dict[str, Any]]], List[str]]:
+        """Group a flush by domain.
+
+        Returns per-dimension counts for every domain touched by
+        ``transitions`` (kind -> node IDs), and a ``"zone zone-a: 47/50 down"``
+        line for each of those domains whose down fraction reached
+        ``threshold`` with at least ``min_down`` nodes down.
+        """
+        groups: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        if not self.dimensions:
+            return groups, []
+
+        touched: List[Dict[int, Dict[str, Any]]] = [{} for _ in self.dimensions]
+        for kind, node_ids in transitions.items():
+            for node_id in node_ids:
+                if node_id >= len(self.counted):
+                    continue
+                for dimension in range(len(self.dimensions)):
+                    domain = self.assigned[dimension][node_id]
+                    if domain == NO_DOMAIN:
+                        continue
+                    entry = touched[dimension].get(domain)
+                    if entry is None:
+                        entry = touched[dimension][domain] = {"down": 0, "total": self.totals[dimension][domain]}
+                    entry[kind] = entry.get(kind, 0) + 1
+
+        if any(touched):
+            for node_id in down_ids:
+                if node_id >= len(self.counted) or not self.counted[node_id]:
+                    continue
+                for dimension in range(len(self.dimensions)):
+                    entry = touched[dimension].get(self.assigned[dimension][node_id])
+                    if entry is not None:
+                        entry["down"] += 1
+
+        crossed: List[str] = []
+        for dimension, (name, _) in enumerate(self.dimensions):
+            if not touched[dimension]:
+                continue
+            by_name = groups[name] = {}
+            for domain, entry in sorted(touched[dimension].items(), key=lambda item: self.domain_names[dimension][item[0]]):
+                domain_name = self.domain_names[dimension][domain]
+                entry["threshold_crossed"] = (
+                    entry["down"] >= min_down and entry["total"] > 0 and entry["down"] / entry["total"] >= threshold
+                )
+                by_name[domain_name] = entry
+                if entry["threshold_crossed"]:
+                    crossed.append(f"{name} {domain_name}: {entry['down']}/{entry['total']} down")
+        return groups, crossed
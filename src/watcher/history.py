@@ -0,0 +1,103 @@
+from array import array
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+# Bytes per ring slot: timestamp (d) + from/to status codes (b, b) + resourceVersion (Q).
+ENTRY_BYTES = 8 + 1 + 1 + 8
+COUNTER_BYTES = 8
+
+Transition = Tuple[float, int, int, int]
+
+
+def resource_version_number(resource_version: Optional[str]) -> int:
+    # resourceVersion is opaque by contract but etcd-backed servers hand out integers; anything else is kept as 0.
+    if resource_version and resource_version.isdigit():
+        return int(resource_version)
+    return 0
+
+
+class TransitionHistory:
+    """The last ``depth`` Ready transitions of up to ``max_nodes`` nodes in fixed rings.
+
+    Each tracked node owns one ring; slot ``ring * depth + n % depth`` of four
+    flat arrays holds its n-th transition, so appending overwrites the oldest
+    entry in O(1) and never allocates. All ``max_nodes`` rings are allocated
+    up front. Once they are all taken, the ring of the least recently used
+    node is handed to the next one, so memory stays at
+    ``(ENTRY_BYTES * depth + COUNTER_BYTES) * max_nodes`` whatever the fleet
+    size, e.g. 1.5 MB for 10,000 nodes at depth 8.
+    """
+
+    def __init__(self, depth: int = 8, max_nodes: int = 1024) -> None:
+        if depth < 0:
+            raise ValueError("transition history depth must be >= 0")
+        if max_nodes < 0:
+            raise ValueError("transition history node limit must be >= 0")
+        self.depth = depth
+        self.max_nodes = max_nodes
+        self.reset()
+
+    def reset(self) -> None:
+        max_nodes = self.max_nodes
+        slots = max_nodes * self.depth
+        self.timestamps = array("d", bytes(8 * slots))
+        self.previous = array("b", bytes(slots))
+        self.current = array("b", bytes(slots))
+        self.resource_versions = array("Q", bytes(8 * slots))
+        self.counts = array("Q", bytes(COUNTER_BYTES * max_nodes))
+        # node ID -> ring, least recently used first.
+        self.rings: "OrderedDict[int, int]" = OrderedDict()
+        self.free_rings = list(range(max_nodes - 1, -1, -1))
+
+    def __len__(self) -> int:
+        return len(self.rings)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.timestamps) * ENTRY_BYTES + len(self.counts) * self.counts.itemsize
+
+    def _ring(self, node_id: int) -> Optional[int]:
+        ring = self.rings.get(node_id)
+        if ring is not None:
+            self.rings.move_to_end(node_id)
+            return ring
+        if self.free_rings:
+            ring = self.free_rings.pop()
+        elif self.rings:
+            _, ring = self.rings.popitem(last=False)
+        else:
+            return None
+        self.counts[ring] = 0
+        self.rings[node_id] = ring
+        return ring
+
+    def append(self, node_id: int, at: float, previous: int, current: int, resource_version: int = 0) -> None:
+        if not self.depth:
+            return
+        ring = self._ring(node_id)
+        if ring is None:
+            return
+        count = self.counts[ring]
+        slot = ring * self.depth + count % self.depth
+        self.timestamps[slot] = at
+        self.previous[slot] = previous
+        self.current[slot] = current
+        self.resource_versions[slot] = resource_version
+        self.counts[ring] = count + 1
+
+    def entries(self, node_id: int) -> List[Transition]:
+        """``(timestamp, from_code, to_code, resource_version)`` tuples, oldest first."""
+        ring = self.rings.get(node_id)
+        if ring is None:
+            return []
+        self.rings.move_to_end(node_id)
+        count = self.counts[ring]
+        base = ring * self.depth
+        start = max(count - self.depth, 0)
+        slots = [base + n % self.depth for n in range(start, count)]
+        return [(self.timestamps[s], self.previous[s], self.current[s], self.resource_versions[s]) for s in slots]
+
+    def clear(self, node_id: int) -> None:
+        ring = self.rings.pop(node_id, None)
+        if ring is not None:
+            self.free_rings.append(ring)
@@ -0,0 +1,561 @@
+import argparse
+import gzip
+import json
+import mmap
+import os
+import shutil
+import sys
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+FSYNC_POLICIES = ("none", "batch", "record")
+MANIFEST_VERSION = 1
+MAX_ERROR_BACKOFF_SECONDS = 60.0
+
+
+def manifest_path_for(path: Path) -> Path:
+    return path.with_name(f"{path.name}.manifest.json")
+
+
+def read_manifest(path: Path) -> List[Dict[str, Any]]:
+    try:
+        with manifest_path_for(path).open("r", encoding="utf-8") as handle:
+            return list(json.load(handle).get("segments", []))
+    except FileNotFoundError:
+        return []
+
+
+def write_manifest(path: Path, segments: List[Dict[str, Any]]) -> None:
+    target = manifest_path_for(path)
+    tmp_path = target.with_name(f".{target.name}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as handle:
+        json.dump({"version": MANIFEST_VERSION, "segments": segments}, handle, indent=2, sort_keys=True)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, target)
+
+
+def segments_for_window(path: Path, since: Optional[str] = None, until: Optional[str] = None) -> List[Path]:
+    """Rotated segments overlapping ``[since, until]`` in time order, then the active file."""
+    selected = []
+    for segment in sorted(read_manifest(path), key=lambda entry: entry.get("first") or ""):
+        if since is not None and segment.get("last") and segment["last"] < since:
+            continue
+        if until is not None and segment.get("first") and segment["first"] > until:
+            continue
+        selected.append(path.with_name(segment["file"]))
+    if path.exists():
+        selected.append(path)
+    return selected
+
+
+def index_path_for(segment: Path) -> Path:
+    name = segment.name[: -len(".gz")] if segment.name.endswith(".gz") else segment.name
+    return segment.with_name(f"{name}.idx")
+
+
+def read_index(segment: Path) -> Tuple[List[str], List[int]]:
+    stamps: List[str] = []
+    offsets: List[int] = []
+    try:
+        with index_path_for(segment).open("r", encoding="utf-8") as handle:
+            for line in handle:
+                stamp, _, offset = line.rstrip("\n").partition("\t")
+                if offset.isdigit():
+                    stamps.append(stamp)
+                    offsets.append(int(offset))
+    except FileNotFoundError:
+        pass
+    return stamps, offsets
+
+
+def index_range(
+    stamps: Sequence[str], offsets: Sequence[int], size: int, since: Optional[str], until: Optional[str]
+) -> Tuple[int, int]:
+    """Byte range of a segment that can hold records in ``[since, until]``.
+
+    Records are appended in ``datetime`` order, so everything before the last
+    indexed record older than ``since`` and everything from the first indexed
+    record newer than ``until`` can be skipped without reading it.
+    """
+    start, end = 0, size
+    if since is not None:
+        position = bisect_left(stamps, since)
+        if position > 0:
+            start = offsets[position - 1]
+    if until is not None:
+        position = bisect_right(stamps, until)
+        if position < len(stamps):
+            end = offsets[position]
+    return min(start, size), min(end, size)
+
+
+def iter_segment_lines(segment: Path, start: int, end: int) -> Iterator[bytes]:
+    if segment.suffix == ".gz":
+        # Index offsets are into the uncompressed stream; gzip seeks by decompressing forward.
+        with gzip.open(segment, "rb") as handle:
+            handle.seek(start)
+            position = start
+            for line in handle:
+                if position >= end:
+                    return
+                position += len(line)
+                yield line
+        return
+
+    with segment.open("rb") as handle:
+        if start >= end or os.fstat(handle.fileno()).st_size == 0:
+            return
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            end = min(end, len(mapped))
+            position = start
+            while position < end:
+                newline = mapped.find(b"\n", position, end)
+                if newline == -1:
+                    yield mapped[position:end]
+                    return
+                yield mapped[position : newline + 1]
+                position = newline + 1
+
+
+def iter_segment_records(
+    segment: Path, since: Optional[str] = None, until: Optional[str] = None, code: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    needle = f'"error_code": {json.dumps(code)}'.encode("utf-8") if code is not None else None
+    size = segment.stat().st_size if segment.suffix != ".gz" else sys.maxsize
+    start, end = index_range(*read_index(segment), size, since, until)
+    for line in iter_segment_lines(segment, start, end):
+        if needle is not None and needle not in line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        stamp = record.get("datetime", "")
+        if since is not None and stamp < since:
+            continue
+        if until is not None and stamp > until:
+            continue
+        if code is not None and record.get("error_code") != code:
+            continue
+        yield record
+
+
+def read_segment_records(
+    segment: Path, since: Optional[str] = None, until: Optional[str] = None, code: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """``iter_segment_records`` for a segment named by a manifest that may already be stale.
+
+    The compressor replaces a plain segment with its ``.gz`` after the
+    manifest was read, so a missing plain file is retried compressed; a
+    segment that retention removed altogether yields nothing.
+    """
+    try:
+        yield from iter_segment_records(segment, since, until, code)
+        return
+    except FileNotFoundError:
+        if segment.suffix == ".gz":
+            return
+    try:
+        yield from iter_segment_records(segment.with_name(f"{segment.name}.gz"), since, until, code)
+    except FileNotFoundError:
+        pass
+
+
+def last_record(segment: Path) -> Optional[Dict[str, Any]]:
+    """The last complete record of a segment, reading plain files backwards from the end."""
+    try:
+        if segment.suffix == ".gz":
+            last = None
+            with gzip.open(segment, "rb") as handle:
+                for line in handle:
+                    last = line
+            lines = [last] if last is not None else []
+        else:
+            with segment.open("rb") as handle:
+                size = os.fstat(handle.fileno()).st_size
+                block = 1 << 16
+                while True:
+                    start = max(size - block, 0)
+                    handle.seek(start)
+                    lines = handle.read(size - start).splitlines()
+                    # The first line of a partial block may be cut; keep it only when reading from 0.
+                    if start > 0:
+                        lines = lines[1:]
+                    if lines or start == 0:
+                        break
+                    block *= 4
+    except FileNotFoundError:
+        return None
+    for line in reversed(lines):
+        try:
+            return json.loads(line)
+        except ValueError:
+            continue
+    return None
+
+
+def iter_records(
+    path: Path, since: Optional[str] = None, until: Optional[str] = None, code: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    for segment in segments_for_window(path, since, until):
+        yield from read_segment_records(segment, since, until, code)
+
+
+class IncidentLogWriter:
+    """Long-lived NDJSON appender for the incident history.
+
+    Records are buffered and written in one ``write`` per batch once
+    ``batch_records`` or ``batch_bytes`` is reached, or when the buffer is
+    older than ``flush_interval_seconds``. ``fsync_policy`` controls
+    durability: ``none`` leaves it to the OS, ``batch`` fsyncs after each
+    batch and ``record`` writes and fsyncs every record on its own. If the
+    file is moved or removed underneath us (external rotation), the next
+    flush reopens the path.
+
+    Built-in rotation closes the active file once it reaches ``rotate_bytes``
+    or, with ``rotate_daily``, before the first record of a new UTC day. The
+    segment is renamed aside, gzipped in the background when ``compress`` is
+    set, and recorded in ``<path>.manifest.json`` with the ``datetime`` range
+    it covers. Only the newest ``retention`` segments are kept.
+
+    Every ``index_interval`` records the writer also appends ``datetime`` and
+    byte offset to a ``.idx`` sidecar, which ``iter_records`` uses to seek
+    into a segment instead of parsing it from the start.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        batch_records: int = 1,
+        batch_bytes: int = 1 << 20,
+        flush_interval_seconds: float = 1.0,
+        fsync_policy: str = "batch",
+        rotate_bytes: int = 0,
+        rotate_daily: bool = False,
+        retention: int = 30,
+        compress: bool = True,
+        index_interval: int = 256,
+    ) -> None:
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"fsync policy must be one of {', '.join(FSYNC_POLICIES)}")
+        self.path = path
+        self.batch_records = max(batch_records, 1)
+        self.batch_bytes = batch_bytes
+        self.flush_interval_seconds = flush_interval_seconds
+        self.fsync_policy = fsync_policy
+        self.rotate_bytes = rotate_bytes
+        self.rotate_daily = rotate_daily
+        self.retention = retention
+        self.compress = compress
+        self.index_interval = index_interval
+        self.index_path = index_path_for(path)
+
+        self._lock = threading.RLock()
+        self._manifest_lock = threading.Lock()
+        self._compressors: List[threading.Thread] = []
+        # Segments a compressor thread is still reading; guarded by ``_manifest_lock``.
+        self._compressing: Set[str] = set()
+        self._buffer: List[str] = []
+        self._buffer_times: List[str] = []
+        self._buffered_bytes = 0
+        self._size = 0
+        self._records = 0
+        self._first_datetime: Optional[str] = None
+        self._last_datetime: Optional[str] = None
+        self._oldest_buffered_at: Optional[float] = None
+        self._handle: Optional[IO[str]] = None
+        self._index_handle: Optional[IO[str]] = None
+        self._inode: Optional[int] = None
+        self._flusher: Optional[threading.Thread] = None
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self.write_many([record])
+
+    def write_many(self, records: Iterable[Dict[str, Any]]) -> None:
+        with self._lock:
+            for record in records:
+                line = json.dumps(record, sort_keys=True) + "\n"
+                self._buffer.append(line)
+                self._buffer_times.append(str(record.get("datetime", "")))
+                self._buffered_bytes += len(line)
+                if self.fsync_policy == "record":
+                    self.flush()
+            if self._buffer and self._oldest_buffered_at is None:
+                self._oldest_buffered_at = time.monotonic()
+            if len(self._buffer) >= self.batch_records or self._buffered_bytes >= self.batch_bytes:
+                self.flush()
+
+    def flush_if_stale(self) -> None:
+        with self._lock:
+            if self._oldest_buffered_at is not None and time.monotonic() - self._oldest_buffered_at >= self.flush_interval_seconds:
+                self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._buffer:
+                return
+            # If opening or writing fails the buffer is kept and retried on the next flush.
+            handle = self._open()
+            if self.rotate_daily and self._first_datetime and self._buffer_times[0][:10] != self._first_datetime[:10]:
+                self.rotate()
+                handle = self._open()
+            handle.write("".join(self._buffer))
+            handle.flush()
+            self._index_batch()
+            stamps = [stamp for stamp in self._buffer_times if stamp]
+            if stamps:
+                self._first_datetime = self._first_datetime or min(stamps)
+                self._last_datetime = max([self._last_datetime or "", *stamps])
+            self._buffer = []
+            self._buffer_times = []
+            self._buffered_bytes = 0
+            self._oldest_buffered_at = None
+            if self.fsync_policy != "none":
+                os.fsync(handle.fileno())
+            if self.rotate_bytes and self._size >= self.rotate_bytes:
+                self.rotate()
+
+    def _index_batch(self) -> None:
+        # json.dumps escapes non-ASCII, so character counts are byte counts.
+        entries = []
+        for line, stamp in zip(self._buffer, self._buffer_times):
+            if self.index_interval > 0 and stamp and self._records % self.index_interval == 0:
+                entries.append(f"{stamp}\t{self._size}\n")
+            self._size += len(line)
+            self._records += 1
+        if entries and self._index_handle is not None:
+            # The index is only a hint for readers, so it is never fsynced.
+            self._index_handle.write("".join(entries))
+            self._index_handle.flush()
+
+    def rotate(self) -> Optional[Path]:
+        with self._lock:
+            self._close_handles()
+            if not self.path.exists() or self.path.stat().st_size == 0:
+                return None
+
+            stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+            segment = self.path.with_name(f"{self.path.name}.{stamp}")
+            counter = 1
+            while segment.exists() or segment.with_name(f"{segment.name}.gz").exists():
+                segment = self.path.with_name(f"{self.path.name}.{stamp}-{counter}")
+                counter += 1
+            os.replace(self.path, segment)
+            if self.index_path.exists():
+                os.replace(self.index_path, index_path_for(segment))
+
+            entry = {
+                "file": segment.name,
+                "index": index_path_for(segment).name,
+                "first": self._first_datetime,
+                "last": self._last_datetime,
+                "records": self._records,
+                "bytes": self._size,
+                "compressed": False,
+            }
+            self._reset_segment()
+            with self._manifest_lock:
+                write_manifest(self.path, self._apply_retention(read_manifest(self.path) + [entry]))
+                if self.compress:
+                    self._compressing.add(segment.name)
+
+            if self.compress:
+                compressor = threading.Thread(target=self._compress_segment, args=(segment,), daemon=True)
+                compressor.start()
+                self._compressors = [thread for thread in self._compressors if thread.is_alive()] + [compressor]
+            return segment
+
+    def last_seq(self) -> int:
+        """Highest ``seq`` already on disk, so a restarted writer can continue the sequence."""
+        candidates = [self.path]
+        for entry in reversed(read_manifest(self.path)):
+            name = entry["file"]
+            candidates += [self.path.with_name(name), self.path.with_name(f"{name}.gz")]
+        for segment in candidates:
+            record = last_record(segment)
+            if record is not None:
+                return int(record.get("seq") or 0)
+        return 0
+
+    def wait_for_compression(self, timeout: Optional[float] = None) -> None:
+        for thread in list(self._compressors):
+            thread.join(timeout)
+
+    def _compress_segment(self, segment: Path) -> None:
+        compressed = segment.with_name(f"{segment.name}.gz")
+        tmp_path = segment.with_name(f".{compressed.name}.tmp")
+        try:
+            with segment.open("rb") as source, gzip.open(tmp_path, "wb") as target:
+                shutil.copyfileobj(source, target, 1 << 20)
+        except Exception:
+            # The segment stays in the manifest uncompressed, and retention may delete it as usual.
+            with self._manifest_lock:
+                self._compressing.discard(segment.name)
+            if tmp_path.exists():
+                tmp_path.unlink()
+            raise
+        with self._manifest_lock:
+            self._compressing.discard(segment.name)
+            segments = read_manifest(self.path)
+            if not any(entry["file"] == segment.name for entry in segments):
+                # Retention expired the segment while it was read and left deleting it to this thread.
+                tmp_path.unlink()
+                segment.unlink()
+                return
+            os.replace(tmp_path, compressed)
+            for entry in segments:
+                if entry["file"] == segment.name:
+                    entry["file"] = compressed.name
+                    entry["compressed"] = True
+            write_manifest(self.path, segments)
+        segment.unlink()
+
+    def _apply_retention(self, segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if self.retention <= 0 or len(segments) <= self.retention:
+            return segments
+        expired, kept = segments[: -self.retention], segments[-self.retention :]
+        for entry in expired:
+            # A segment still being compressed is left to its compressor, which deletes it when done.
+            files = [] if entry["file"] in self._compressing else [entry["file"], f"{entry['file']}.gz"]
+            for name in files + [entry.get("index", "")]:
+                if not name:
+                    continue
+                try:
+                    self.path.with_name(name).unlink()
+                except FileNotFoundError:
+                    pass
+        return kept
+
+    def _reset_segment(self) -> None:
+        self._size = 0
+        self._records = 0
+        self._first_datetime = None
+        self._last_datetime = None
+
+    def _scan_active_segment(self) -> None:
+        """Recover segment bounds and rebuild the sidecar index for an existing file."""
+        self._reset_segment()
+        entries = []
+        size = os.fstat(self._handle.fileno()).st_size if self._handle is not None else 0
+        if size:
+            with self.path.open("rb") as handle:
+                for line in handle:
+                    try:
+                        stamp = json.loads(line).get("datetime", "")
+                    except ValueError:
+                        stamp = ""
+                        if not line.endswith(b"\n"):
+                            # A line torn by a crash mid-write; the next append would be glued onto it.
+                            os.truncate(self.path, self._size)
+                            break
+                    if not line.endswith(b"\n") and self._handle is not None:
+                        self._handle.write("\n")
+                        self._handle.flush()
+                        line += b"\n"
+                    if self.index_interval > 0 and stamp and self._records % self.index_interval == 0:
+                        entries.append(f"{stamp}\t{self._size}\n")
+                    self._size += len(line)
+                    self._records += 1
+                    if stamp:
+                        self._first_datetime = self._first_datetime or stamp
+                        self._last_datetime = max(self._last_datetime or "", stamp)
+        with self.index_path.open("w", encoding="utf-8") as index:
+            index.write("".join(entries))
+        self._index_handle = self.index_path.open("a", encoding="utf-8")
+
+    def _close_handles(self) -> None:
+        for handle in (self._handle, self._index_handle):
+            if handle is not None:
+                handle.close()
+        self._handle = None
+        self._index_handle = None
+        self._inode = None
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self.flush()
+            finally:
+                self._close_handles()
+
+    def start(self, on_error: Optional[Callable[[Exception], None]] = None) -> None:
+        if self._flusher is not None:
+            return
+
+        def run() -> None:
+            delay = self.flush_interval_seconds
+            while True:
+                time.sleep(delay)
+                try:
+                    # Picks up an external rotation here, so the rescan never lands on a writer's flush.
+                    self.open()
+                    self.flush_if_stale()
+                except Exception as exc:
+                    # An unwritable path fails every tick; backing off keeps it from logging once a second.
+                    delay = min(max(delay, 0.1) * 2, MAX_ERROR_BACKOFF_SECONDS)
+                    if on_error is not None:
+                        on_error(exc)
+                else:
+                    delay = self.flush_interval_seconds
+
+        self._flusher = threading.Thread(target=run, name="incident-log-flusher", daemon=True)
+        self._flusher.start()
+
+    def open(self) -> None:
+        """Open the active segment, scanning it if it is new or was rotated away externally."""
+        with self._lock:
+            self._open()
+
+    def _open(self) -> IO[str]:
+        if self._handle is not None:
+            try:
+                rotated = os.stat(self.path).st_ino != self._inode
+            except FileNotFoundError:
+                rotated = True
+            if not rotated:
+                return self._handle
+            self._close_handles()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle = self.path.open("a", encoding="utf-8")
+        self._inode = os.fstat(self._handle.fileno()).st_ino
+        self._scan_active_segment()
+        return self._handle
+
+
+def normalize_timestamp(value: str) -> str:
+    """Render an ISO-8601 date or time as the UTC ``...Z`` form used in records."""
+    parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.watcher.incidents", description="Read the incident log.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    query = commands.add_parser("query", help="Print incident records in a time range as NDJSON.")
+    query.add_argument(
+        "--path",
+        type=Path,
+        default=Path(os.getenv("INCIDENT_LOG_PATH", "/var/lib/node-health-watcher/incidents.ndjson").strip()),
+    )
+    query.add_argument("--since", type=normalize_timestamp, help="Inclusive lower bound (ISO-8601, UTC if no offset).")
+    query.add_argument("--until", type=normalize_timestamp, help="Inclusive upper bound (ISO-8601, UTC if no offset).")
+    query.add_argument("--code", help="Only records with this error_code.")
+    args = parser.parse_args(argv)
+
+    out = sys.stdout
+    for record in iter_records(args.path, since=args.since, until=args.until, code=args.code):
+        out.write(json.dumps(record, sort_keys=True) + "\n")
+    out.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
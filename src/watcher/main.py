@@ -1,14 +1,34 @@
+import hashlib
 import json
 import logging
 import os
+import re
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional, Set
+from typing import Any, Deque, Dict, Iterator, List, Optional, Set, Tuple
 
-import requests
 from kubernetes import client, config, watch
-from kubernetes.client import V1Node
+from kubernetes.client import V1Lease, V1Node
+from kubernetes.client.rest import ApiException
+from kubernetes.watch.watch import iter_resp_lines
+
+from src.watcher.checkpoint import read_checkpoint, write_checkpoint
+from src.watcher.damping import FlapDamper
+from src.watcher.dispatch import DispatchJob, DispatchQueue, build_http_session, fan_out
+from src.watcher.domains import FailureDomainIndex
+from src.watcher.incidents import IncidentLogWriter
+from src.watcher.metrics import MetricsServer, WatcherMetrics
+from src.watcher.outbox import Outbox
+from src.watcher.state import NodeStateStore, export_statuses
+from src.watcher.timers import TimerWheel
+
+HTTP_STATUS_GONE = 410
+HTTP_STATUS_CONFLICT = 409
+WATCH_DECODE_MODES = ("model", "raw")
 
 
 def utc_timestamp() -> str:
@@ -25,17 +45,132 @@ class NodeHealthWatcher:
         self.gha_dispatch_url = os.getenv("GHA_DISPATCH_URL", "").strip()
         self.gha_token = os.getenv("GHA_TOKEN", "").strip()
         self.gha_event_type = os.getenv("GHA_EVENT_TYPE", "k3s-alert").strip()
-        self.watch_debounce_seconds = int(os.getenv("WATCH_DEBOUNCE_SECONDS", "5"))
+        self.watch_debounce_seconds = float(os.getenv("WATCH_DEBOUNCE_SECONDS", "5"))
         self.airflow_max_retries = int(os.getenv("AIRFLOW_MAX_RETRIES", "5"))
         self.airflow_timeout_seconds = int(os.getenv("AIRFLOW_TIMEOUT_SECONDS", "10"))
+        self.watch_timeout_seconds = int(os.getenv("WATCH_TIMEOUT_SECONDS", "30"))
+        self.node_list_page_size = int(os.getenv("NODE_LIST_PAGE_SIZE", "500"))
+        self.watch_decode_mode = os.getenv("WATCH_DECODE_MODE", "model").strip().lower()
+        if self.watch_decode_mode not in WATCH_DECODE_MODES:
+            raise ValueError(f"WATCH_DECODE_MODE must be one of {', '.join(WATCH_DECODE_MODES)}")
+        self.storm_threshold = int(os.getenv("STORM_THRESHOLD", "50"))
+        self.dispatch_queue_size = int(os.getenv("DISPATCH_QUEUE_SIZE", "100"))
+        self.dispatch_workers = int(os.getenv("DISPATCH_WORKERS", "2"))
+        self.airflow_deadline_seconds = float(os.getenv("AIRFLOW_DEADLINE_SECONDS", "90"))
+        self.gha_deadline_seconds = float(os.getenv("GHA_DEADLINE_SECONDS", "15"))
+        self.http_connect_timeout_seconds = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "3"))
+        self.http_pool_maxsize = int(os.getenv("HTTP_POOL_MAXSIZE", str(max(self.dispatch_workers, 2))))
         self.incident_log_path = Path(
             os.getenv("INCIDENT_LOG_PATH", "/var/lib/node-health-watcher/incidents.ndjson").strip()
         )
+        checkpoint_path = os.getenv("CHECKPOINT_PATH", "/var/lib/node-health-watcher/checkpoint.json").strip()
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+        self.checkpoint_interval_seconds = float(os.getenv("CHECKPOINT_INTERVAL_SECONDS", "30"))
+        self.checkpoint_min_interval_seconds = float(os.getenv("CHECKPOINT_MIN_INTERVAL_SECONDS", "1"))
 
-        self.node_states: Dict[str, str] = {}
-        self.pending_down: Set[str] = set()
-        self.pending_recovered: Set[str] = set()
+        self.incident_log_batch_records = int(os.getenv("INCIDENT_LOG_BATCH_RECORDS", "1"))
+        self.incident_log_batch_bytes = int(os.getenv("INCIDENT_LOG_BATCH_BYTES", str(1 << 20)))
+        self.incident_log_flush_interval_seconds = float(os.getenv("INCIDENT_LOG_FLUSH_INTERVAL_SECONDS", "1"))
+        self.incident_log_fsync = os.getenv("INCIDENT_LOG_FSYNC", "batch").strip().lower()
+        self.incident_log_rotate_bytes = int(os.getenv("INCIDENT_LOG_ROTATE_BYTES", str(64 << 20)))
+        self.incident_log_rotate_daily = os.getenv("INCIDENT_LOG_ROTATE_DAILY", "true").strip().lower() in ("1", "true", "yes")
+        self.incident_log_retention = int(os.getenv("INCIDENT_LOG_RETENTION", "30"))
+        self.incident_log_compress = os.getenv("INCIDENT_LOG_COMPRESS", "true").strip().lower() in ("1", "true", "yes")
+        self.incident_log_index_interval = int(os.getenv("INCIDENT_LOG_INDEX_INTERVAL", "256"))
+        metrics_port = os.getenv("METRICS_PORT", "9102").strip()
+        self.metrics_port = int(metrics_port) if metrics_port else None
+        self.watch_stall_seconds = float(os.getenv("WATCH_STALL_SECONDS", "90"))
+        self.dispatch_latency_budget_seconds = float(os.getenv("DISPATCH_LATENCY_BUDGET_SECONDS", "60"))
+        self.lease_detection = os.getenv("LEASE_DETECTION", "false").strip().lower() in ("1", "true", "yes")
+        self.lease_namespace = os.getenv("LEASE_NAMESPACE", "kube-node-lease").strip()
+        self.lease_stale_seconds = float(os.getenv("LEASE_STALE_SECONDS", "20"))
+        self.timer_tick_seconds = float(os.getenv("TIMER_TICK_SECONDS", "0.5"))
+        self.node_down_escalation_seconds = float(os.getenv("NODE_DOWN_ESCALATION_SECONDS", "0"))
+        self.flap_damping = os.getenv("FLAP_DAMPING", "false").strip().lower() in ("1", "true", "yes")
+        self.flap_penalty = float(os.getenv("FLAP_PENALTY", "1000"))
+        self.flap_half_life_seconds = float(os.getenv("FLAP_HALF_LIFE_SECONDS", "300"))
+        self.flap_suppress_threshold = float(os.getenv("FLAP_SUPPRESS_THRESHOLD", "3000"))
+        self.flap_reuse_threshold = float(os.getenv("FLAP_REUSE_THRESHOLD", "750"))
+        self.flap_max_suppress_seconds = float(os.getenv("FLAP_MAX_SUPPRESS_SECONDS", "3600"))
+        self.transition_history_depth = int(os.getenv("TRANSITION_HISTORY_DEPTH", "8"))
+        self.transition_history_nodes = int(os.getenv("TRANSITION_HISTORY_NODES", "1024"))
+        self.transition_history_payload_nodes = int(os.getenv("TRANSITION_HISTORY_PAYLOAD_NODES", "50"))
+        self.zone_label = os.getenv("ZONE_LABEL", "topology.kubernetes.io/zone").strip()
+        self.rack_label = os.getenv("RACK_LABEL", "topology.kubernetes.io/rack").strip()
+        self.node_pool_label = os.getenv("NODE_POOL_LABEL", "node.kubernetes.io/pool").strip()
+        self.failure_domain_threshold = float(os.getenv("FAILURE_DOMAIN_THRESHOLD", "0.5"))
+        self.failure_domain_min_down = int(os.getenv("FAILURE_DOMAIN_MIN_DOWN", "2"))
+        outbox_path = os.getenv("OUTBOX_PATH", "/var/lib/node-health-watcher/outbox.ndjson").strip()
+        self.outbox_path = Path(outbox_path) if outbox_path else None
+        self.outbox_retry_interval_seconds = float(os.getenv("OUTBOX_RETRY_INTERVAL_SECONDS", "30"))
+        self.outbox_max_age_seconds = float(os.getenv("OUTBOX_MAX_AGE_SECONDS", "86400"))
+        self.outbox_compact_threshold = int(os.getenv("OUTBOX_COMPACT_THRESHOLD", "1000"))
+
+        self.state = NodeStateStore(self.transition_history_depth, self.transition_history_nodes)
+        self.failure_domains = FailureDomainIndex(
+            [("zone", self.zone_label), ("rack", self.rack_label), ("pool", self.node_pool_label)]
+        )
         self.flush_deadline: Optional[float] = None
+        self.window_started_at: Optional[float] = None
+        self.flush_seq = 0
+        self.storm_active = False
+        self.window_transitions = 0
+        self.resource_version: Optional[str] = None
+        self.primed = False
+        self.last_watch_activity = time.monotonic()
+        self.state_lock = threading.Condition(threading.RLock())
+        self.checkpoint_dirty = False
+        self.checkpoint_wakeup = threading.Event()
+        self.checkpointed_resource_version: Optional[str] = None
+        self.dispatch_queue = DispatchQueue(
+            self.dispatch_job,
+            max_size=self.dispatch_queue_size,
+            workers=self.dispatch_workers,
+        )
+        self.timer_wheel = TimerWheel(tick_seconds=self.timer_tick_seconds)
+        self.flap_damper: Optional[FlapDamper] = None
+        if self.flap_damping:
+            self.flap_damper = FlapDamper(
+                penalty=self.flap_penalty,
+                half_life_seconds=self.flap_half_life_seconds,
+                suppress_threshold=self.flap_suppress_threshold,
+                reuse_threshold=self.flap_reuse_threshold,
+                max_suppress_seconds=self.flap_max_suppress_seconds,
+            )
+        self.lease_renewals: Dict[str, float] = {}
+        self.lease_suspects: Dict[str, str] = {}
+        self.outbox: Optional[Outbox] = None
+        self.incident_seq: Optional[int] = None
+        # Records are numbered and queued under state_lock and written in that order outside it.
+        self.incident_records: Deque[Dict[str, Any]] = deque()
+        self.incident_write_lock = threading.Lock()
+        self.incident_log = IncidentLogWriter(
+            self.incident_log_path,
+            batch_records=self.incident_log_batch_records,
+            batch_bytes=self.incident_log_batch_bytes,
+            flush_interval_seconds=self.incident_log_flush_interval_seconds,
+            fsync_policy=self.incident_log_fsync,
+            rotate_bytes=self.incident_log_rotate_bytes,
+            rotate_daily=self.incident_log_rotate_daily,
+            retention=self.incident_log_retention,
+            compress=self.incident_log_compress,
+            index_interval=self.incident_log_index_interval,
+        )
+        self.sink_executor = ThreadPoolExecutor(max_workers=2 * self.dispatch_workers, thread_name_prefix="sink")
+        self.airflow_session = build_http_session(self.http_pool_maxsize)
+        self.github_session = build_http_session(self.http_pool_maxsize)
+
+        self.metrics = WatcherMetrics(
+            nodes_down=lambda: len(self.state.down_names),
+            pending_down=lambda: len(self.state.pending_down),
+            pending_recovered=lambda: len(self.state.pending_recovered),
+            queue_depth=self.dispatch_queue.depth,
+            queue_in_flight=lambda: self.dispatch_queue.stats()["in_flight"],
+            watch_activity_age=self.watch_activity_age_seconds,
+            timers=lambda: len(self.timer_wheel),
+            flapping=lambda: len(self.flap_damper.suppressed) if self.flap_damper is not None else 0,
+        )
+        self.metrics_server: Optional[MetricsServer] = None
 
         self.logger = logging.getLogger("node-health-watcher")
 
@@ -56,6 +191,14 @@ class NodeHealthWatcher:
                 return condition.status or "Unknown"
         return "Unknown"
 
+    @staticmethod
+    def raw_ready_status(raw_node: Dict[str, Any]) -> str:
+        conditions = (raw_node.get("status") or {}).get("conditions") or []
+        for condition in conditions:
+            if condition.get("type") == "Ready":
+                return condition.get("status") or "Unknown"
+        return "Unknown"
+
     def load_k8s_config(self) -> None:
         try:
             config.load_incluster_config()
@@ -65,56 +208,235 @@ class NodeHealthWatcher:
             self.log_event("k8s_config", mode="kubeconfig")
 
     def prime_node_state(self, api: client.CoreV1Api) -> None:
-        nodes = api.list_node().items
-        for node in nodes:
-            name = node.metadata.name
-            self.node_states[name] = self.ready_status(node)
-        self.log_event("initial_state_loaded", nodes=len(nodes))
+        nodes = 0
+        for page in self.iter_node_pages(api):
+            for raw_node in page:
+                metadata = raw_node["metadata"]
+                self.state.set(metadata["name"], self.raw_ready_status(raw_node))
+                self.update_node_domains(metadata["name"], metadata.get("labels"))
+            nodes += len(page)
+        self.log_event("initial_state_loaded", nodes=nodes, resource_version=self.resource_version)
+
+    def iter_node_pages(self, api: client.CoreV1Api) -> Iterator[List[Dict[str, Any]]]:
+        continue_token: Optional[str] = None
+        while True:
+            kwargs: Dict[str, Any] = {"limit": self.node_list_page_size, "_preload_content": False}
+            if continue_token:
+                kwargs["_continue"] = continue_token
+            response = api.list_node(**kwargs)
+            try:
+                node_list = json.loads(response.data)
+            finally:
+                response.release_conn()
+
+            self.mark_watch_activity()
+            yield node_list.get("items") or []
+            metadata = node_list.get("metadata") or {}
+            continue_token = metadata.get("continue")
+            if not continue_token:
+                self.resource_version = metadata.get("resourceVersion")
+                return
+
+    def resync_node_state(self, api: client.CoreV1Api) -> None:
+        seen: Set[str] = set()
+        for page in self.iter_node_pages(api):
+            for raw_node in page:
+                name = raw_node["metadata"]["name"]
+                seen.add(name)
+                self.apply_node_status(
+                    name, self.raw_ready_status(raw_node), resource_version=raw_node["metadata"].get("resourceVersion")
+                )
+                self.update_node_domains(name, raw_node["metadata"].get("labels"))
+
+        with self.state_lock:
+            for name in [name for name in self.state if name not in seen]:
+                self.forget_node(name, source="resync")
+
+        self.log_event("node_state_resynced", nodes=len(seen), resource_version=self.resource_version)
+
+    @property
+    def node_states(self) -> Dict[str, str]:
+        return self.state.snapshot()
+
+    @node_states.setter
+    def node_states(self, states: Dict[str, str]) -> None:
+        self.state.load(states)
+        self.failure_domains.reset()
+
+    @property
+    def pending_down(self) -> Set[str]:
+        return set(self.state.pending_names(self.state.pending_down))
+
+    @pending_down.setter
+    def pending_down(self, names: Set[str]) -> None:
+        self.state.set_pending(self.state.pending_down, names)
+
+    @property
+    def pending_recovered(self) -> Set[str]:
+        return set(self.state.pending_names(self.state.pending_recovered))
+
+    @pending_recovered.setter
+    def pending_recovered(self, names: Set[str]) -> None:
+        self.state.set_pending(self.state.pending_recovered, names)
 
     def handle_node_update(self, node: V1Node) -> None:
-        name = node.metadata.name
-        current = self.ready_status(node)
+        with self.metrics.handle_node_update.time():
+            self.apply_node_status(
+                node.metadata.name, self.ready_status(node), resource_version=node.metadata.resource_version
+            )
+            self.update_node_domains(node.metadata.name, node.metadata.labels)
 
-        if name not in self.node_states:
-            self.node_states[name] = current
-            self.log_event("node_first_observed", node=name, status=current)
-            return
+    def update_node_domains(self, name: str, labels: Optional[Dict[str, str]]) -> None:
+        with self.state_lock:
+            node_id = self.state.ids.get(name)
+            if node_id is not None and self.failure_domains.update(node_id, labels):
+                self.checkpoint_dirty = True
 
-        previous = self.node_states[name]
-        if previous == current:
-            return
+    def apply_node_status(
+        self, name: str, current: str, from_lease: bool = False, resource_version: Optional[str] = None
+    ) -> None:
+        with self.state_lock:
+            if not from_lease and name in self.lease_suspects:
+                # The stale lease keeps the node Unknown until it renews; anything worse passes through.
+                self.lease_suspects[name] = current
+                if current == "True":
+                    return
 
-        self.node_states[name] = current
+            previous = self.state.get(name)
+            if previous is None:
+                self.state.set(name, current)
+                self.checkpoint_dirty = True
+                self.log_event("node_first_observed", node=name, status=current)
+                return
 
-        if previous == "True" and current != "True":
-            self.pending_down.add(name)
-            self.pending_recovered.discard(name)
-            transition = "node_became_non_ready"
-        elif previous != "True" and current == "True":
-            self.pending_recovered.add(name)
-            self.pending_down.discard(name)
-            transition = "node_became_ready"
-        else:
-            self.log_event("node_state_changed_non_actionable", node=name, previous=previous, current=current)
-            return
+            if previous == current:
+                return
 
+            self.state.set(name, current)
+            self.state.record_transition(name, previous, current, time.time(), resource_version)
+            self.checkpoint_dirty = True
+
+            if previous == "True" and current != "True":
+                transition = "node_became_non_ready"
+            elif previous != "True" and current == "True":
+                transition = "node_became_ready"
+            else:
+                self.log_event("node_state_changed_non_actionable", node=name, previous=previous, current=current)
+                return
+
+            self.metrics.transitions.inc(transition)
+            if self.damp_transition(name, transition):
+                return
+
+            if transition == "node_became_non_ready":
+                pending = self.state.mark_down(name, previous, current)
+                if self.node_down_escalation_seconds > 0:
+                    self.timer_wheel.schedule(("escalate", name), self.node_down_escalation_seconds, self.escalate_down_node)
+            else:
+                pending = self.state.mark_recovered(name, previous, current)
+                self.timer_wheel.cancel(("escalate", name))
+            if not pending:
+                self.log_event("node_transition_reverted", transition=transition, node=name, previous=previous, current=current)
+                return
+            self.arm_flush_deadline()
+
+            self.window_transitions += 1
+            pending = self.state.pending_count()
+            if not self.storm_active and pending >= self.storm_threshold:
+                self.storm_active = True
+                self.log_event("storm_mode_entered", pending=pending, threshold=self.storm_threshold)
+
+            if self.storm_active:
+                self.log_event(
+                    "node_transition_detected",
+                    transition=transition,
+                    node=name,
+                    previous=previous,
+                    current=current,
+                    pending_down_count=len(self.state.pending_down),
+                    pending_recovered_count=len(self.state.pending_recovered),
+                )
+                return
+
+            self.log_event(
+                "node_transition_detected",
+                transition=transition,
+                node=name,
+                previous=previous,
+                current=current,
+                pending_down=self.state.pending_names(self.state.pending_down),
+                pending_recovered=self.state.pending_names(self.state.pending_recovered),
+            )
+
+    def arm_flush_deadline(self) -> None:
         if self.flush_deadline is None:
-            self.flush_deadline = time.time() + self.watch_debounce_seconds
+            self.window_started_at = time.time()
+            self.flush_deadline = self.window_started_at + self.watch_debounce_seconds
+            self.state_lock.notify_all()
+        self.checkpoint_wakeup.set()
 
-        self.log_event(
-            "node_transition_detected",
-            transition=transition,
-            node=name,
-            previous=previous,
-            current=current,
-            pending_down=sorted(self.pending_down),
-            pending_recovered=sorted(self.pending_recovered),
-        )
+    def damp_transition(self, name: str, transition: str) -> bool:
+        """Charge a flap penalty; True when the node is suppressed and the transition must not be dispatched."""
+        if self.flap_damper is None:
+            return False
+        node_id = self.state.ids[name]
+        now = time.time()
+        suppressed, newly = self.flap_damper.record(node_id, now)
+        if not suppressed:
+            return False
+
+        self.timer_wheel.schedule(("reuse", name), self.flap_damper.seconds_until_reuse(node_id, now), self.reuse_flapping_node)
+        if newly:
+            # Reported once as flapping; later flips only extend the suppression.
+            self.state.mark_flapping(name)
+            self.metrics.flap_suppressions.inc()
+            self.log_event(
+                "node_flapping_suppressed",
+                node=name,
+                transition=transition,
+                penalty=round(self.flap_damper.current(node_id, now), 1),
+                reuse_in_seconds=round(self.flap_damper.seconds_until_reuse(node_id, now), 1),
+            )
+            self.arm_flush_deadline()
+        return True
+
+    def reuse_flapping_node(self, key: Tuple[str, str]) -> None:
+        name = key[1]
+        with self.state_lock:
+            node_id = self.state.ids.get(name)
+            if node_id is None or self.flap_damper is None:
+                return
+            now = time.time()
+            if not self.flap_damper.release_if_due(node_id, now):
+                if self.flap_damper.is_suppressed(node_id):
+                    delay = max(self.flap_damper.seconds_until_reuse(node_id, now), self.timer_tick_seconds)
+                    self.timer_wheel.schedule(key, delay, self.reuse_flapping_node)
+                return
+
+            # Like a BGP route coming out of suppression, the node's settled status is re-announced.
+            current = self.state.get(name)
+            if current == "True":
+                self.state.mark_recovered(name)
+            else:
+                self.state.mark_down(name)
+            self.log_event("node_flapping_reused", node=name, status=current)
+            self.arm_flush_deadline()
 
     def build_payload(self) -> Dict[str, str]:
-        nodes_down = sorted(self.pending_down)
-        nodes_recovered = sorted(self.pending_recovered)
-        nodes_down_current = sorted(name for name, status in self.node_states.items() if status != "True")
+        nodes_down = self.state.pending_names(self.state.pending_down)
+        nodes_recovered = self.state.pending_names(self.state.pending_recovered)
+        nodes_flapping = self.state.pending_names(self.state.pending_flapping)
+        nodes_down_current = self.state.down_names
+        domains, domains_down = self.failure_domains.group(
+            [self.state.ids[name] for name in nodes_down_current],
+            {
+                "new_down": self.state.pending_down,
+                "recovered": self.state.pending_recovered,
+                "flapping": self.state.pending_flapping,
+            },
+            self.failure_domain_threshold,
+            self.failure_domain_min_down,
+        )
 
         legacy_event = "mixed"
         if nodes_down and nodes_recovered:
@@ -124,6 +446,9 @@ class NodeHealthWatcher:
             event = "incident"
             status = "node-down"
             legacy_event = "incident"
+        elif nodes_flapping and not nodes_recovered:
+            event = "flapping"
+            status = "node-flapping"
         else:
             event = "recovery"
             status = "node-recovered"
@@ -137,13 +462,22 @@ class NodeHealthWatcher:
             error_type = "node_recovered"
             error_code = "NODE_RECOVERED"
             summary = f"Node recovery in {self.cluster_name}: {','.join(nodes_recovered)}"
+        elif event == "flapping":
+            error_type = "node_flapping"
+            error_code = "NODE_FLAPPING"
+            summary = f"Node flapping in {self.cluster_name}: {','.join(nodes_flapping)}"
         else:
             error_type = "node_state_change"
             error_code = "NODE_CHANGE"
             summary = f"Node state changed in {self.cluster_name}"
+        if domains_down:
+            summary = f"{summary} ({'; '.join(domains_down)})"
 
-        table_lines = ["node\tready_status"] + [f"{name}\t{self.node_states.get(name, 'Unknown')}" for name in sorted(self.node_states)]
-        details = f"nodes_down_new={','.join(nodes_down)};nodes_recovered={','.join(nodes_recovered)};nodes_down_current={','.join(nodes_down_current)}"
+        details = (
+            f"nodes_down_new={','.join(nodes_down)};nodes_recovered={','.join(nodes_recovered)};"
+            f"nodes_down_current={','.join(nodes_down_current)};nodes_flapping={','.join(nodes_flapping)};"
+            f"failure_domains_down={','.join(domains_down)}"
+        )
 
         return {
             "cluster": self.cluster_name,
@@ -157,20 +491,49 @@ class NodeHealthWatcher:
             "nodes_down": ",".join(nodes_down),
             "nodes_down_current": ",".join(nodes_down_current),
             "nodes_recovered": ",".join(nodes_recovered),
+            "nodes_flapping": ",".join(nodes_flapping),
             "timestamp": utc_timestamp(),
-            "nodes_table": "\n".join(table_lines),
+            "nodes_table": self.state.nodes_table(),
             "details": details,
             "legacy_event": legacy_event,
+            "flush_seq": str(self.flush_seq),
+            "failure_domains": json.dumps(domains, sort_keys=True, separators=(",", ":")),
+            "failure_domains_down": "; ".join(domains_down),
+            "node_history": json.dumps(
+                self.node_history(nodes_down + nodes_recovered + nodes_flapping), sort_keys=True, separators=(",", ":")
+            ),
         }
 
+    def node_history(self, names: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Recent transitions of the first ``TRANSITION_HISTORY_PAYLOAD_NODES`` reported nodes, keyed by node."""
+        history: Dict[str, List[Dict[str, Any]]] = {}
+        for name in sorted(set(names))[: self.transition_history_payload_nodes]:
+            entries = self.state.transition_history(name)
+            for entry in entries:
+                entry["at"] = (
+                    datetime.fromtimestamp(entry["at"], timezone.utc)
+                    .isoformat(timespec="milliseconds")
+                    .replace("+00:00", "Z")
+                )
+            history[name] = entries
+        return history
+
     def append_incident_log(self, payload: Dict[str, str]) -> None:
+        self.queue_incident_record(payload)
+        self.write_incident_records()
+
+    def queue_incident_record(self, payload: Dict[str, str]) -> None:
         if payload["event"] == "incident":
             recovery_status = "open"
         elif payload["event"] == "recovery":
             recovery_status = "recovered"
+        elif payload["event"] == "flapping":
+            recovery_status = "flapping"
         else:
             recovery_status = "partial"
 
+        nodes_down = [name for name in payload.get("nodes_down", "").split(",") if name]
+        nodes_recovered = [name for name in payload.get("nodes_recovered", "").split(",") if name]
         record: Dict[str, Any] = {
             "service": payload.get("service", ""),
             "log_message": payload.get("summary", ""),
@@ -178,34 +541,103 @@ class NodeHealthWatcher:
             "error_code": payload.get("error_code", ""),
             "datetime": payload.get("timestamp", utc_timestamp()),
             "recovery_status": recovery_status,
+            "cluster": payload.get("cluster", self.cluster_name),
+            "nodes_down": nodes_down,
+            "nodes_recovered": nodes_recovered,
+            "nodes_flapping": [name for name in payload.get("nodes_flapping", "").split(",") if name],
+            "transitions": self.pending_transitions(nodes_down, nodes_recovered),
+            "flush_seq": int(payload.get("flush_seq", self.flush_seq)),
+            "flush_id": self.airflow_dag_run_id(payload),
         }
 
         try:
-            self.incident_log_path.parent.mkdir(parents=True, exist_ok=True)
-            with self.incident_log_path.open("a", encoding="utf-8") as handle:
-                handle.write(json.dumps(record, sort_keys=True))
-                handle.write("\n")
+            if self.incident_seq is None:
+                self.incident_seq = self.incident_log.last_seq()
+            self.incident_seq += 1
+            record["seq"] = self.incident_seq
+            self.incident_records.append(record)
         except Exception as exc:
-            self.log_event("incident_log_write_failed", error=str(exc), path=str(self.incident_log_path))
+            self.log_incident_log_error(exc)
+
+    def write_incident_records(self) -> None:
+        """Write queued records; called without ``state_lock``, since it can fsync, rotate and compress."""
+        if not self.incident_records:
+            return
+        with self.incident_write_lock:
+            records = []
+            while self.incident_records:
+                records.append(self.incident_records.popleft())
+            if not records:
+                return
+            try:
+                # A failed write keeps the records buffered in the writer for its next flush.
+                self.incident_log.write_many(records)
+            except Exception as exc:
+                self.log_incident_log_error(exc)
+
+    def pending_transitions(self, nodes_down: List[str], nodes_recovered: List[str]) -> List[Dict[str, Optional[str]]]:
+        # A node without a recorded previous status was restored from an older checkpoint.
+        transitions: List[Dict[str, Optional[str]]] = []
+        for names, fallback in ((nodes_down, "True"), (nodes_recovered, "False")):
+            for name in names:
+                transitions.append(
+                    {"node": name, "previous": self.state.previous_status(name) or fallback, "current": self.state.last_status(name)}
+                )
+        return transitions
 
-    def trigger_airflow(self, payload: Dict[str, str]) -> bool:
+    def open_incident_log(self) -> None:
+        # Scanning an existing active segment parses the whole file, so it is done before
+        # the watch starts rather than on the first flush, which runs under state_lock.
+        try:
+            self.incident_log.open()
+            self.incident_seq = self.incident_log.last_seq()
+        except Exception as exc:
+            self.log_incident_log_error(exc)
+
+    def log_incident_log_error(self, exc: Exception) -> None:
+        self.log_event("incident_log_write_failed", error=str(exc), path=str(self.incident_log_path))
+
+    def sink_timeout(self, deadline: Optional[float] = None) -> Tuple[float, float]:
+        read_timeout = float(self.airflow_timeout_seconds)
+        if deadline is not None:
+            read_timeout = max(min(read_timeout, deadline - time.monotonic()), 0.1)
+        return (self.http_connect_timeout_seconds, read_timeout)
+
+    def airflow_dag_run_id(self, payload: Dict[str, str]) -> str:
+        digest = hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        cluster = re.sub(r"[^A-Za-z0-9_.~:+-]", "-", payload.get("cluster", self.cluster_name))
+        return f"node-health__{cluster}__{payload.get('flush_seq', '0')}__{digest}"
+
+    def trigger_airflow(self, payload: Dict[str, str], deadline: Optional[float] = None) -> bool:
         if not self.airflow_base_url or not self.airflow_username or not self.airflow_password:
             self.log_event("airflow_trigger_skipped_missing_config", payload=payload)
             return False
 
         url = f"{self.airflow_base_url}/api/v1/dags/{self.airflow_dag_id}/dagRuns"
-        body = {"conf": payload}
+        dag_run_id = self.airflow_dag_run_id(payload)
+        body = {"dag_run_id": dag_run_id, "conf": payload}
 
         for attempt in range(1, self.airflow_max_retries + 1):
             try:
-                response = requests.post(
-                    url,
-                    auth=(self.airflow_username, self.airflow_password),
-                    json=body,
-                    timeout=self.airflow_timeout_seconds,
-                )
+                with self.metrics.sink_latency.time("airflow"):
+                    response = self.airflow_session.post(
+                        url,
+                        auth=(self.airflow_username, self.airflow_password),
+                        json=body,
+                        timeout=self.sink_timeout(deadline),
+                    )
                 if 200 <= response.status_code < 300:
-                    self.log_event("airflow_triggered", attempt=attempt, status_code=response.status_code, url=url)
+                    self.log_event(
+                        "airflow_triggered",
+                        attempt=attempt,
+                        status_code=response.status_code,
+                        url=url,
+                        dag_run_id=dag_run_id,
+                    )
+                    return True
+                if response.status_code == HTTP_STATUS_CONFLICT:
+                    # An earlier attempt or replay already created this run.
+                    self.log_event("airflow_dag_run_exists", attempt=attempt, url=url, dag_run_id=dag_run_id)
                     return True
 
                 message = response.text[:500]
@@ -222,11 +654,14 @@ class NodeHealthWatcher:
                 if attempt == self.airflow_max_retries:
                     self.log_event("airflow_trigger_failed", error=str(exc), payload=payload)
                     return False
+                if deadline is not None and time.monotonic() + sleep_seconds >= deadline:
+                    self.log_event("airflow_trigger_failed", error="deadline exceeded", attempt=attempt, payload=payload)
+                    return False
                 time.sleep(sleep_seconds)
 
         return False
 
-    def trigger_github_dispatch(self, payload: Dict[str, str]) -> bool:
+    def trigger_github_dispatch(self, payload: Dict[str, str], deadline: Optional[float] = None) -> bool:
         if not self.gha_dispatch_url or not self.gha_token:
             self.log_event("github_dispatch_skipped_missing_config", payload=payload)
             return False
@@ -237,15 +672,16 @@ class NodeHealthWatcher:
         }
 
         try:
-            response = requests.post(
-                self.gha_dispatch_url,
-                headers={
-                    "Accept": "application/vnd.github+json",
-                    "Authorization": f"token {self.gha_token}",
-                },
-                json=body,
-                timeout=self.airflow_timeout_seconds,
-            )
+            with self.metrics.sink_latency.time("github"):
+                response = self.github_session.post(
+                    self.gha_dispatch_url,
+                    headers={
+                        "Accept": "application/vnd.github+json",
+                        "Authorization": f"token {self.gha_token}",
+                    },
+                    json=body,
+                    timeout=self.sink_timeout(deadline),
+                )
             if 200 <= response.status_code < 300:
                 self.log_event(
                     "github_dispatch_triggered",
@@ -266,53 +702,579 @@ class NodeHealthWatcher:
             return False
 
     def flush_if_due(self, force: bool = False) -> None:
-        if not self.pending_down and not self.pending_recovered:
-            return
+        try:
+            self.flush_pending(force)
+        finally:
+            self.write_incident_records()
+
+    def flush_pending(self, force: bool = False) -> None:
+        with self.state_lock:
+            if not self.state.pending_count():
+                self.flush_deadline = None
+                return
+
+            if not force and self.flush_deadline is not None and time.time() < self.flush_deadline:
+                return
+
+            if self.outbox is None and self.dispatch_queue.full():
+                # Nothing would keep the payload, so the window stays pending and the next flush retries it.
+                self.flush_deadline = time.time() + self.watch_debounce_seconds
+                self.log_event("flush_deferred_queue_full", pending=self.state.pending_count(), queue=self.dispatch_queue.stats())
+                return
+
+            flush_lag_seconds = max(time.time() - self.flush_deadline, 0.0) if self.flush_deadline is not None else 0.0
+            self.flush_seq += 1
+            with self.metrics.build_payload.time():
+                payload = self.build_payload()
+            self.metrics.flushes.inc(payload["event"])
+            if payload["failure_domains_down"]:
+                self.log_event("failure_domain_threshold_crossed", domains=payload["failure_domains_down"].split("; "))
+            self.queue_incident_record(payload)
+            if self.enqueue_dispatch(payload, detected_at=self.window_started_at):
+                self.log_event(
+                    "flush_queued",
+                    flush_lag_seconds=round(flush_lag_seconds, 3),
+                    forced=force,
+                    queue=self.dispatch_queue.stats(),
+                )
+
+            if self.storm_active:
+                self.log_event(
+                    "storm_mode_summary",
+                    transitions=self.window_transitions,
+                    nodes_down=len(self.state.pending_down),
+                    nodes_recovered=len(self.state.pending_recovered),
+                )
+
+            self.state.clear_pending()
+            self.flush_deadline = None
+            self.window_started_at = None
+            self.checkpoint_dirty = True
+            self.checkpoint_wakeup.set()
+            self.storm_active = False
+            self.window_transitions = 0
 
-        if not force and self.flush_deadline is not None and time.time() < self.flush_deadline:
+    def build_checkpoint(self) -> Dict[str, Any]:
+        """Snapshot the state and mark it clean; a caller whose write fails marks it dirty again."""
+        # Only flat copies of the per-node arrays are taken under the lock, so the per-node
+        # export below never stalls watch ingestion, however often a storm triggers a checkpoint.
+        with self.state_lock:
+            names, ids, statuses = self.state.copy_arrays()
+            domains = self.failure_domains.copy()
+            checkpoint: Dict[str, Any] = {
+                "cluster": self.cluster_name,
+                "saved_at": time.time(),
+                "resource_version": self.resource_version,
+                "flush_deadline": self.flush_deadline,
+                "flush_seq": self.flush_seq,
+                "pending_down": self.state.pending_names(self.state.pending_down),
+                "pending_recovered": self.state.pending_names(self.state.pending_recovered),
+                "pending_flapping": self.state.pending_names(self.state.pending_flapping),
+                "pending_previous": self.state.previous_statuses(),
+                "pending_deleted": self.state.deleted_statuses_by_name(),
+            }
+            self.checkpoint_dirty = False
+        checkpoint["names"], checkpoint["statuses"] = export_statuses(names, ids, statuses)
+        checkpoint["failure_domains"] = domains.export(ids)
+        return checkpoint
+
+    def save_checkpoint(self) -> bool:
+        if self.checkpoint_path is None:
+            return False
+        checkpoint = self.build_checkpoint()
+        # A flush clears its pending state once its outbox entry is appended, so that entry
+        # must be on disk before a checkpoint without the pending state can replace the old one.
+        if not self.sync_outbox():
+            self.checkpoint_dirty = True
+            return False
+        try:
+            write_checkpoint(self.checkpoint_path, checkpoint)
+        except Exception as exc:
+            self.checkpoint_dirty = True
+            self.log_event("checkpoint_write_failed", error=str(exc), path=str(self.checkpoint_path))
+            return False
+        self.checkpointed_resource_version = checkpoint["resource_version"]
+        return True
+
+    def restore_checkpoint(self) -> bool:
+        if self.checkpoint_path is None:
+            return False
+        try:
+            checkpoint = read_checkpoint(self.checkpoint_path)
+        except Exception as exc:
+            self.log_event("checkpoint_load_failed", error=str(exc), path=str(self.checkpoint_path))
+            return False
+        if checkpoint is None:
+            return False
+        if checkpoint.get("cluster") != self.cluster_name:
+            self.log_event("checkpoint_cluster_mismatch", checkpoint_cluster=checkpoint.get("cluster"))
+            return False
+
+        with self.state_lock:
+            self.state.restore(checkpoint["names"], checkpoint["statuses"])
+            self.failure_domains.restore(self.state.ids, checkpoint.get("failure_domains", {}))
+            self.pending_down = set(checkpoint.get("pending_down", []))
+            self.pending_recovered = set(checkpoint.get("pending_recovered", []))
+            self.state.set_pending(self.state.pending_flapping, checkpoint.get("pending_flapping", []))
+            self.state.set_previous_statuses(checkpoint.get("pending_previous", {}))
+            self.state.set_deleted_statuses(checkpoint.get("pending_deleted", {}))
+            self.flush_deadline = checkpoint.get("flush_deadline")
+            self.flush_seq = checkpoint.get("flush_seq", self.flush_seq)
+            if self.flush_deadline is None and self.state.pending_count():
+                self.flush_deadline = time.time()
+
+        self.log_event(
+            "checkpoint_restored",
+            nodes=len(checkpoint["names"]),
+            pending_down=len(checkpoint.get("pending_down", [])),
+            pending_recovered=len(checkpoint.get("pending_recovered", [])),
+            resource_version=checkpoint.get("resource_version"),
+            age_seconds=round(time.time() - checkpoint.get("saved_at", time.time()), 3),
+        )
+        return True
+
+    def run_checkpointer(self) -> None:
+        while True:
+            self.checkpoint_wakeup.wait(self.checkpoint_interval_seconds)
+            self.checkpoint_wakeup.clear()
+            if self.checkpoint_dirty or self.resource_version != self.checkpointed_resource_version:
+                self.save_checkpoint()
+            time.sleep(self.checkpoint_min_interval_seconds)
+
+    def run_flush_scheduler(self) -> None:
+        while True:
+            with self.state_lock:
+                while self.flush_deadline is None:
+                    self.state_lock.wait()
+                remaining = self.flush_deadline - time.time()
+                if remaining > 0:
+                    self.state_lock.wait(remaining)
+                    continue
+            # Outside the lock, so the incident log write after the flush does not hold it.
+            try:
+                self.flush_if_due()
+            except Exception as exc:
+                self.log_event("flush_error", error=str(exc))
+                with self.state_lock:
+                    self.flush_deadline = time.time() + self.watch_debounce_seconds
+
+    def configured_sinks(self) -> List[str]:
+        sinks = []
+        if self.airflow_base_url and self.airflow_username and self.airflow_password:
+            sinks.append("airflow")
+        if self.gha_dispatch_url and self.gha_token:
+            sinks.append("github")
+        return sinks
+
+    def open_outbox(self) -> None:
+        if self.outbox_path is None:
             return
+        self.outbox = Outbox(self.outbox_path, compact_threshold=self.outbox_compact_threshold)
+        replayed = self.outbox.load()
+        self.log_event("outbox_loaded", path=str(self.outbox_path), pending_entries=len(replayed))
 
-        payload = self.build_payload()
-        self.append_incident_log(payload)
-        airflow_ok = self.trigger_airflow(payload)
-        gha_ok = self.trigger_github_dispatch(payload)
-        self.log_event("flush_dispatched", airflow_ok=airflow_ok, github_dispatch_ok=gha_ok, payload=payload)
+    def enqueue_dispatch(self, payload: Dict[str, str], detected_at: Optional[float] = None) -> bool:
+        sinks = self.configured_sinks()
+        if self.outbox is None or not sinks:
+            job = DispatchJob(payload, detected_at=detected_at)
+        else:
+            entry = self.outbox.put(payload, sinks)
+            job = DispatchJob(payload, tuple(sinks), entry, detected_at)
 
-        self.pending_down.clear()
-        self.pending_recovered.clear()
-        self.flush_deadline = None
+        if self.dispatch_queue.submit(job):
+            return True
+        if job.entry is not None:
+            job.entry.in_flight = False
+            job.entry.next_attempt_at = time.time() + self.outbox_retry_interval_seconds
+            # No worker will sync this entry soon, and the flush is about to clear its pending state.
+            self.sync_outbox(job.entry.seq)
+        self.log_event("dispatch_queue_full", queue=self.dispatch_queue.stats(), payload=payload, outbox=job.entry is not None)
+        return False
 
-    def run(self) -> None:
-        self.load_k8s_config()
-        api = client.CoreV1Api()
-        self.prime_node_state(api)
+    def sync_outbox(self, seq: Optional[int] = None) -> bool:
+        if self.outbox is None:
+            return True
+        try:
+            self.outbox.sync(seq)
+        except Exception as exc:
+            self.log_event("outbox_write_failed", error=str(exc), path=str(self.outbox_path))
+            return False
+        return True
+
+    def retry_outbox(self) -> None:
+        if self.outbox is None:
+            return
+        now = time.time()
+        for entry in self.outbox.due(now):
+            if now - entry.created_at > self.outbox_max_age_seconds:
+                self.outbox.drop(entry.entry_id)
+                self.log_event("outbox_entry_expired", entry_id=entry.entry_id, sinks=entry.sinks, payload=entry.payload)
+                continue
+            entry.in_flight = True
+            if not self.dispatch_queue.submit(DispatchJob(entry.payload, tuple(entry.sinks), entry)):
+                entry.in_flight = False
+                break
+            self.log_event("outbox_redelivery_queued", entry_id=entry.entry_id, sinks=entry.sinks)
+        self.outbox.maybe_compact()
 
+    def run_outbox_retrier(self) -> None:
         while True:
+            try:
+                self.retry_outbox()
+            except Exception as exc:
+                self.log_event("outbox_retry_error", error=str(exc))
+            time.sleep(self.outbox_retry_interval_seconds)
+
+    def dispatch_job(self, job: DispatchJob, queued_seconds: float) -> None:
+        try:
+            payload = job.payload
+            if job.entry is not None:
+                self.sync_outbox(job.entry.seq)
+
+            started = time.monotonic()
+            airflow_deadline = started + self.airflow_deadline_seconds
+            gha_deadline = started + self.gha_deadline_seconds
+            calls = {
+                "airflow": lambda: self.trigger_airflow(payload, deadline=airflow_deadline),
+                "github": lambda: self.trigger_github_dispatch(payload, deadline=gha_deadline),
+            }
+            deadlines = {"airflow": airflow_deadline, "github": gha_deadline}
+            results = fan_out(
+                self.sink_executor,
+                {sink: calls[sink] for sink in job.sinks},
+                {sink: deadlines[sink] for sink in job.sinks},
+            )
+            for sink, result in results.items():
+                self.metrics.dispatches.inc(sink, "ok" if result.ok else "failed")
+                if result.error:
+                    self.log_event("dispatch_error", sink=sink, error=result.error, payload=payload)
+            if job.detected_at is not None and any(result.ok for result in results.values()):
+                self.metrics.detection_to_dispatch.observe(time.time() - job.detected_at)
+
+            if job.entry is not None and self.outbox is not None:
+                for sink, result in results.items():
+                    if result.ok:
+                        self.outbox.ack(job.entry.entry_id, sink)
+
+            self.log_event(
+                "flush_dispatched",
+                airflow_ok=results["airflow"].ok if "airflow" in results else None,
+                github_dispatch_ok=results["github"].ok if "github" in results else None,
+                outbox_entry_id=job.entry.entry_id if job.entry is not None else None,
+                sink_latency_seconds={sink: round(result.seconds, 3) for sink, result in results.items()},
+                dispatch_seconds=round(time.monotonic() - started, 3),
+                queue_wait_seconds=round(queued_seconds, 3),
+                queue=self.dispatch_queue.stats(),
+                payload=payload,
+            )
+        finally:
+            # Even if delivery raised, the entry must become due again or it is never redelivered.
+            if job.entry is not None:
+                job.entry.next_attempt_at = time.time() + self.outbox_retry_interval_seconds
+                job.entry.in_flight = False
+
+    def watch_kwargs(self) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {
+            "allow_watch_bookmarks": True,
+            "timeout_seconds": self.watch_timeout_seconds,
+        }
+        if self.resource_version:
+            kwargs["resource_version"] = self.resource_version
+        return kwargs
+
+    def handle_watch_event(self, event: Dict[str, Any]) -> None:
+        event_type = event.get("type")
+        self.metrics.watch_events.inc(str(event_type))
+        self.mark_watch_activity()
+
+        if event_type == "BOOKMARK":
+            raw_object = event.get("raw_object") or {}
+            resource_version = (raw_object.get("metadata") or {}).get("resourceVersion")
+            if resource_version:
+                self.resource_version = resource_version
+            return
+
+        node = event.get("object")
+        if not isinstance(node, V1Node):
+            return
+
+        if node.metadata.resource_version:
+            self.resource_version = node.metadata.resource_version
+
+        if event_type == "DELETED":
+            self.forget_node(node.metadata.name)
+            return
+
+        self.handle_node_update(node)
+
+    def handle_raw_watch_event(self, event: Dict[str, Any]) -> None:
+        event_type = event.get("type")
+        raw_object = event.get("object") or {}
+        self.metrics.watch_events.inc(str(event_type))
+        self.mark_watch_activity()
+
+        if event_type == "ERROR":
+            raise ApiException(
+                status=raw_object.get("code"),
+                reason=f"{raw_object.get('reason')}: {raw_object.get('message')}",
+            )
+
+        metadata = raw_object.get("metadata") or {}
+        resource_version = metadata.get("resourceVersion")
+        if resource_version:
+            self.resource_version = resource_version
+
+        if event_type == "BOOKMARK" or raw_object.get("kind") != "Node":
+            return
+
+        name = metadata.get("name")
+        if not name:
+            return
+
+        if event_type == "DELETED":
+            self.forget_node(name)
+            return
+
+        with self.metrics.handle_node_update.time():
+            self.apply_node_status(name, self.raw_ready_status(raw_object), resource_version=resource_version)
+            self.update_node_domains(name, metadata.get("labels"))
+
+    def forget_node(self, name: str, source: str = "watch") -> None:
+        # Everything keyed by the node ID is reset here, since the ID is handed to the next new node.
+        with self.state_lock:
+            self.lease_suspects.pop(name, None)
+            self.timer_wheel.cancel(("escalate", name))
+            self.timer_wheel.cancel(("reuse", name))
+            node_id = self.state.ids.get(name)
+            if node_id is not None:
+                self.failure_domains.remove(node_id)
+                if self.flap_damper is not None:
+                    self.flap_damper.reset(node_id)
+            self.state.remove(name)
+            self.checkpoint_dirty = True
+        self.log_event("node_deleted", node=name, source=source)
+
+    def stream_raw_events(self, api: client.CoreV1Api) -> Iterator[Dict[str, Any]]:
+        response = api.list_node(watch=True, _preload_content=False, **self.watch_kwargs())
+        try:
+            for line in iter_resp_lines(response):
+                yield json.loads(line)
+        finally:
+            response.close()
+            response.release_conn()
+
+    def consume_watch(self, api: client.CoreV1Api, watcher: watch.Watch) -> None:
+        if self.watch_decode_mode == "raw":
+            for raw_event in self.stream_raw_events(api):
+                self.handle_raw_watch_event(raw_event)
+                self.flush_if_due()
+            return
+
+        for event in watcher.stream(api.list_node, **self.watch_kwargs()):
+            self.handle_watch_event(event)
             self.flush_if_due()
+
+    def handle_lease(self, name: str, renew_time: Optional[datetime]) -> None:
+        if renew_time is None:
+            return
+        renewed_at = renew_time.timestamp()
+        with self.state_lock:
+            if self.lease_renewals.get(name) == renewed_at:
+                return
+            first_seen = name not in self.lease_renewals
+            self.lease_renewals[name] = renewed_at
+            # The deadline runs from when we saw the renewal, so kubelet clock skew cannot
+            # make a live node look stale; only a lease first seen on (re)list uses its age.
+            delay = self.lease_stale_seconds
+            if first_seen:
+                delay -= max(time.time() - renewed_at, 0.0)
+            self.timer_wheel.schedule(("lease", name), delay, self.expire_lease_timer)
+
+            reported = self.lease_suspects.pop(name, None)
+            if reported is not None:
+                self.log_event("node_lease_renewed", node=name, status=reported)
+                self.apply_node_status(name, reported, from_lease=True)
+
+    def escalate_down_node(self, key: Tuple[str, str]) -> None:
+        name = key[1]
+        with self.state_lock:
+            status = self.state.get(name)
+            if status is None or status == "True":
+                return
+        self.metrics.escalations.inc()
+        self.log_event("node_down_escalation", node=name, status=status, down_seconds=self.node_down_escalation_seconds)
+
+    def expire_lease_timer(self, key: Tuple[str, str]) -> None:
+        self.expire_lease(key[1])
+
+    def expire_lease(self, name: str) -> None:
+        with self.state_lock:
+            current = self.state.get(name)
+            if current is None or name in self.lease_suspects:
+                return
+            self.lease_suspects[name] = current
+            renewed_at = self.lease_renewals.get(name)
+            self.log_event(
+                "node_lease_stale",
+                node=name,
+                renew_age_seconds=round(time.time() - renewed_at, 3) if renewed_at is not None else None,
+                threshold_seconds=self.lease_stale_seconds,
+            )
+            self.apply_node_status(name, "Unknown", from_lease=True)
+
+    def forget_lease(self, name: str) -> None:
+        self.timer_wheel.cancel(("lease", name))
+        with self.state_lock:
+            self.lease_renewals.pop(name, None)
+            reported = self.lease_suspects.pop(name, None)
+            if reported is not None:
+                self.apply_node_status(name, reported, from_lease=True)
+
+    def handle_lease_event(self, event: Dict[str, Any]) -> Optional[str]:
+        """Apply one Lease watch event and return its resourceVersion."""
+        if event.get("type") == "BOOKMARK":
+            return ((event.get("raw_object") or {}).get("metadata") or {}).get("resourceVersion")
+        lease = event.get("object")
+        if not isinstance(lease, V1Lease):
+            return None
+        if event.get("type") == "DELETED":
+            self.forget_lease(lease.metadata.name)
+        else:
+            self.handle_lease(lease.metadata.name, lease.spec.renew_time if lease.spec else None)
+        return lease.metadata.resource_version
+
+    def run_lease_watch(self) -> None:
+        api = client.CoordinationV1Api()
+        resource_version: Optional[str] = None
+        while True:
             watcher = watch.Watch()
             try:
-                stream = watcher.stream(api.list_node, timeout_seconds=30)
-                for event in stream:
-                    event_type = event.get("type")
-                    node = event.get("object")
-
-                    if not isinstance(node, V1Node):
-                        continue
-
-                    if event_type == "DELETED":
-                        name = node.metadata.name
-                        self.node_states.pop(name, None)
-                        self.log_event("node_deleted", node=name)
-                        continue
-
-                    self.handle_node_update(node)
-                    self.flush_if_due()
+                if resource_version is None:
+                    leases = api.list_namespaced_lease(self.lease_namespace)
+                    for lease in leases.items:
+                        self.handle_lease(lease.metadata.name, lease.spec.renew_time if lease.spec else None)
+                    resource_version = leases.metadata.resource_version
+                for event in watcher.stream(
+                    api.list_namespaced_lease,
+                    self.lease_namespace,
+                    resource_version=resource_version,
+                    allow_watch_bookmarks=True,
+                    timeout_seconds=self.watch_timeout_seconds,
+                ):
+                    resource_version = self.handle_lease_event(event) or resource_version
+            except ApiException as exc:
+                if exc.status == HTTP_STATUS_GONE:
+                    self.log_event("lease_watch_resource_version_expired", resource_version=resource_version)
+                    resource_version = None
+                else:
+                    self.log_event("lease_watch_error", error=str(exc), status=exc.status)
+                    time.sleep(2)
             except Exception as exc:
-                self.log_event("watch_stream_error", error=str(exc))
+                self.log_event("lease_watch_error", error=str(exc))
                 time.sleep(2)
             finally:
                 watcher.stop()
 
+    def log_dispatch_error(self, exc: Exception) -> None:
+        self.log_event("dispatch_job_failed", error=str(exc))
+
+    def log_timer_error(self, exc: Exception) -> None:
+        self.log_event("timer_callback_failed", error=str(exc))
+
+    def mark_watch_activity(self) -> None:
+        self.last_watch_activity = time.monotonic()
+
+    def watch_activity_age_seconds(self) -> float:
+        return time.monotonic() - self.last_watch_activity
+
+    def health_status(self) -> Tuple[bool, Dict[str, Any]]:
+        # Any event, bookmark, list page or cleanly closed stream counts; a half-open
+        # connection produces none of these and trips the stall threshold.
+        age = self.watch_activity_age_seconds()
+        return age <= self.watch_stall_seconds, {
+            "watch_activity_age_seconds": round(age, 3),
+            "watch_stall_seconds": self.watch_stall_seconds,
+        }
+
+    def readiness_status(self) -> Tuple[bool, Dict[str, Any]]:
+        healthy, details = self.health_status()
+        queue_age = self.dispatch_queue.oldest_age_seconds()
+        details.update(
+            primed=self.primed,
+            dispatch_queue_oldest_age_seconds=round(queue_age, 3),
+            dispatch_latency_budget_seconds=self.dispatch_latency_budget_seconds,
+        )
+        return healthy and self.primed and queue_age <= self.dispatch_latency_budget_seconds, details
+
+    @staticmethod
+    def probe_response(status: Tuple[bool, Dict[str, Any]]) -> Tuple[int, str, str]:
+        ok, details = status
+        body = json.dumps({"status": "ok" if ok else "failing", **details}, sort_keys=True) + "\n"
+        return (200 if ok else 503), "application/json", body
+
+    def start_metrics_server(self) -> None:
+        if self.metrics_port is None or self.metrics_server is not None:
+            return
+        self.metrics_server = MetricsServer(self.metrics.registry, self.metrics_port)
+        self.metrics_server.add_route("/healthz", lambda: self.probe_response(self.health_status()))
+        self.metrics_server.add_route("/readyz", lambda: self.probe_response(self.readiness_status()))
+        self.metrics_server.start()
+        self.log_event("metrics_server_started", port=self.metrics_server.port)
+
+    def run(self) -> None:
+        self.start_metrics_server()
+        self.load_k8s_config()
+        api = client.CoreV1Api()
+        if self.restore_checkpoint():
+            self.resync_node_state(api)
+        else:
+            self.prime_node_state(api)
+        self.primed = True
+        self.save_checkpoint()
+        self.open_outbox()
+        self.open_incident_log()
+        self.incident_log.start(on_error=self.log_incident_log_error)
+        self.dispatch_queue.start(on_error=self.log_dispatch_error)
+        if self.outbox is not None:
+            threading.Thread(target=self.run_outbox_retrier, name="outbox-retrier", daemon=True).start()
+        threading.Thread(target=self.run_flush_scheduler, name="flush-scheduler", daemon=True).start()
+        self.timer_wheel.start(on_error=self.log_timer_error)
+        if self.lease_detection:
+            threading.Thread(target=self.run_lease_watch, name="lease-watch", daemon=True).start()
+        if self.checkpoint_path is not None:
+            threading.Thread(target=self.run_checkpointer, name="checkpointer", daemon=True).start()
+
+        while True:
+            self.flush_if_due()
+            self.watch_once(api)
+
+    def watch_once(self, api: client.CoreV1Api) -> None:
+        watcher = watch.Watch()
+        try:
+            self.consume_watch(api, watcher)
+            # The server closed the stream at timeout_seconds, so the connection was alive.
+            self.mark_watch_activity()
+        except ApiException as exc:
+            # A stream closed at timeout_seconds is routine; only reopening after a failure counts as a reconnect.
+            self.metrics.watch_reconnects.inc()
+            if exc.status != HTTP_STATUS_GONE:
+                self.log_event("watch_stream_error", error=str(exc), status=exc.status)
+                time.sleep(2)
+                return
+            self.log_event("watch_resource_version_expired", resource_version=self.resource_version)
+            self.resource_version = None
+            try:
+                self.resync_node_state(api)
+            except Exception as resync_exc:
+                self.log_event("node_state_resync_failed", error=str(resync_exc))
+                time.sleep(2)
+        except Exception as exc:
+            self.metrics.watch_reconnects.inc()
+            self.log_event("watch_stream_error", error=str(exc))
+            time.sleep(2)
+        finally:
+            watcher.stop()
+
 
 def main() -> None:
     log_level = os.getenv("LOG_LEVEL", "INFO").upper()
@@ -0,0 +1,292 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+LabelValues = Tuple[str, ...]
+Route = Callable[[], Tuple[int, str, str]]
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names: Sequence[str], values: Sequence[str], extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label(value)}"' for name, value in pairs) + "}"
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """Exposition lines for every series, without the HELP and TYPE header."""
+
+    def render(self) -> List[str]:
+        return self.header() + self.samples()
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, help_text, labels)
+        self.values: Dict[LabelValues, float] = {} if self.labels else {(): 0.0}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        with self.lock:
+            return self.values.get(label_values, 0.0)
+
+    def samples(self) -> List[str]:
+        with self.lock:
+            values = sorted(self.values.items())
+        return [f"{self.name}{format_labels(self.labels, key)} {format_value(value)}" for key, value in values]
+
+
+class Gauge(Metric):
+    """A gauge that is set directly or, with ``function``, read at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, function: Optional[Callable[[], float]] = None) -> None:
+        super().__init__(name, help_text)
+        self.function = function
+        self.current = 0.0
+
+    def set(self, value: float) -> None:
+        with self.lock:
+            self.current = value
+
+    def value(self) -> float:
+        if self.function is not None:
+            return float(self.function())
+        with self.lock:
+            return self.current
+
+    def samples(self) -> List[str]:
+        return [f"{self.name} {format_value(self.value())}"]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (last slot is +Inf), sum and count.
+        self.series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = ([0] * (len(self.buckets) + 1), [0.0, 0.0])
+            series[0][index] += 1
+            series[1][0] += value
+            series[1][1] += 1
+
+    @contextmanager
+    def time(self, *label_values: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *label_values)
+
+    def count(self, *label_values: str) -> int:
+        with self.lock:
+            series = self.series.get(label_values)
+            return int(series[1][1]) if series is not None else 0
+
+    def samples(self) -> List[str]:
+        with self.lock:
+            series = sorted((key, (list(counts), list(totals))) for key, (counts, totals) in self.series.items())
+        lines = []
+        for key, (counts, (total, count)) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = format_labels(self.labels, key, [("le", format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.labels, key)} {format_value(total)}")
+            lines.append(f"{self.name}_count{format_labels(self.labels, key)} {format_value(count)}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help_text, labels))  # type: ignore[return-value]
+
+    def gauge(self, name: str, help_text: str, function: Optional[Callable[[], float]] = None) -> Gauge:
+        return self.register(Gauge(name, help_text, function))  # type: ignore[return-value]
+
+    def histogram(
+        self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, help_text, labels, buckets))  # type: ignore[return-value]
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serves ``/metrics`` (and any extra routes) from a daemon thread."""
+
+    def __init__(self, registry: Registry, port: int, host: str = "0.0.0.0") -> None:
+        self.registry = registry
+        self.routes: Dict[str, Route] = {"/metrics": lambda: (200, CONTENT_TYPE, registry.render())}
+        self.server = ThreadingHTTPServer((host, port), self.handler_class())
+        self.server.daemon_threads = True
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    def add_route(self, path: str, route: Route) -> None:
+        self.routes[path] = route
+
+    def handler_class(self) -> type:
+        routes = self.routes
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                route = routes.get(self.path.split("?", 1)[0])
+                if route is None:
+                    status, content_type, body = 404, "text/plain; charset=utf-8", "not found\n"
+                else:
+                    try:
+                        status, content_type, body = route()
+                    except Exception as exc:
+                        status, content_type, body = 500, "text/plain; charset=utf-8", f"{exc}\n"
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args: object) -> None:
+                pass
+
+        return Handler
+
+    def start(self) -> None:
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.server.serve_forever, name="metrics-server", daemon=True)
+            self.thread.start()
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class WatcherMetrics:
+    """The watcher's own instruments; gauges are read from live state at scrape time."""
+
+    def __init__(
+        self,
+        nodes_down: Callable[[], float],
+        pending_down: Callable[[], float],
+        pending_recovered: Callable[[], float],
+        queue_depth: Callable[[], float],
+        queue_in_flight: Callable[[], float],
+        watch_activity_age: Callable[[], float],
+        timers: Callable[[], float],
+        flapping: Callable[[], float],
+    ) -> None:
+        self.registry = Registry()
+        registry = self.registry
+        self.watch_events = registry.counter(
+            "node_health_watch_events_total", "Node watch events received, by event type.", ["type"]
+        )
+        self.watch_reconnects = registry.counter(
+            "node_health_watch_reconnects_total",
+            "Times the node watch stream was reopened after an error or an expired resourceVersion.",
+        )
+        self.transitions = registry.counter(
+            "node_health_transitions_total", "Actionable Ready transitions detected.", ["transition"]
+        )
+        self.flushes = registry.counter("node_health_flushes_total", "Debounced flushes, by payload event.", ["event"])
+        self.dispatches = registry.counter(
+            "node_health_dispatch_total", "Sink deliveries, by sink and outcome.", ["sink", "outcome"]
+        )
+        self.escalations = registry.counter(
+            "node_health_escalations_total", "Nodes still down NODE_DOWN_ESCALATION_SECONDS after going down."
+        )
+        self.flap_suppressions = registry.counter(
+            "node_health_flap_suppressions_total", "Nodes suppressed by flap damping."
+        )
+        self.detection_to_dispatch = registry.histogram(
+            "node_health_detection_to_dispatch_seconds",
+            "Time from the first transition of a flush window to its first successful sink delivery.",
+            buckets=(1.0, 2.5, 5.0, 10.0, 15.0, 20.0, 30.0, 45.0, 60.0, 90.0, 120.0, 300.0, 600.0),
+        )
+        self.sink_latency = registry.histogram(
+            "node_health_sink_request_seconds", "Latency of one HTTP request to a sink, per attempt.", ["sink"]
+        )
+        self.handle_node_update = registry.histogram(
+            "node_health_handle_node_update_seconds",
+            "Time to apply one node update to the watcher state.",
+            buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05),
+        )
+        self.build_payload = registry.histogram(
+            "node_health_build_payload_seconds",
+            "Time to build one flush payload.",
+            buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+        )
+        registry.gauge("node_health_nodes_down", "Nodes currently not Ready.", nodes_down)
+        registry.gauge("node_health_pending_down", "Nodes pending in the next flush as down.", pending_down)
+        registry.gauge("node_health_pending_recovered", "Nodes pending in the next flush as recovered.", pending_recovered)
+        registry.gauge("node_health_dispatch_queue_depth", "Dispatch jobs waiting for a worker.", queue_depth)
+        registry.gauge("node_health_dispatch_in_flight", "Dispatch jobs being delivered.", queue_in_flight)
+        registry.gauge(
+            "node_health_watch_activity_age_seconds",
+            "Seconds since the last watch event, bookmark, list page or clean stream close.",
+            watch_activity_age,
+        )
+        registry.gauge("node_health_flapping_nodes", "Nodes currently suppressed by flap damping.", flapping)
+        registry.gauge("node_health_timers", "Outstanding per-node timers on the timer wheel.", timers)
@@ -0,0 +1,190 @@
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+
+class OutboxEntry:
+    __slots__ = ("entry_id", "payload", "sinks", "created_at", "seq", "in_flight", "next_attempt_at")
+
+    def __init__(
+        self,
+        entry_id: str,
+        payload: Dict[str, str],
+        sinks: Sequence[str],
+        created_at: float,
+        seq: int,
+        in_flight: bool = False,
+    ) -> None:
+        self.entry_id = entry_id
+        self.payload = payload
+        self.sinks = list(sinks)
+        self.created_at = created_at
+        self.seq = seq
+        self.in_flight = in_flight
+        self.next_attempt_at = 0.0
+
+
+class Outbox:
+    """Append-only NDJSON log of dispatch payloads with per-sink acknowledgements.
+
+    ``put`` records are buffered and made durable by group commit: the first
+    caller of ``sync`` writes and fsyncs everything appended so far while later
+    callers wait for that fsync instead of issuing their own. ``ack`` records
+    are appended lazily, so a crash can lose one and redeliver that payload
+    to its sink: delivery is at-least-once. Airflow drops the duplicate by its
+    deterministic ``dag_run_id``; GitHub ``repository_dispatch`` has no such
+    key and starts the workflow again. Once enough entries are fully
+    acknowledged the file is rewritten with only the outstanding ones.
+    """
+
+    def __init__(self, path: Path, compact_threshold: int = 1000) -> None:
+        self.path = path
+        self.compact_threshold = compact_threshold
+        self.entries: Dict[str, OutboxEntry] = {}
+
+        self._condition = threading.Condition()
+        self._buffer: List[str] = []
+        self._appended_seq = 0
+        self._durable_seq = 0
+        self._committing = False
+        self._completed_since_compaction = 0
+        self._handle: Optional[Any] = None
+
+    def load(self) -> List[OutboxEntry]:
+        with self._condition:
+            self.entries = {}
+            if self.path.exists():
+                with self.path.open("r", encoding="utf-8") as handle:
+                    for line in handle:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            # A torn final line from a crash mid-write; everything before it is intact.
+                            continue
+                        self._replay_record(record)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._handle = self.path.open("a", encoding="utf-8")
+            return list(self.entries.values())
+
+    def _replay_record(self, record: Dict[str, Any]) -> None:
+        entry_id = record.get("id", "")
+        if record.get("op") == "put":
+            self.entries[entry_id] = OutboxEntry(entry_id, record["payload"], record["sinks"], record["created_at"], 0)
+        elif record.get("op") == "ack" and entry_id in self.entries:
+            entry = self.entries[entry_id]
+            if record.get("sink") in entry.sinks:
+                entry.sinks.remove(record["sink"])
+            if not entry.sinks:
+                del self.entries[entry_id]
+        elif record.get("op") == "drop":
+            self.entries.pop(entry_id, None)
+
+    def put(self, payload: Dict[str, str], sinks: Sequence[str]) -> OutboxEntry:
+        """Record a payload about to be dispatched; the entry starts in flight so ``due`` cannot redeliver it too."""
+        entry_id = uuid.uuid4().hex
+        created_at = time.time()
+        record = {"op": "put", "id": entry_id, "sinks": list(sinks), "created_at": created_at, "payload": payload}
+        with self._condition:
+            seq = self._append(record)
+            entry = OutboxEntry(entry_id, payload, sinks, created_at, seq, in_flight=True)
+            self.entries[entry_id] = entry
+            return entry
+
+    def sync(self, seq: Optional[int] = None) -> None:
+        with self._condition:
+            target = self._appended_seq if seq is None else seq
+            while self._durable_seq < target:
+                if self._committing:
+                    self._condition.wait()
+                    continue
+                self._committing = True
+                batch, self._buffer = self._buffer, []
+                batch_seq = self._appended_seq
+                try:
+                    self._condition.release()
+                    try:
+                        self._write(batch)
+                    finally:
+                        self._condition.acquire()
+                except Exception:
+                    self._buffer[:0] = batch
+                    raise
+                else:
+                    self._durable_seq = batch_seq
+                finally:
+                    self._committing = False
+                    self._condition.notify_all()
+
+    def ack(self, entry_id: str, sink: str) -> None:
+        with self._condition:
+            entry = self.entries.get(entry_id)
+            if entry is None or sink not in entry.sinks:
+                return
+            entry.sinks.remove(sink)
+            self._append({"op": "ack", "id": entry_id, "sink": sink})
+            if not entry.sinks:
+                del self.entries[entry_id]
+                self._completed_since_compaction += 1
+
+    def drop(self, entry_id: str) -> None:
+        with self._condition:
+            if self.entries.pop(entry_id, None) is not None:
+                self._append({"op": "drop", "id": entry_id})
+                self._completed_since_compaction += 1
+
+    def due(self, now: float) -> List[OutboxEntry]:
+        with self._condition:
+            return [entry for entry in self.entries.values() if not entry.in_flight and entry.next_attempt_at <= now]
+
+    def maybe_compact(self) -> bool:
+        with self._condition:
+            if self._completed_since_compaction < self.compact_threshold or self._committing:
+                return False
+            self._flush_buffer()
+            tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+            with tmp_path.open("w", encoding="utf-8") as handle:
+                for entry in self.entries.values():
+                    record = {
+                        "op": "put",
+                        "id": entry.entry_id,
+                        "sinks": entry.sinks,
+                        "created_at": entry.created_at,
+                        "payload": entry.payload,
+                    }
+                    handle.write(json.dumps(record, sort_keys=True) + "\n")
+                handle.flush()
+                os.fsync(handle.fileno())
+            if self._handle is not None:
+                self._handle.close()
+            os.replace(tmp_path, self.path)
+            self._handle = self.path.open("a", encoding="utf-8")
+            self._completed_since_compaction = 0
+            return True
+
+    def close(self) -> None:
+        self.sync()
+        with self._condition:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+    def _append(self, record: Dict[str, Any]) -> int:
+        self._buffer.append(json.dumps(record, sort_keys=True) + "\n")
+        self._appended_seq += 1
+        return self._appended_seq
+
+    def _flush_buffer(self) -> None:
+        batch, self._buffer = self._buffer, []
+        self._write(batch)
+        self._durable_seq = self._appended_seq
+
+    def _write(self, batch: List[str]) -> None:
+        if self._handle is None:
+            raise RuntimeError("outbox is not open; call load() first")
+        self._handle.write("".join(batch))
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
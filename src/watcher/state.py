@@ -0,0 +1,368 @@
+import re
+from array import array
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.watcher.history import TransitionHistory, resource_version_number
+
+STATUS_NAMES = ("False", "True", "Unknown")
+STATUS_CODES = {name: code for code, name in enumerate(STATUS_NAMES)}
+STATUS_ABSENT = -1
+READY = STATUS_CODES["True"]
+# Rows per cached ``nodes_table`` block; a status change re-renders only its own block.
+TABLE_BLOCK_NODES = 256
+TABLE_HEADER = "node\tready_status"
+NONZERO_BYTE = re.compile(rb"[^\x00]")
+
+
+def status_code(status: str) -> int:
+    return STATUS_CODES.get(status, STATUS_CODES["Unknown"])
+
+
+class Bitset:
+    def __init__(self) -> None:
+        self.bits = bytearray()
+        self.count = 0
+
+    def __contains__(self, index: int) -> bool:
+        byte = index >> 3
+        return byte < len(self.bits) and bool(self.bits[byte] & (1 << (index & 7)))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[int]:
+        # The regex skips zero bytes in C, so iterating costs the set bits, not the fleet.
+        for match in NONZERO_BYTE.finditer(self.bits):
+            byte_index = match.start()
+            byte = self.bits[byte_index]
+            for bit in range(8):
+                if byte & (1 << bit):
+                    yield (byte_index << 3) | bit
+
+    def add(self, index: int) -> None:
+        byte = index >> 3
+        if byte >= len(self.bits):
+            self.bits.extend(bytes(byte + 1 - len(self.bits)))
+        mask = 1 << (index & 7)
+        if not self.bits[byte] & mask:
+            self.bits[byte] |= mask
+            self.count += 1
+
+    def discard(self, index: int) -> None:
+        byte = index >> 3
+        if byte < len(self.bits) and self.bits[byte] & (1 << (index & 7)):
+            self.bits[byte] &= ~(1 << (index & 7)) & 0xFF
+            self.count -= 1
+
+    def clear(self) -> None:
+        if self.count:
+            self.bits = bytearray(len(self.bits))
+            self.count = 0
+
+
+def export_statuses(names: List[str], ids: Dict[str, int], statuses: array) -> Tuple[List[str], str]:
+    return names, "".join([str(statuses[ids[name]]) for name in names])
+
+
+class NodeStateStore:
+    """Ready status per node, keyed by interned integer IDs.
+
+    Statuses live in an ``array('b')`` indexed by node ID and the pending
+    down/recovered flags are bitsets over the same IDs. The sorted name list
+    and the sorted non-Ready index are kept incrementally, and ``nodes_table``
+    is cached as rendered blocks of ``TABLE_BLOCK_NODES`` rows. A status change
+    drops only its block and a new or deleted node the blocks from its sorted
+    position on, so a flush re-renders the rows that changed, not the fleet.
+    The last ``history_depth`` transitions of up to ``history_nodes`` nodes
+    are kept in a ``TransitionHistory`` by node ID and dropped when the ID is
+    freed.
+
+    The indexes, the name-to-ID map and the cached table cost more memory
+    per node than a plain dict of statuses (``bench_state_memory``); that is
+    the price of flushes that do not grow with the fleet.
+    """
+
+    def __init__(self, history_depth: int = 0, history_nodes: int = 1024) -> None:
+        self.history = TransitionHistory(history_depth, history_nodes)
+        self.reset()
+
+    def reset(self) -> None:
+        self.ids: Dict[str, int] = {}
+        self.names: List[Optional[str]] = []
+        self.statuses = array("b")
+        self.free_ids: List[int] = []
+        self.retired_ids: Dict[str, int] = {}
+        self.pending_down = Bitset()
+        self.pending_recovered = Bitset()
+        self.pending_flapping = Bitset()
+        self.pending_previous: Dict[int, int] = {}
+        self.deleted_statuses: Dict[int, int] = {}
+        self.sorted_names: List[str] = []
+        self.down_names: List[str] = []
+        self.table_blocks: List[Optional[str]] = []
+        self.history.reset()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.sorted_names)
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        statuses = self.statuses
+        ids = self.ids
+        for name in self.sorted_names:
+            yield name, STATUS_NAMES[statuses[ids[name]]]
+
+    def nodes_table(self) -> str:
+        blocks = self.table_blocks
+        block_count = -(-len(self.sorted_names) // TABLE_BLOCK_NODES)
+        del blocks[block_count:]
+        blocks.extend([None] * (block_count - len(blocks)))
+        for block, rendered in enumerate(blocks):
+            if rendered is None:
+                blocks[block] = self.render_block(block)
+        return "\n".join([TABLE_HEADER, *blocks])  # type: ignore[list-item]
+
+    def render_block(self, block: int) -> str:
+        statuses = self.statuses
+        ids = self.ids
+        start = block * TABLE_BLOCK_NODES
+        names = self.sorted_names[start : start + TABLE_BLOCK_NODES]
+        return "\n".join([f"{name}\t{STATUS_NAMES[statuses[ids[name]]]}" for name in names])
+
+    def invalidate_table(self, position: int, tail: bool = False) -> None:
+        block = position // TABLE_BLOCK_NODES
+        if tail:
+            del self.table_blocks[block:]
+        elif block < len(self.table_blocks):
+            self.table_blocks[block] = None
+
+    def get(self, name: str) -> Optional[str]:
+        node_id = self.ids.get(name)
+        if node_id is None:
+            return None
+        return STATUS_NAMES[self.statuses[node_id]]
+
+    def snapshot(self) -> Dict[str, str]:
+        return dict(self.items())
+
+    def export(self) -> Tuple[List[str], str]:
+        return export_statuses(*self.copy_arrays())
+
+    def copy_arrays(self) -> Tuple[List[str], Dict[str, int], array]:
+        """Copies of what ``export`` reads; C-level copies, cheap enough to take under the state lock."""
+        return list(self.sorted_names), dict(self.ids), array("b", self.statuses)
+
+    def restore(self, names: List[str], codes: str) -> None:
+        self.load({name: STATUS_NAMES[int(code)] for name, code in zip(names, codes)})
+
+    def load(self, states: Dict[str, str]) -> None:
+        self.reset()
+        for name in sorted(states):
+            node_id = self.intern(name)
+            self.statuses[node_id] = status_code(states[name])
+        self.sorted_names = sorted(self.ids)
+        self.down_names = [name for name in self.sorted_names if self.statuses[self.ids[name]] != READY]
+
+    def intern(self, name: str) -> int:
+        node_id = self.ids.get(name)
+        if node_id is not None:
+            return node_id
+        node_id = self.retired_ids.pop(name, None)
+        if node_id is not None:
+            self.ids[name] = node_id
+            self.deleted_statuses.pop(node_id, None)
+            return node_id
+        # ``ids`` keeps the one copy of the name; sys.intern would add a second table entry per node.
+        if self.free_ids:
+            node_id = self.free_ids.pop()
+            self.names[node_id] = name
+            self.statuses[node_id] = STATUS_ABSENT
+        else:
+            node_id = len(self.names)
+            self.names.append(name)
+            self.statuses.append(STATUS_ABSENT)
+        self.ids[name] = node_id
+        return node_id
+
+    def set(self, name: str, status: str) -> Optional[str]:
+        node_id = self.intern(name)
+        previous_code = self.statuses[node_id]
+        code = status_code(status)
+        self.statuses[node_id] = code
+        name = self.names[node_id]  # type: ignore[assignment]
+
+        if previous_code == STATUS_ABSENT:
+            position = bisect_left(self.sorted_names, name)
+            self.sorted_names.insert(position, name)
+            self.invalidate_table(position, tail=True)
+        elif previous_code != code:
+            self.invalidate_table(bisect_left(self.sorted_names, name))
+
+        was_down = previous_code != STATUS_ABSENT and previous_code != READY
+        if code != READY and not was_down:
+            insort(self.down_names, name)
+        elif code == READY and was_down:
+            del self.down_names[bisect_left(self.down_names, name)]
+
+        return None if previous_code == STATUS_ABSENT else STATUS_NAMES[previous_code]
+
+    def remove(self, name: str) -> Optional[str]:
+        node_id = self.ids.pop(name, None)
+        if node_id is None:
+            return None
+        code = self.statuses[node_id]
+        self.statuses[node_id] = STATUS_ABSENT
+
+        position = bisect_left(self.sorted_names, name)
+        del self.sorted_names[position]
+        self.invalidate_table(position, tail=True)
+        if code != READY:
+            del self.down_names[bisect_left(self.down_names, name)]
+
+        # A deleted node that is still pending keeps its ID until the flush reports it.
+        if node_id in self.pending_down or node_id in self.pending_recovered or node_id in self.pending_flapping:
+            self.retired_ids[name] = node_id
+            self.deleted_statuses[node_id] = code
+        else:
+            self.free_id(node_id)
+        return STATUS_NAMES[code]
+
+    def free_id(self, node_id: int) -> None:
+        self.names[node_id] = None
+        self.free_ids.append(node_id)
+        self.history.clear(node_id)
+
+    def record_transition(
+        self, name: str, previous: str, current: str, at: float, resource_version: Optional[str] = None
+    ) -> None:
+        self.history.append(
+            self.ids[name], at, status_code(previous), status_code(current), resource_version_number(resource_version)
+        )
+
+    def transition_history(self, name: str) -> List[Dict[str, Any]]:
+        node_id = self.ids.get(name)
+        if node_id is None:
+            node_id = self.retired_ids.get(name)
+        if node_id is None:
+            return []
+        return [
+            {
+                "at": at,
+                "from": STATUS_NAMES[previous],
+                "to": STATUS_NAMES[current],
+                "resource_version": str(resource_version) if resource_version else None,
+            }
+            for at, previous, current, resource_version in self.history.entries(node_id)
+        ]
+
+    def pending_id(self, name: str) -> int:
+        node_id = self.ids.get(name)
+        if node_id is None:
+            node_id = self.retired_ids.get(name)
+        if node_id is None:
+            node_id = self.intern(name)
+            del self.ids[name]
+            self.retired_ids[name] = node_id
+        return node_id
+
+    def mark_down(self, name: str, previous: Optional[str] = None, current: Optional[str] = None) -> bool:
+        """Flag a node down for the next flush; False when that undoes its change earlier in the window."""
+        node_id = self.pending_id(name)
+        self.remember_previous(node_id, previous)
+        if self.reverted(node_id, current):
+            return False
+        self.pending_down.add(node_id)
+        self.pending_recovered.discard(node_id)
+        return True
+
+    def mark_recovered(self, name: str, previous: Optional[str] = None, current: Optional[str] = None) -> bool:
+        node_id = self.pending_id(name)
+        self.remember_previous(node_id, previous)
+        if self.reverted(node_id, current):
+            return False
+        self.pending_recovered.add(node_id)
+        self.pending_down.discard(node_id)
+        return True
+
+    def reverted(self, node_id: int, current: Optional[str]) -> bool:
+        # True -> False -> True, or False -> True -> Unknown, within one window nets out to no actionable change.
+        start = self.pending_previous.get(node_id)
+        if current is None or start is None or (start == READY) != (status_code(current) == READY):
+            return False
+        self.pending_down.discard(node_id)
+        self.pending_recovered.discard(node_id)
+        del self.pending_previous[node_id]
+        return True
+
+    def mark_flapping(self, name: str) -> None:
+        node_id = self.pending_id(name)
+        self.pending_flapping.add(node_id)
+        self.pending_down.discard(node_id)
+        self.pending_recovered.discard(node_id)
+
+    def remember_previous(self, node_id: int, previous: Optional[str]) -> None:
+        # Only the status at the start of the flush window is kept; later flaps overwrite nothing.
+        if previous is not None and node_id not in self.pending_previous:
+            self.pending_previous[node_id] = status_code(previous)
+
+    def previous_status(self, name: str) -> Optional[str]:
+        node_id = self.ids.get(name)
+        if node_id is None:
+            node_id = self.retired_ids.get(name)
+        code = self.pending_previous.get(node_id) if node_id is not None else None
+        return None if code is None else STATUS_NAMES[code]
+
+    def last_status(self, name: str) -> Optional[str]:
+        """The node's status, or for a node deleted in this window the status it had when deleted."""
+        status = self.get(name)
+        node_id = self.retired_ids.get(name)
+        if status is None and node_id is not None and node_id in self.deleted_statuses:
+            return STATUS_NAMES[self.deleted_statuses[node_id]]
+        return status
+
+    def deleted_statuses_by_name(self) -> Dict[str, str]:
+        names = self.names
+        return {names[node_id]: STATUS_NAMES[code] for node_id, code in self.deleted_statuses.items()}  # type: ignore[misc]
+
+    def set_deleted_statuses(self, statuses: Dict[str, str]) -> None:
+        self.deleted_statuses = {}
+        for name, status in statuses.items():
+            if name not in self.ids:
+                self.deleted_statuses[self.pending_id(name)] = status_code(status)
+
+    def previous_statuses(self) -> Dict[str, str]:
+        names = self.names
+        return {names[node_id]: STATUS_NAMES[code] for node_id, code in self.pending_previous.items()}  # type: ignore[misc]
+
+    def set_previous_statuses(self, previous: Dict[str, str]) -> None:
+        self.pending_previous = {}
+        for name, status in previous.items():
+            self.remember_previous(self.pending_id(name), status)
+
+    def pending_names(self, pending: Bitset) -> List[str]:
+        names = self.names
+        return sorted(names[node_id] for node_id in pending)  # type: ignore[misc]
+
+    def set_pending(self, pending: Bitset, names: Iterable[str]) -> None:
+        pending.clear()
+        for name in names:
+            pending.add(self.pending_id(name))
+
+    def pending_count(self) -> int:
+        return len(self.pending_down) + len(self.pending_recovered) + len(self.pending_flapping)
+
+    def clear_pending(self) -> None:
+        self.pending_down.clear()
+        self.pending_recovered.clear()
+        self.pending_flapping.clear()
+        self.pending_previous = {}
+        self.deleted_statuses = {}
+        for node_id in self.retired_ids.values():
+            self.free_id(node_id)
+        self.retired_ids = {}
@@ -0,0 +1,100 @@
+import math
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+TimerCallback = Callable[[Hashable], None]
+Expired = List[Tuple[TimerCallback, Hashable]]
+
+
+class TimerWheel:
+    """Hashed timing wheel of keyed one-shot timers.
+
+    A timer lives in slot ``expiry_tick % slots`` keyed by its caller-chosen
+    key, so ``schedule`` and ``cancel`` are a dict insert and delete. Each
+    tick visits one slot and fires the entries whose expiry tick has come;
+    entries that are whole rotations away stay put. Scheduling an existing key
+    replaces its timer, which is how per-node deadlines are pushed back.
+
+    Callbacks receive the key, so callers pass one shared bound method per
+    kind of timer instead of a closure per node; a timer then costs a dict
+    entry, an ``(expiry, callback)`` tuple and the key.
+    """
+
+    def __init__(self, tick_seconds: float = 0.1, slots: int = 1024) -> None:
+        if tick_seconds <= 0 or slots < 1:
+            raise ValueError("timer wheel needs tick_seconds > 0 and slots >= 1")
+        self.tick_seconds = tick_seconds
+        self.slots: List[Dict[Hashable, Tuple[int, TimerCallback]]] = [{} for _ in range(slots)]
+        self.slot_of: Dict[Hashable, int] = {}
+        self.tick = 0
+        self.started_at = time.monotonic()
+
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self.slot_of)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.slot_of
+
+    def schedule(self, key: Hashable, delay_seconds: float, callback: TimerCallback) -> None:
+        expiry = math.ceil((time.monotonic() - self.started_at + delay_seconds) / self.tick_seconds)
+        with self._lock:
+            self._remove(key)
+            # Anything already due fires on the next tick rather than being lost behind the cursor.
+            expiry = max(expiry, self.tick + 1)
+            slot = expiry % len(self.slots)
+            self.slots[slot][key] = (expiry, callback)
+            self.slot_of[key] = slot
+
+    def cancel(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._remove(key)
+
+    def _remove(self, key: Hashable) -> bool:
+        slot = self.slot_of.pop(key, None)
+        if slot is None:
+            return False
+        del self.slots[slot][key]
+        return True
+
+    def advance(self, now: Optional[float] = None) -> Expired:
+        """Move the wheel up to ``now`` and return the expired ``(callback, key)`` pairs, in order."""
+        target = int(((time.monotonic() if now is None else now) - self.started_at) / self.tick_seconds)
+        expired: Expired = []
+        with self._lock:
+            while self.tick < target:
+                self.tick += 1
+                slot = self.slots[self.tick % len(self.slots)]
+                if not slot:
+                    continue
+                due = [key for key, (expiry, _) in slot.items() if expiry <= self.tick]
+                for key in due:
+                    expired.append((slot.pop(key)[1], key))
+                    del self.slot_of[key]
+        return expired
+
+    def start(self, on_error: Optional[Callable[[Exception], None]] = None, name: str = "timer-wheel") -> None:
+        if self._thread is not None:
+            return
+
+        def run() -> None:
+            while not self._stopping.wait(self.tick_seconds):
+                for callback, key in self.advance():
+                    try:
+                        callback(key)
+                    except Exception as exc:
+                        if on_error is not None:
+                            on_error(exc)
+
+        self._thread = threading.Thread(target=run, name=name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
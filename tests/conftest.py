@@ -0,0 +1,10 @@
+from typing import Any
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def unittest_monkeypatch(request: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    # unittest.TestCase methods cannot take fixtures; hand them monkeypatch so env changes are undone per test.
+    if request.instance is not None:
+        request.instance.monkeypatch = monkeypatch
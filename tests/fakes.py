@@ -0,0 +1,36 @@
+import json
+from typing import Any, Dict, List, Optional
+
+
+def node_page(nodes: Dict[str, str], resource_version: str = "90", continue_token: Optional[str] = None) -> Dict[str, Any]:
+    metadata: Dict[str, Any] = {"resourceVersion": resource_version}
+    if continue_token:
+        metadata["continue"] = continue_token
+    return {
+        "kind": "NodeList",
+        "metadata": metadata,
+        "items": [
+            {"metadata": {"name": name}, "status": {"conditions": [{"type": "Ready", "status": ready}]}}
+            for name, ready in nodes.items()
+        ],
+    }
+
+
+class FakeListResponse:
+    def __init__(self, page: Dict[str, Any]) -> None:
+        self.data = json.dumps(page).encode("utf-8")
+
+    def release_conn(self) -> None:
+        pass
+
+
+class FakeCoreV1Api:
+    """Serves ``pages`` to successive ``list_node`` calls, repeating the last one."""
+
+    def __init__(self, pages: List[Dict[str, Any]]) -> None:
+        self.pages = pages
+        self.calls: List[Dict[str, Any]] = []
+
+    def list_node(self, **kwargs: Any) -> FakeListResponse:
+        self.calls.append(kwargs)
+        return FakeListResponse(self.pages[min(len(self.calls), len(self.pages)) - 1])
@@ -0,0 +1,116 @@
+import argparse
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Dict, List
+
+from src.watcher.availability import (
+    AvailabilityAggregator,
+    RepairStats,
+    aggregate,
+    parse_fleet_size,
+    record_events,
+    summarize_segment,
+)
+from src.watcher.incidents import IncidentLogWriter, read_manifest
+
+
+def at(minute: int) -> str:
+    return f"2026-02-12T{minute // 60:02d}:{minute % 60:02d}:00Z"
+
+
+def down(minute: int, *nodes: str) -> Dict[str, object]:
+    return {"datetime": at(minute), "cluster": "c1", "nodes_down": list(nodes), "nodes_recovered": [], "recovery_status": "open"}
+
+
+def up(minute: int, *nodes: str) -> Dict[str, object]:
+    return {"datetime": at(minute), "cluster": "c1", "nodes_down": [], "nodes_recovered": list(nodes), "recovery_status": "recovered"}
+
+
+class AvailabilityTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "incidents.ndjson"
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def write_segments(self, segments: List[List[Dict[str, object]]]) -> None:
+        writer = IncidentLogWriter(self.path, compress=False)
+        for index, records in enumerate(segments):
+            writer.write_many(records)
+            if index < len(segments) - 1:
+                writer.rotate()
+        writer.close()
+
+    def test_pairs_open_and_recovered_records_across_segments(self) -> None:
+        self.write_segments(
+            [
+                [down(0, "a", "b"), up(10, "a")],
+                [down(20, "b"), down(30, "a")],
+                [up(40, "a", "b"), down(50, "a"), up(60, "a")],
+            ]
+        )
+        for workers in (1, 2):
+            report = aggregate(self.path, workers=workers).report()
+            cluster = report["clusters"]["c1"]
+            a, b = cluster["nodes"]["a"], cluster["nodes"]["b"]
+            self.assertEqual((a["incidents"], a["repairs"], a["downtime_seconds"]), (3, 3, 30 * 60))
+            self.assertEqual((b["incidents"], b["repairs"], b["downtime_seconds"]), (1, 1, 40 * 60))
+            self.assertEqual(b["availability"], round(1 - 40 / 60, 6))
+            self.assertEqual(cluster["incidents"], 4)
+            self.assertEqual(cluster["mttr_seconds"], 70 * 60 / 4)
+
+    def test_segment_compressed_after_manifest_read_is_summarized(self) -> None:
+        writer = IncidentLogWriter(self.path)
+        writer.write_many([down(0, "a"), up(10, "a")])
+        writer.rotate()
+        writer.close()
+        writer.wait_for_compression()
+
+        compressed = self.path.with_name(read_manifest(self.path)[0]["file"])
+        summary = summarize_segment(str(compressed.with_name(compressed.name[: -len(".gz")])))
+        self.assertEqual(summary.records, 2)
+        self.assertEqual(summary.nodes[("c1", "a")].repairs.count, 0)
+        self.assertEqual(summary.nodes[("c1", "a")].first_up, summary.last_at)
+
+    def test_open_incident_counts_downtime_to_window_end(self) -> None:
+        aggregator = AvailabilityAggregator()
+        aggregator.add_records([down(0, "a"), up(5, "b"), down(10, "b")])
+        node = aggregator.report()["clusters"]["c1"]["nodes"]["b"]
+        # b was already down when the window opened, so its downtime runs from the window start to minute 5.
+        self.assertEqual((node["open"], node["orphan_recoveries"], node["downtime_seconds"]), (True, 1, 5 * 60))
+        windowed = aggregator.report(window_start=aggregator.first_at - 60)["clusters"]["c1"]["nodes"]["b"]
+        self.assertEqual(windowed["downtime_seconds"], 6 * 60)
+        self.assertTrue(aggregator.report(window_end=aggregator.last_at + 600)["clusters"]["c1"]["nodes"]["a"]["open"])
+
+    def test_cluster_availability_uses_the_fleet_size(self) -> None:
+        aggregator = AvailabilityAggregator()
+        aggregator.add_records([down(0, "a"), up(10, "a"), down(90, "b"), up(100, "b")])
+        self.assertIsNone(aggregator.report()["clusters"]["c1"]["availability"])
+
+        cluster = aggregator.report(fleet_sizes={"c1": 500, "": 3})["clusters"]["c1"]
+        self.assertEqual(cluster["fleet_size"], 500)
+        self.assertEqual(cluster["availability"], round(1 - 20 / (100 * 500), 6))
+        self.assertEqual(parse_fleet_size("c1=500"), ("c1", 500))
+        self.assertEqual(parse_fleet_size("40"), ("", 40))
+        with self.assertRaises(argparse.ArgumentTypeError):
+            parse_fleet_size("c1=none")
+
+    def test_percentiles_are_within_bucket_error(self) -> None:
+        stats = RepairStats()
+        for seconds in range(1, 1001):
+            stats.add(float(seconds))
+        self.assertAlmostEqual(stats.percentile(50), 500, delta=500 * 0.05)
+        self.assertAlmostEqual(stats.percentile(99), 990, delta=990 * 0.05)
+
+    def test_reads_node_names_from_legacy_summaries(self) -> None:
+        events = list(
+            record_events({"datetime": at(0), "log_message": "Node incident in pi-k3s: a,b", "recovery_status": "open"})
+        )
+        self.assertEqual([(cluster, node, is_down) for cluster, node, _, is_down in events], [("pi-k3s", "a", True), ("pi-k3s", "b", True)])
+        self.assertEqual(list(record_events({"datetime": at(0), "log_message": "Node state changed in pi-k3s"})), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
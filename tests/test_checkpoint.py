@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any, List
+from unittest import mock
+
+from fakes import FakeCoreV1Api, node_page
+from src.watcher.checkpoint import read_checkpoint, write_checkpoint
+from src.watcher.main import NodeHealthWatcher
+from src.watcher.state import export_statuses
+
+
+class CheckpointTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.checkpoint_path = os.path.join(self.tmpdir.name, "state", "checkpoint.json")
+        self.monkeypatch.setenv("INCIDENT_LOG_PATH", os.path.join(self.tmpdir.name, "incidents.ndjson"))
+        self.monkeypatch.setenv("CHECKPOINT_PATH", self.checkpoint_path)
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def test_write_is_atomic_and_versioned(self) -> None:
+        path = Path(self.checkpoint_path)
+        write_checkpoint(path, {"names": ["a"], "statuses": "1"})
+        self.assertEqual(os.listdir(path.parent), ["checkpoint.json"])
+        self.assertEqual(read_checkpoint(path), {"version": 1, "names": ["a"], "statuses": "1"})
+        self.assertIsNone(read_checkpoint(path.with_name("missing.json")))
+
+        path.write_text('{"version": 99}', encoding="utf-8")
+        with self.assertRaises(ValueError):
+            read_checkpoint(path)
+
+    def test_restart_restores_pending_and_emits_missed_transitions(self) -> None:
+        before = NodeHealthWatcher()
+        before.node_states = {"n1": "True", "n2": "True", "n3": "True", "gone": "True"}
+        before.resource_version = "500"
+        before.apply_node_status("n1", "False")
+        self.assertTrue(before.save_checkpoint())
+
+        after = NodeHealthWatcher()
+        self.assertTrue(after.restore_checkpoint())
+        self.assertEqual(after.pending_down, {"n1"})
+        self.assertEqual(after.flush_deadline, before.flush_deadline)
+
+        # While the pod was down n2 failed and "gone" was deleted.
+        api = FakeCoreV1Api([node_page({"n1": "False", "n2": "False", "n3": "True"}, "640")])
+        after.resync_node_state(api)
+
+        self.assertEqual(after.node_states, {"n1": "False", "n2": "False", "n3": "True"})
+        self.assertEqual(after.pending_down, {"n1", "n2"})
+        self.assertEqual(after.resource_version, "640")
+
+    def test_per_node_export_runs_outside_the_state_lock(self) -> None:
+        watcher = NodeHealthWatcher()
+        watcher.node_states = {"n1": "True", "n2": "False"}
+        lock_held: List[bool] = []
+
+        def export(*args: Any) -> Any:
+            lock_held.append(watcher.state_lock._is_owned())  # type: ignore[attr-defined]
+            watcher.apply_node_status("n3", "True")
+            return export_statuses(*args)
+
+        with mock.patch("src.watcher.main.export_statuses", side_effect=export):
+            checkpoint = watcher.build_checkpoint()
+        self.assertEqual(lock_held, [False])
+        self.assertEqual((checkpoint["names"], checkpoint["statuses"]), (["n1", "n2"], "10"))
+
+    def test_checkpoint_from_another_cluster_is_ignored(self) -> None:
+        before = NodeHealthWatcher()
+        before.cluster_name = "other"
+        before.node_states = {"n1": "True"}
+        before.save_checkpoint()
+
+        self.assertFalse(NodeHealthWatcher().restore_checkpoint())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from unittest import mock
+
+from src.watcher.dispatch import DispatchJob, DispatchQueue, fan_out
+from src.watcher.main import NodeHealthWatcher
+from src.watcher.outbox import OutboxEntry
+
+
+class DispatchQueueTests(unittest.TestCase):
+    def test_queue_is_bounded_and_reports_depth_and_age(self) -> None:
+        handled: List[Dict[str, str]] = []
+        queue = DispatchQueue(lambda payload, queued: handled.append(payload), max_size=2, workers=1)
+
+        self.assertTrue(queue.submit({"n": "1"}))
+        self.assertTrue(queue.submit({"n": "2"}))
+        self.assertFalse(queue.submit({"n": "3"}))
+        time.sleep(0.01)
+        self.assertEqual(queue.depth(), 2)
+        self.assertGreater(queue.oldest_age_seconds(), 0.0)
+
+        queue.start()
+        try:
+            self.assertTrue(queue.join(timeout=2))
+        finally:
+            queue.stop()
+        self.assertEqual(handled, [{"n": "1"}, {"n": "2"}])
+        self.assertEqual(queue.stats(), {"depth": 0, "in_flight": 0, "oldest_age_seconds": 0.0})
+
+    def test_handler_errors_reach_on_error_and_worker_keeps_going(self) -> None:
+        errors: List[Exception] = []
+        handled: List[str] = []
+
+        def handler(item: str, queued: float) -> None:
+            if item == "bad":
+                raise RuntimeError("boom")
+            handled.append(item)
+
+        queue = DispatchQueue(handler, max_size=4, workers=1)
+        queue.submit("bad")
+        queue.submit("good")
+        queue.start(on_error=errors.append)
+        try:
+            self.assertTrue(queue.join(timeout=2))
+        finally:
+            queue.stop()
+        self.assertEqual([str(error) for error in errors], ["boom"])
+        self.assertEqual(handled, ["good"])
+
+    def test_failed_dispatch_job_releases_outbox_entry(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.monkeypatch.setenv("INCIDENT_LOG_PATH", os.path.join(tmpdir, "incidents.ndjson"))
+            watcher = NodeHealthWatcher()
+            entry = OutboxEntry("e1", {"event": "incident"}, ["airflow"], time.time(), 0, in_flight=True)
+
+            with mock.patch("src.watcher.main.fan_out", side_effect=RuntimeError("sink pool closed")):
+                with self.assertRaises(RuntimeError):
+                    watcher.dispatch_job(DispatchJob(entry.payload, ("airflow",), entry), 0.0)
+            self.assertFalse(entry.in_flight)
+            self.assertGreater(entry.next_attempt_at, time.time())
+
+    def test_full_queue_without_outbox_keeps_the_window_pending(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.monkeypatch.setenv("INCIDENT_LOG_PATH", os.path.join(tmpdir, "incidents.ndjson"))
+            watcher = NodeHealthWatcher()
+            watcher.dispatch_queue.max_size = 1
+            watcher.dispatch_queue.submit(DispatchJob({"event": "earlier"}))
+            watcher.node_states = {"n1": "True"}
+            watcher.apply_node_status("n1", "False")
+
+            watcher.flush_if_due(force=True)
+            self.assertEqual(watcher.pending_down, {"n1"})
+            self.assertEqual(watcher.flush_seq, 0)
+            self.assertGreater(watcher.flush_deadline, time.time())
+
+            watcher.dispatch_queue._items.clear()
+            watcher.flush_if_due(force=True)
+            self.assertEqual(watcher.pending_down, set())
+            self.assertEqual(watcher.dispatch_queue._items[0][1].payload["nodes_down"], "n1")
+
+    def test_slow_sink_does_not_block_flush(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.monkeypatch.setenv("INCIDENT_LOG_PATH", os.path.join(tmpdir, "incidents.ndjson"))
+            watcher = NodeHealthWatcher()
+            release = threading.Event()
+            calls: List[str] = []
+
+            def slow_airflow(payload: Dict[str, str], deadline: Optional[float] = None) -> bool:
+                release.wait(5)
+                calls.append("airflow")
+                return True
+
+            def github(payload: Dict[str, str], deadline: Optional[float] = None) -> bool:
+                calls.append("github")
+                return True
+
+            watcher.trigger_airflow = slow_airflow  # type: ignore[method-assign]
+            watcher.trigger_github_dispatch = github  # type: ignore[method-assign]
+            watcher.dispatch_queue.start()
+            try:
+                watcher.node_states = {"n1": "False"}
+                watcher.pending_down = {"n1"}
+
+                started = time.monotonic()
+                watcher.flush_if_due(force=True)
+                self.assertLess(time.monotonic() - started, 1.0)
+                self.assertEqual(watcher.pending_down, set())
+
+                # GitHub is dispatched concurrently and does not wait for the stalled Airflow sink.
+                deadline = time.monotonic() + 2
+                while not calls and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                self.assertEqual(calls, ["github"])
+
+                release.set()
+                self.assertTrue(watcher.dispatch_queue.join(timeout=5))
+            finally:
+                watcher.dispatch_queue.stop()
+            self.assertEqual(calls, ["github", "airflow"])
+
+    def test_fan_out_latency_is_the_slowest_sink(self) -> None:
+        def sink(delay: float, ok: bool) -> bool:
+            time.sleep(delay)
+            return ok
+
+        def broken() -> bool:
+            raise RuntimeError("boom")
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            started = time.monotonic()
+            results = fan_out(
+                executor,
+                {"slow": lambda: sink(0.2, True), "fast": lambda: sink(0.05, False), "broken": broken},
+            )
+            elapsed = time.monotonic() - started
+
+        self.assertLess(elapsed, 0.2 + 0.05 * 0.9)
+        self.assertTrue(results["slow"].ok)
+        self.assertGreaterEqual(results["slow"].seconds, 0.2)
+        self.assertFalse(results["fast"].ok)
+        self.assertLess(results["fast"].seconds, results["slow"].seconds)
+        self.assertEqual(results["broken"], (False, results["broken"].seconds, "boom"))
+
+    def test_fan_out_reports_sinks_past_their_deadline_as_timed_out(self) -> None:
+        release = threading.Event()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            started = time.monotonic()
+            results = fan_out(
+                executor,
+                {"stuck": lambda: release.wait(5), "fast": lambda: True},
+                {"stuck": started + 0.1, "fast": started + 5},
+            )
+            elapsed = time.monotonic() - started
+            release.set()
+
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(list(results), ["stuck", "fast"])
+        self.assertEqual((results["stuck"].ok, results["stuck"].error), (False, "timed out"))
+        self.assertTrue(results["fast"].ok)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src.watcher.domains import FailureDomainIndex
+from src.watcher.main import NodeHealthWatcher
+
+ZONE = "topology.kubernetes.io/zone"
+RACK = "topology.kubernetes.io/rack"
+
+
+def raw_node(name: str, ready: str, labels: dict, resource_version: str = "1") -> dict:
+    return {
+        "kind": "Node",
+        "metadata": {"name": name, "resourceVersion": resource_version, "labels": labels},
+        "status": {"conditions": [{"type": "Ready", "status": ready}]},
+    }
+
+
+class FailureDomainIndexTests(unittest.TestCase):
+    def test_totals_follow_label_changes_and_removal(self) -> None:
+        index = FailureDomainIndex([("zone", ZONE), ("rack", "")])
+        self.assertEqual([name for name, _ in index.dimensions], ["zone"])
+        index.update(0, {ZONE: "a"})
+        index.update(1, {ZONE: "a"})
+        self.assertFalse(index.update(1, {ZONE: "a"}))
+        self.assertTrue(index.update(1, {ZONE: "b"}))
+        index.remove(0)
+
+        groups, crossed = index.group([1], {"new_down": [0, 1]}, threshold=0.5, min_down=1)
+        self.assertEqual(groups["zone"]["a"], {"down": 0, "total": 0, "new_down": 1, "threshold_crossed": False})
+        self.assertEqual(groups["zone"]["b"], {"down": 1, "total": 1, "new_down": 1, "threshold_crossed": True})
+        self.assertEqual(crossed, ["zone b: 1/1 down"])
+
+    def test_export_restore_round_trip(self) -> None:
+        index = FailureDomainIndex([("zone", ZONE), ("rack", RACK)])
+        index.update(0, {ZONE: "a", RACK: "r1"})
+        index.update(1, {RACK: "r2"})
+        exported = index.export({"n0": 0, "n1": 1})
+        self.assertEqual(exported, {"n0": ["a", "r1"], "n1": [None, "r2"]})
+
+        restored = FailureDomainIndex([("zone", ZONE), ("rack", RACK)])
+        restored.restore({"n0": 5, "n1": 6}, exported)
+        self.assertEqual(restored.domains_of(5), {"zone": "a", "rack": "r1"})
+        self.assertEqual(restored.domains_of(6), {"rack": "r2"})
+
+
+class WatcherFailureDomainTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.monkeypatch.setenv("INCIDENT_LOG_PATH", os.path.join(self.tmpdir.name, "incidents.ndjson"))
+        self.monkeypatch.setenv("CHECKPOINT_PATH", os.path.join(self.tmpdir.name, "checkpoint.json"))
+        self.watcher = NodeHealthWatcher()
+        for index in range(10):
+            labels = {ZONE: "zone-a" if index < 5 else "zone-b", RACK: f"rack-{index % 2}"}
+            self.watcher.handle_raw_watch_event({"type": "ADDED", "object": raw_node(f"n{index}", "True", labels)})
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def mark_not_ready(self, name: str) -> None:
+        index = int(name[1:])
+        labels = {ZONE: "zone-a" if index < 5 else "zone-b", RACK: f"rack-{index % 2}"}
+        self.watcher.handle_raw_watch_event({"type": "MODIFIED", "object": raw_node(name, "False", labels, "2")})
+
+    def test_zone_outage_is_reported_once_for_the_domain(self) -> None:
+        for name in ("n0", "n1", "n2", "n3", "n5"):
+            self.mark_not_ready(name)
+
+        payload = self.watcher.build_payload()
+        self.assertEqual(payload["failure_domains_down"], "zone zone-a: 4/5 down; rack rack-1: 3/5 down")
+        self.assertIn("(zone zone-a: 4/5 down; rack rack-1: 3/5 down)", payload["summary"])
+        domains = json.loads(payload["failure_domains"])
+        self.assertEqual(domains["zone"]["zone-b"]["down"], 1)
+        self.assertFalse(domains["zone"]["zone-b"]["threshold_crossed"])
+        self.assertEqual(domains["rack"]["rack-0"], {"down": 2, "total": 5, "new_down": 2, "threshold_crossed": False})
+
+    def test_domains_survive_checkpoint_restore(self) -> None:
+        self.mark_not_ready("n0")
+        self.watcher.save_checkpoint()
+
+        restored = NodeHealthWatcher()
+        self.assertTrue(restored.restore_checkpoint())
+        self.assertEqual(
+            restored.failure_domains.domains_of(restored.state.ids["n7"]), {"zone": "zone-b", "rack": "rack-1"}
+        )
+        self.assertEqual(json.loads(restored.build_payload()["failure_domains"])["zone"]["zone-a"]["total"], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import os
+import tempfile
+import time
+import unittest
+
+from fakes import FakeCoreV1Api, node_page
+from src.watcher.damping import FlapDamper
+from src.watcher.main import NodeHealthWatcher
+
+
+class FlapDamperTests(unittest.TestCase):
+    def test_suppresses_after_threshold_and_reuses_after_decay(self) -> None:
+        damper = FlapDamper(penalty=1000, half_life_seconds=60, suppress_threshold=2500, reuse_threshold=750)
+        self.assertEqual(damper.record(0, 0.0), (False, False))
+        self.assertEqual(damper.record(0, 1.0), (False, False))
+        self.assertEqual(damper.record(0, 2.0), (True, True))
+        self.assertEqual(damper.record(0, 3.0), (True, False))
+
+        wait = damper.seconds_until_reuse(0, 3.0)
+        self.assertGreater(wait, 60)
+        self.assertFalse(damper.release_if_due(0, 3.0 + wait - 1))
+        self.assertTrue(damper.release_if_due(0, 3.0 + wait + 0.001))
+        self.assertFalse(damper.is_suppressed(0))
+
+    def test_penalty_is_capped_by_max_suppress(self) -> None:
+        damper = FlapDamper(penalty=1000, half_life_seconds=60, suppress_threshold=2500, reuse_threshold=750, max_suppress_seconds=120)
+        for second in range(50):
+            damper.record(3, float(second))
+        self.assertLessEqual(damper.seconds_until_reuse(3, 49.0), 120.0 + 1e-6)
+        self.assertEqual(damper.current(7, 0.0), 0.0)
+
+    def test_rejects_inverted_thresholds(self) -> None:
+        with self.assertRaises(ValueError):
+            FlapDamper(suppress_threshold=500, reuse_threshold=750)
+
+
+class WatcherFlapDampingTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.monkeypatch.setenv("INCIDENT_LOG_PATH", os.path.join(self.tmpdir.name, "incidents.ndjson"))
+        self.monkeypatch.setenv("FLAP_DAMPING", "true")
+        self.monkeypatch.setenv("FLAP_HALF_LIFE_SECONDS", "60")
+        self.monkeypatch.setenv("FLAP_SUPPRESS_THRESHOLD", "2500")
+        self.watcher = NodeHealthWatcher()
+        self.watcher.node_states = {"n1": "True", "n2": "True"}
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def flap(self, name: str, times: int) -> None:
+        for index in range(times):
+            self.watcher.apply_node_status(name, "False" if index % 2 == 0 else "True")
+
+    def test_flapping_node_is_reported_once_as_flapping(self) -> None:
+        self.flap("n1", 5)
+        self.watcher.apply_node_status("n2", "False")
+        self.assertEqual(self.watcher.state.pending_names(self.watcher.state.pending_flapping), ["n1"])
+        self.assertEqual(self.watcher.pending_down, {"n2"})
+        self.assertIn(("reuse", "n1"), self.watcher.timer_wheel)
+        self.assertEqual(self.watcher.metrics.flap_suppressions.value(), 1)
+
+        payload = self.watcher.build_payload()
+        self.assertEqual(payload["event"], "incident")
+        self.assertEqual(payload["nodes_down"], "n2")
+        self.assertEqual(payload["nodes_flapping"], "n1")
+
+    def test_only_flapping_nodes_produce_a_flapping_payload(self) -> None:
+        self.flap("n1", 3)
+        payload = self.watcher.build_payload()
+        self.assertEqual(payload["event"], "flapping")
+        self.assertEqual(payload["error_code"], "NODE_FLAPPING")
+        self.assertIn("Node flapping in", payload["summary"])
+
+        self.watcher.state.clear_pending()
+        self.watcher.flush_deadline = None
+        self.flap("n1", 2)
+        self.assertEqual(self.watcher.state.pending_count(), 0)
+        self.assertIsNone(self.watcher.flush_deadline)
+
+    def test_reuse_timer_reannounces_settled_status(self) -> None:
+        self.flap("n1", 3)
+        self.watcher.state.clear_pending()
+        node_id = self.watcher.state.ids["n1"]
+        damper = self.watcher.flap_damper
+        # Age the penalty past the reuse threshold instead of sleeping through the half-life.
+        damper.updated_at[node_id] -= damper.seconds_until_reuse(node_id, time.time()) + 1
+
+        self.watcher.reuse_flapping_node(("reuse", "n1"))
+        self.assertFalse(damper.is_suppressed(node_id))
+        self.assertEqual(self.watcher.pending_down, {"n1"})
+        self.assertIsNotNone(self.watcher.flush_deadline)
+
+    def test_forget_node_resets_penalty(self) -> None:
+        self.flap("n1", 3)
+        node_id = self.watcher.state.ids["n1"]
+        self.watcher.forget_node("n1")
+        self.assertNotIn(("reuse", "n1"), self.watcher.timer_wheel)
+        self.assertEqual(self.watcher.flap_damper.current(node_id, time.time()), 0.0)
+
+    def test_resync_deletion_does_not_leak_suppression_to_reused_id(self) -> None:
+        self.flap("n1", 3)
+        node_id = self.watcher.state.ids["n1"]
+        self.watcher.state.clear_pending()
+
+        self.watcher.resync_node_state(FakeCoreV1Api([node_page({"n2": "True"})]))
+        self.assertNotIn(("reuse", "n1"), self.watcher.timer_wheel)
+        self.watcher.apply_node_status("newnode", "True")
+        self.assertEqual(self.watcher.state.ids["newnode"], node_id)
+
+        self.watcher.apply_node_status("newnode", "False")
+        self.assertFalse(self.watcher.flap_damper.is_suppressed(node_id))
+        self.assertEqual(self.watcher.pending_down, {"newnode"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from src.watcher.main import NodeHealthWatcher
+
+
+class FlushSchedulerTests(unittest.TestCase):
+    def test_flush_fires_at_deadline_without_watch_traffic(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.monkeypatch.setenv("INCIDENT_LOG_PATH", os.path.join(tmpdir, "incidents.ndjson"))
+            self.monkeypatch.setenv("WATCH_DEBOUNCE_SECONDS", "0.2")
+            watcher = NodeHealthWatcher()
+            self.assertEqual(watcher.watch_debounce_seconds, 0.2)
+
+            watcher.node_states = {"n1": "True"}
+            threading.Thread(target=watcher.run_flush_scheduler, daemon=True).start()
+
+            with self.assertLogs("node-health-watcher", level="INFO") as logs:
+                started = time.time()
+                watcher.apply_node_status("n1", "False")
+                while watcher.pending_down and time.time() - started < 2:
+                    time.sleep(0.01)
+                flushed_after = time.time() - started
+
+            self.assertEqual(watcher.pending_down, set())
+            self.assertIsNone(watcher.flush_deadline)
+            self.assertGreaterEqual(flushed_after, 0.2)
+            self.assertLess(flushed_after, 0.5)
+
+            queued = [json.loads(line.split(":", 2)[2]) for line in logs.output if '"flush_queued"' in line]
+            self.assertEqual(len(queued), 1)
+            self.assertLess(queued[0]["flush_lag_seconds"], 0.25)
+            self.assertEqual(watcher.dispatch_queue.depth(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+import urllib.error
+import urllib.request
+
+from src.watcher.dispatch import DispatchJob
+from src.watcher.main import NodeHealthWatcher
+
+
+class HealthProbeTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.monkeypatch.setenv("INCIDENT_LOG_PATH", os.path.join(self.tmpdir.name, "incidents.ndjson"))
+        self.monkeypatch.setenv("WATCH_STALL_SECONDS", "5")
+        self.monkeypatch.setenv("DISPATCH_LATENCY_BUDGET_SECONDS", "10")
+        self.watcher = NodeHealthWatcher()
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def test_liveness_fails_once_the_watch_stalls(self) -> None:
+        self.assertTrue(self.watcher.health_status()[0])
+        self.watcher.last_watch_activity = time.monotonic() - 6
+        ok, details = self.watcher.health_status()
+        self.assertFalse(ok)
+        self.assertGreaterEqual(details["watch_activity_age_seconds"], 6)
+
+        self.watcher.handle_raw_watch_event({"type": "BOOKMARK", "object": {"metadata": {"resourceVersion": "9"}}})
+        self.assertTrue(self.watcher.health_status()[0])
+
+    def test_readiness_needs_prime_and_a_timely_dispatch_queue(self) -> None:
+        self.assertFalse(self.watcher.readiness_status()[0])
+        self.watcher.primed = True
+        self.assertTrue(self.watcher.readiness_status()[0])
+
+        self.watcher.dispatch_queue.submit(DispatchJob({"event": "incident"}))
+        self.watcher.dispatch_queue._items[0] = (time.monotonic() - 11, self.watcher.dispatch_queue._items[0][1])
+        ok, details = self.watcher.readiness_status()
+        self.assertFalse(ok)
+        self.assertGreater(details["dispatch_queue_oldest_age_seconds"], 10)
+
+    def test_probes_are_served_next_to_metrics(self) -> None:
+        self.monkeypatch.setenv("METRICS_PORT", "0")
+        watcher = NodeHealthWatcher()
+        watcher.start_metrics_server()
+        assert watcher.metrics_server is not None
+        base = f"http://127.0.0.1:{watcher.metrics_server.port}"
+        try:
+            with urllib.request.urlopen(f"{base}/healthz", timeout=5) as response:
+                self.assertEqual(json.loads(response.read())["status"], "ok")
+            with self.assertRaises(urllib.error.HTTPError) as raised:
+                urllib.request.urlopen(f"{base}/readyz", timeout=5)
+            self.assertEqual(raised.exception.code, 503)
+            self.assertFalse(json.loads(raised.exception.read())["primed"])
+        finally:
+            watcher.metrics_server.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
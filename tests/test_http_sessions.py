@@ -0,0 +1,103 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Tuple
+
+from src.watcher.main import NodeHealthWatcher
+
+
+class RecordingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    client_ports: List[int] = []
+    statuses: List[int] = []
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", "0")))
+        self.client_ports.append(self.client_address[1])
+        status = self.statuses.pop(0) if self.statuses else 200
+        body = b"{}"
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+class HttpSessionTests(unittest.TestCase):
+    def setUp(self) -> None:
+        RecordingHandler.client_ports = []
+        RecordingHandler.statuses = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), RecordingHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+        base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        env = {
+            "INCIDENT_LOG_PATH": os.path.join(self.tmpdir.name, "incidents.ndjson"),
+            "AIRFLOW_BASE_URL": base_url,
+            "AIRFLOW_USERNAME": "user",
+            "AIRFLOW_PASSWORD": "pass",
+            "GHA_DISPATCH_URL": f"{base_url}/repos/org/repo/dispatches",
+            "GHA_TOKEN": "token",
+            "HTTP_CONNECT_TIMEOUT_SECONDS": "1.5",
+        }
+        for name, value in env.items():
+            self.monkeypatch.setenv(name, value)
+        self.watcher = NodeHealthWatcher()
+        self.watcher.airflow_max_retries = 2
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmpdir.cleanup()
+
+    def test_sinks_reuse_keep_alive_connections_across_flushes_and_retries(self) -> None:
+        RecordingHandler.statuses = [503]
+        payload = {"event": "incident"}
+
+        self.assertTrue(self.watcher.trigger_airflow(payload))
+        self.assertTrue(self.watcher.trigger_airflow(payload))
+        self.assertTrue(self.watcher.trigger_github_dispatch(payload))
+        self.assertTrue(self.watcher.trigger_github_dispatch(payload))
+
+        self.assertEqual(len(RecordingHandler.client_ports), 5)
+        airflow_ports = set(RecordingHandler.client_ports[:3])
+        github_ports = set(RecordingHandler.client_ports[3:])
+        self.assertEqual(len(airflow_ports), 1)
+        self.assertEqual(len(github_ports), 1)
+
+    def test_sink_latency_is_observed_per_request_without_backoff(self) -> None:
+        RecordingHandler.statuses = [503]
+        self.assertTrue(self.watcher.trigger_airflow({"event": "incident"}))
+        self.assertTrue(self.watcher.trigger_github_dispatch({"event": "incident"}))
+
+        latency = self.watcher.metrics.sink_latency
+        self.assertEqual((latency.count("airflow"), latency.count("github")), (2, 1))
+        # The one-second backoff between the two airflow attempts is not part of either request.
+        self.assertLess(latency.series[("airflow",)][1][0], 1.0)
+
+    def test_airflow_retries_stop_at_the_sink_deadline(self) -> None:
+        RecordingHandler.statuses = [503, 503, 503]
+        self.watcher.airflow_max_retries = 5
+
+        started = time.monotonic()
+        self.assertFalse(self.watcher.trigger_airflow({"event": "incident"}, deadline=started + 0.5))
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(len(RecordingHandler.client_ports), 1)
+
+    def test_connect_and_read_timeouts_are_separate(self) -> None:
+        timeout: Tuple[float, float] = self.watcher.sink_timeout()
+        self.assertEqual(timeout, (1.5, float(self.watcher.airflow_timeout_seconds)))
+        _, capped = self.watcher.sink_timeout(deadline=time.monotonic() + 2)
+        self.assertLessEqual(capped, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+from typing import Any, Dict, List
+
+from src.watcher.main import NodeHealthWatcher
+
+
+class FakeResponse:
+    def __init__(self, status_code: int) -> None:
+        self.status_code = status_code
+        self.text = ""
+
+
+class FakeSession:
+    def __init__(self, statuses: List[int]) -> None:
+        self.statuses = statuses
+        self.bodies: List[Dict[str, Any]] = []
+
+    def post(self, url: str, **kwargs: Any) -> FakeResponse:
+        self.bodies.append(kwargs["json"])
+        return FakeResponse(self.statuses.pop(0))
+
+
+class IdempotentDagRunTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        env = {
+            "INCIDENT_LOG_PATH": os.path.join(self.tmpdir.name, "incidents.ndjson"),
+            "CLUSTER_NAME": "pi k3s",
+            "AIRFLOW_BASE_URL": "http://airflow.invalid",
+            "AIRFLOW_USERNAME": "user",
+            "AIRFLOW_PASSWORD": "pass",
+        }
+        for name, value in env.items():
+            self.monkeypatch.setenv(name, value)
+        self.watcher = NodeHealthWatcher()
+        self.watcher.node_states = {"n1": "False"}
+        self.watcher.pending_down = {"n1"}
+        self.watcher.flush_seq = 7
+        self.payload = self.watcher.build_payload()
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def test_dag_run_id_is_deterministic_per_payload(self) -> None:
+        dag_run_id = self.watcher.airflow_dag_run_id(self.payload)
+        self.assertTrue(dag_run_id.startswith("node-health__pi-k3s__7__"))
+        self.assertEqual(dag_run_id, self.watcher.airflow_dag_run_id(dict(self.payload)))
+        self.assertNotEqual(dag_run_id, self.watcher.airflow_dag_run_id({**self.payload, "flush_seq": "8"}))
+
+    def test_retries_reuse_the_id_and_conflict_counts_as_success(self) -> None:
+        session = FakeSession([504, 409])
+        self.watcher.airflow_session = session  # type: ignore[assignment]
+        self.watcher.airflow_max_retries = 3
+
+        self.assertTrue(self.watcher.trigger_airflow(self.payload))
+        self.assertEqual(len(session.bodies), 2)
+        self.assertEqual(session.bodies[0]["dag_run_id"], session.bodies[1]["dag_run_id"])
+        self.assertEqual(session.bodies[0]["conf"], self.payload)
+
+    def test_flush_numbers_payloads(self) -> None:
+        self.watcher.flush_if_due(force=True)
+        job = self.watcher.dispatch_queue._items[0][1]
+        self.assertEqual(job.payload["flush_seq"], "8")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import gzip
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from typing import Any, Dict
+from unittest import mock
+
+from src.watcher.incidents import IncidentLogWriter, iter_records, read_manifest, segments_for_window
+
+
+def record(stamp: str, code: str = "NODE_NOT_READY") -> Dict[str, str]:
+    return {"datetime": stamp, "error_code": code, "log_message": "x" * 40}
+
+
+class IncidentLogRotationTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "incidents.ndjson"
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def test_rotates_by_size_and_compresses_segments(self) -> None:
+        writer = IncidentLogWriter(self.path, rotate_bytes=300)
+        for minute in range(6):
+            writer.write(record(f"2026-02-12T08:0{minute}:00Z"))
+        writer.wait_for_compression()
+        writer.close()
+
+        segments = read_manifest(self.path)
+        self.assertEqual(len(segments), 2)
+        self.assertTrue(all(segment["compressed"] for segment in segments))
+        self.assertEqual((segments[0]["first"], segments[0]["last"]), ("2026-02-12T08:00:00Z", "2026-02-12T08:02:00Z"))
+        with gzip.open(self.path.with_name(segments[0]["file"]), "rt", encoding="utf-8") as handle:
+            self.assertEqual(json.loads(handle.readline())["datetime"], "2026-02-12T08:00:00Z")
+        self.assertEqual(len([p for p in self.path.parent.glob("incidents.ndjson.*T*Z*") if p.suffix != ".idx"]), 2)
+        self.assertEqual(len(list(iter_records(self.path))), 6)
+
+    def test_rotates_on_day_boundary(self) -> None:
+        writer = IncidentLogWriter(self.path, rotate_daily=True, compress=False)
+        writer.write(record("2026-02-12T23:59:00Z"))
+        writer.write(record("2026-02-13T00:01:00Z"))
+        writer.close()
+
+        segments = read_manifest(self.path)
+        self.assertEqual([(s["first"], s["records"]) for s in segments], [("2026-02-12T23:59:00Z", 1)])
+        self.assertIn("2026-02-13T00:01:00Z", self.path.read_text(encoding="utf-8"))
+
+    def test_retention_deletes_oldest_segments(self) -> None:
+        writer = IncidentLogWriter(self.path, retention=2, compress=False)
+        for day in range(1, 5):
+            writer.write(record(f"2026-02-0{day}T00:00:00Z"))
+            writer.rotate()
+        writer.close()
+
+        segments = read_manifest(self.path)
+        self.assertEqual([segment["first"] for segment in segments], ["2026-02-03T00:00:00Z", "2026-02-04T00:00:00Z"])
+        self.assertEqual(len([p for p in self.path.parent.glob("incidents.ndjson.*T*Z*") if p.suffix != ".idx"]), 2)
+
+    def test_retention_leaves_a_segment_being_compressed_to_its_compressor(self) -> None:
+        writer = IncidentLogWriter(self.path, retention=1)
+        release = threading.Event()
+        copy = shutil.copyfileobj
+
+        def slow_copy(*args: Any) -> None:
+            release.wait(5)
+            copy(*args)
+
+        with mock.patch("src.watcher.incidents.shutil.copyfileobj", side_effect=slow_copy):
+            for day in range(1, 3):
+                writer.write(record(f"2026-02-0{day}T00:00:00Z"))
+                writer.rotate()
+            release.set()
+            writer.wait_for_compression(5)
+        writer.close()
+
+        (segment,) = read_manifest(self.path)
+        self.assertEqual(segment["first"], "2026-02-02T00:00:00Z")
+        self.assertTrue(segment["compressed"])
+        leftovers = sorted(p.name for p in self.path.parent.iterdir() if p.name.startswith(("incidents.ndjson.", ".incidents")))
+        self.assertEqual(leftovers, sorted([segment["file"], segment["index"], "incidents.ndjson.manifest.json"]))
+
+    def test_readers_skip_segments_outside_window(self) -> None:
+        writer = IncidentLogWriter(self.path, compress=False)
+        for day in range(1, 4):
+            writer.write(record(f"2026-02-0{day}T12:00:00Z"))
+            writer.rotate()
+        writer.write(record("2026-02-04T12:00:00Z"))
+        writer.close()
+
+        selected = segments_for_window(self.path, since="2026-02-02T00:00:00Z", until="2026-02-02T23:59:59Z")
+        self.assertEqual(len(selected), 2)
+        self.assertEqual(selected[-1], self.path)
+        stamps = [r["datetime"] for r in iter_records(self.path, since="2026-02-02T00:00:00Z", until="2026-02-03T23:59:59Z")]
+        self.assertEqual(stamps, ["2026-02-02T12:00:00Z", "2026-02-03T12:00:00Z"])
+
+    def test_restart_recovers_active_segment_bounds(self) -> None:
+        IncidentLogWriter(self.path, compress=False).write(record("2026-02-12T08:00:00Z"))
+        writer = IncidentLogWriter(self.path, compress=False)
+        writer.write(record("2026-02-12T09:00:00Z"))
+        writer.rotate()
+        writer.close()
+
+        self.assertEqual(
+            [(s["first"], s["last"], s["records"]) for s in read_manifest(self.path)],
+            [("2026-02-12T08:00:00Z", "2026-02-12T09:00:00Z", 2)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from typing import List
+from unittest import mock
+
+from src.watcher.incidents import IncidentLogWriter
+
+
+def read_lines(path: Path) -> List[str]:
+    if not path.exists():
+        return []
+    return path.read_text(encoding="utf-8").splitlines()
+
+
+class IncidentLogWriterTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "nested" / "incidents.ndjson"
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def test_batches_by_record_count_and_age(self) -> None:
+        writer = IncidentLogWriter(self.path, batch_records=3, flush_interval_seconds=0.05)
+        writer.write({"n": 1})
+        writer.write({"n": 2})
+        self.assertEqual(read_lines(self.path), [])
+        writer.write({"n": 3})
+        self.assertEqual(len(read_lines(self.path)), 3)
+
+        writer.write({"n": 4})
+        writer.flush_if_stale()
+        self.assertEqual(len(read_lines(self.path)), 3)
+        time.sleep(0.06)
+        writer.flush_if_stale()
+        self.assertEqual(read_lines(self.path)[-1], '{"n": 4}')
+        writer.close()
+
+    def test_fsync_policies(self) -> None:
+        for policy, expected in (("none", 0), ("batch", 1), ("record", 3)):
+            with mock.patch("src.watcher.incidents.os.fsync") as fsync:
+                writer = IncidentLogWriter(self.path, batch_records=10, fsync_policy=policy)
+                writer.write_many([{"n": 1}, {"n": 2}, {"n": 3}])
+                writer.close()
+            self.assertEqual(fsync.call_count, expected, policy)
+
+        with self.assertRaises(ValueError):
+            IncidentLogWriter(self.path, fsync_policy="sometimes")
+
+    def test_reopens_after_external_rotation(self) -> None:
+        writer = IncidentLogWriter(self.path)
+        writer.write({"n": 1})
+        rotated = self.path.with_name("incidents.ndjson.1")
+        os.rename(self.path, rotated)
+
+        writer.write({"n": 2})
+        writer.close()
+        self.assertEqual(read_lines(rotated), ['{"n": 1}'])
+        self.assertEqual(read_lines(self.path), ['{"n": 2}'])
+
+    def test_open_scans_ahead_of_the_first_write(self) -> None:
+        self.path.parent.mkdir(parents=True)
+        self.path.write_text('{"datetime": "2026-01-01T00:00:00Z", "seq": 4}\n', encoding="utf-8")
+        writer = IncidentLogWriter(self.path)
+        writer.open()
+        with mock.patch.object(IncidentLogWriter, "_scan_active_segment") as scan:
+            writer.write({"n": 1})
+            os.rename(self.path, self.path.with_name("incidents.ndjson.1"))
+            writer.open()
+        writer.close()
+        self.assertEqual(scan.call_count, 1)
+        self.assertEqual(read_lines(self.path), [])
+
+    def test_open_drops_a_torn_line_and_terminates_a_complete_one(self) -> None:
+        self.path.parent.mkdir(parents=True)
+        self.path.write_text('{"n": 1}\n{"n": 2', encoding="utf-8")
+        writer = IncidentLogWriter(self.path)
+        writer.write({"n": 3})
+        writer.close()
+        self.assertEqual(read_lines(self.path), ['{"n": 1}', '{"n": 3}'])
+
+        self.path.write_text('{"n": 1}\n{"n": 2}', encoding="utf-8")
+        writer = IncidentLogWriter(self.path)
+        writer.write({"n": 3})
+        writer.close()
+        self.assertEqual(read_lines(self.path), ['{"n": 1}', '{"n": 2}', '{"n": 3}'])
+
+    def test_flusher_backs_off_while_the_log_is_unwritable(self) -> None:
+        writer = IncidentLogWriter(self.path, flush_interval_seconds=0.01)
+        errors: List[Exception] = []
+        # Patched on the instance for good, since the daemon flusher outlives the test.
+        writer._open = mock.Mock(side_effect=OSError("read-only file system"))  # type: ignore[method-assign]
+        writer.start(on_error=errors.append)
+        time.sleep(0.5)
+        # Unthrottled, 0.5s of 10ms ticks would fail about 50 times.
+        self.assertLess(len(errors), 8)
+
+    def test_failed_open_keeps_records_for_retry(self) -> None:
+        writer = IncidentLogWriter(self.path)
+        with mock.patch.object(IncidentLogWriter, "_open", side_effect=OSError("read-only file system")):
+            with self.assertRaises(OSError):
+                writer.write({"n": 1})
+        writer.write({"n": 2})
+        writer.close()
+        self.assertEqual(read_lines(self.path), ['{"n": 1}', '{"n": 2}'])
+
+    def test_failed_fsync_does_not_duplicate_records(self) -> None:
+        writer = IncidentLogWriter(self.path)
+        with mock.patch("src.watcher.incidents.os.fsync", side_effect=OSError("I/O error")):
+            with self.assertRaises(OSError):
+                writer.write({"n": 1})
+        writer.close()
+        self.assertEqual(read_lines(self.path), ['{"n": 1}'])
+
+
+if __name__ == "__main__":
+    unittest.main()
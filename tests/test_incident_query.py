@@ -0,0 +1,107 @@
+import io
+import json
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from src.watcher.incidents import (
+    IncidentLogWriter,
+    index_path_for,
+    index_range,
+    iter_records,
+    main,
+    read_index,
+    read_manifest,
+    write_manifest,
+)
+
+
+def stamp(minute: int) -> str:
+    return f"2026-02-12T{minute // 60:02d}:{minute % 60:02d}:00Z"
+
+
+class IncidentQueryTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "incidents.ndjson"
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def write_minutes(self, writer: IncidentLogWriter, minutes: range) -> None:
+        for minute in minutes:
+            code = "NODE_RECOVERED" if minute % 10 == 0 else "NODE_NOT_READY"
+            writer.write({"datetime": stamp(minute), "error_code": code, "log_message": f"m{minute}"})
+
+    def test_index_points_at_record_starts(self) -> None:
+        writer = IncidentLogWriter(self.path, index_interval=4)
+        self.write_minutes(writer, range(10))
+        writer.close()
+
+        stamps, offsets = read_index(self.path)
+        self.assertEqual(stamps, [stamp(0), stamp(4), stamp(8)])
+        data = self.path.read_bytes()
+        for expected, offset in zip(stamps, offsets):
+            self.assertEqual(json.loads(data[offset:].split(b"\n", 1)[0])["datetime"], expected)
+
+    def test_index_range_skips_outside_records(self) -> None:
+        stamps, offsets = [stamp(0), stamp(4), stamp(8)], [0, 400, 800]
+        self.assertEqual(index_range(stamps, offsets, 1000, stamp(5), stamp(6)), (400, 800))
+        self.assertEqual(index_range(stamps, offsets, 1000, stamp(4), None), (0, 1000))
+        self.assertEqual(index_range(stamps, offsets, 1000, None, stamp(8)), (0, 1000))
+
+    def test_query_filters_by_window_and_code_across_segments(self) -> None:
+        writer = IncidentLogWriter(self.path, index_interval=8)
+        self.write_minutes(writer, range(0, 100))
+        writer.rotate()
+        self.write_minutes(writer, range(100, 200))
+        writer.close()
+        writer.wait_for_compression()
+
+        minutes = [r["log_message"] for r in iter_records(self.path, since=stamp(95), until=stamp(125))]
+        self.assertEqual(minutes, [f"m{m}" for m in range(95, 126)])
+        recovered = list(iter_records(self.path, since=stamp(50), code="NODE_RECOVERED"))
+        self.assertEqual([r["datetime"] for r in recovered], [stamp(m) for m in range(50, 200, 10)])
+
+    def test_index_is_rebuilt_for_an_existing_file(self) -> None:
+        writer = IncidentLogWriter(self.path, index_interval=4)
+        self.write_minutes(writer, range(10))
+        writer.close()
+        index_path_for(self.path).unlink()
+
+        writer = IncidentLogWriter(self.path, index_interval=4)
+        self.write_minutes(writer, range(10, 13))
+        writer.close()
+        self.assertEqual(read_index(self.path)[0], [stamp(0), stamp(4), stamp(8), stamp(12)])
+
+    def test_stale_manifest_follows_segment_to_its_gz(self) -> None:
+        writer = IncidentLogWriter(self.path)
+        self.write_minutes(writer, range(3))
+        writer.rotate()
+        self.write_minutes(writer, range(3, 4))
+        writer.close()
+        writer.wait_for_compression()
+
+        # A reader that loaded the manifest before the compressor renamed the segment.
+        segments = read_manifest(self.path)
+        segments[0]["file"] = segments[0]["file"][: -len(".gz")]
+        write_manifest(self.path, segments)
+        self.assertEqual([r["log_message"] for r in iter_records(self.path)], ["m0", "m1", "m2", "m3"])
+
+    def test_cli_prints_matching_records(self) -> None:
+        writer = IncidentLogWriter(self.path)
+        self.write_minutes(writer, range(30))
+        writer.close()
+
+        out = io.StringIO()
+        with redirect_stdout(out):
+            code = main(
+                ["query", "--path", str(self.path), "--since", "2026-02-12T00:10:00+00:00", "--until", stamp(20), "--code", "NODE_RECOVERED"]
+            )
+        self.assertEqual(code, 0)
+        self.assertEqual([json.loads(line)["datetime"] for line in out.getvalue().splitlines()], [stamp(10), stamp(20)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest import mock
+
+from src.watcher.main import NodeHealthWatcher
+
+
+class IncidentRecordTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "incidents.ndjson"
+        self.monkeypatch.setenv("INCIDENT_LOG_PATH", str(self.path))
+        self.monkeypatch.setenv("CHECKPOINT_PATH", os.path.join(self.tmpdir.name, "checkpoint.json"))
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def records(self) -> List[Dict[str, Any]]:
+        return [json.loads(line) for line in self.path.read_text(encoding="utf-8").splitlines()]
+
+    def make_watcher(self) -> NodeHealthWatcher:
+        watcher = NodeHealthWatcher()
+        watcher.node_states = {"a": "True", "b": "False", "c": "True"}
+        return watcher
+
+    def test_mixed_flush_records_per_node_transitions(self) -> None:
+        watcher = self.make_watcher()
+        watcher.apply_node_status("a", "Unknown")
+        watcher.apply_node_status("b", "True")
+        watcher.apply_node_status("c", "False")
+        watcher.apply_node_status("c", "True")
+        watcher.apply_node_status("c", "False")
+        watcher.flush_if_due(force=True)
+        watcher.incident_log.close()
+
+        (record,) = self.records()
+        self.assertEqual(record["recovery_status"], "partial")
+        self.assertEqual((record["cluster"], record["nodes_down"], record["nodes_recovered"]), ("pi-k3s", ["a", "c"], ["b"]))
+        self.assertEqual(
+            record["transitions"],
+            [
+                {"node": "a", "previous": "True", "current": "Unknown"},
+                {"node": "c", "previous": "True", "current": "False"},
+                {"node": "b", "previous": "False", "current": "True"},
+            ],
+        )
+        self.assertEqual((record["seq"], record["flush_seq"]), (1, 1))
+        self.assertTrue(record["flush_id"].startswith("node-health__pi-k3s__1__"))
+
+    def test_transitions_keep_the_deleted_status_and_drop_reverted_nodes(self) -> None:
+        watcher = self.make_watcher()
+        watcher.apply_node_status("a", "False")
+        watcher.apply_node_status("a", "True")
+        watcher.apply_node_status("b", "True")
+        watcher.apply_node_status("b", "Unknown")
+        watcher.apply_node_status("c", "False")
+        watcher.forget_node("c")
+        self.assertEqual(watcher.pending_down, {"c"})
+        self.assertEqual(watcher.pending_recovered, set())
+        self.assertTrue(watcher.save_checkpoint())
+
+        restored = NodeHealthWatcher()
+        self.assertTrue(restored.restore_checkpoint())
+        restored.flush_if_due(force=True)
+        restored.incident_log.close()
+        (record,) = self.records()
+        self.assertEqual(record["transitions"], [{"node": "c", "previous": "True", "current": "False"}])
+
+    def test_sequence_continues_after_restart(self) -> None:
+        watcher = self.make_watcher()
+        watcher.apply_node_status("a", "False")
+        watcher.flush_if_due(force=True)
+        watcher.apply_node_status("a", "True")
+        watcher.flush_if_due(force=True)
+        watcher.incident_log.close()
+
+        restarted = self.make_watcher()
+        restarted.apply_node_status("c", "False")
+        restarted.flush_if_due(force=True)
+        restarted.incident_log.close()
+        self.assertEqual([record["seq"] for record in self.records()], [1, 2, 3])
+
+    def test_startup_open_keeps_the_segment_scan_off_the_flush(self) -> None:
+        watcher = self.make_watcher()
+        watcher.apply_node_status("a", "False")
+        watcher.flush_if_due(force=True)
+        watcher.incident_log.close()
+
+        restarted = self.make_watcher()
+        restarted.open_incident_log()
+        self.assertEqual(restarted.incident_seq, 1)
+        restarted.apply_node_status("c", "False")
+        with mock.patch.object(restarted.incident_log, "_scan_active_segment") as scan:
+            restarted.flush_if_due(force=True)
+        restarted.incident_log.close()
+        scan.assert_not_called()
+        self.assertEqual([record["seq"] for record in self.records()], [1, 2])
+
+    def test_record_is_written_outside_the_state_lock(self) -> None:
+        watcher = self.make_watcher()
+        lock_held: List[bool] = []
+        write_many = watcher.incident_log.write_many
+
+        def record_lock(records: Any) -> None:
+            lock_held.append(watcher.state_lock._is_owned())  # type: ignore[attr-defined]
+            write_many(records)
+
+        watcher.apply_node_status("a", "False")
+        with mock.patch.object(watcher.incident_log, "write_many", side_effect=record_lock):
+            watcher.flush_if_due(force=True)
+        watcher.incident_log.close()
+        self.assertEqual(lock_held, [False])
+        self.assertEqual([record["nodes_down"] for record in self.records()], [["a"]])
+
+    def test_previous_status_survives_checkpoint(self) -> None:
+        watcher = self.make_watcher()
+        watcher.apply_node_status("a", "Unknown")
+        self.assertTrue(watcher.save_checkpoint())
+
+        restored = NodeHealthWatcher()
+        self.assertTrue(restored.restore_checkpoint())
+        self.assertEqual(restored.state.previous_status("a"), "True")
+        restored.flush_if_due(force=True)
+        restored.incident_log.close()
+        self.assertEqual(self.records()[0]["transitions"], [{"node": "a", "previous": "True", "current": "Unknown"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime, timezone
+
+from kubernetes.client import V1Lease, V1LeaseSpec, V1ObjectMeta
+
+from src.watcher.main import NodeHealthWatcher
+
+
+def lease(name: str, renewed_at: float, resource_version: str = "1") -> V1Lease:
+    return V1Lease(
+        metadata=V1ObjectMeta(name=name, resource_version=resource_version),
+        spec=V1LeaseSpec(renew_time=datetime.fromtimestamp(renewed_at, tz=timezone.utc)),
+    )
+
+
+class LeaseDetectionTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.monkeypatch.setenv("INCIDENT_LOG_PATH", os.path.join(self.tmpdir.name, "incidents.ndjson"))
+        self.monkeypatch.setenv("LEASE_STALE_SECONDS", "20")
+        self.watcher = NodeHealthWatcher()
+        self.watcher.node_states = {"n1": "True", "n2": "True"}
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def fire_due(self, seconds_ahead: float) -> None:
+        for callback, key in self.watcher.timer_wheel.advance(time.monotonic() + seconds_ahead):
+            callback(key)
+
+    def test_stale_lease_marks_node_down_through_debounce(self) -> None:
+        now = time.time()
+        self.watcher.handle_lease_event({"type": "ADDED", "object": lease("n1", now - 15)})
+        self.watcher.handle_lease_event({"type": "ADDED", "object": lease("n2", now)})
+        self.fire_due(2)
+        self.assertEqual(self.watcher.pending_down, set())
+
+        self.fire_due(10)
+        self.assertEqual(self.watcher.state.get("n1"), "Unknown")
+        self.assertEqual(self.watcher.pending_down, {"n1"})
+        self.assertIsNotNone(self.watcher.flush_deadline)
+        self.assertEqual(self.watcher.state.get("n2"), "True")
+        self.assertIn(("lease", "n2"), self.watcher.timer_wheel)
+
+    def test_lease_already_stale_on_list_fires_on_next_tick(self) -> None:
+        self.watcher.handle_lease("n1", datetime.fromtimestamp(time.time() - 60, tz=timezone.utc))
+        self.fire_due(1)
+        self.assertEqual(self.watcher.pending_down, {"n1"})
+
+    def test_renewal_restores_reported_status(self) -> None:
+        now = time.time()
+        self.watcher.handle_lease("n1", datetime.fromtimestamp(now - 60, tz=timezone.utc))
+        self.fire_due(1)
+
+        # The node controller has not flipped Ready yet; the stale lease keeps the node down.
+        self.watcher.apply_node_status("n1", "True")
+        self.assertEqual(self.watcher.state.get("n1"), "Unknown")
+
+        self.watcher.handle_lease("n1", datetime.fromtimestamp(now, tz=timezone.utc))
+        self.assertEqual(self.watcher.state.get("n1"), "True")
+        # Down and back within one debounce window nets out to nothing to report.
+        self.assertEqual(self.watcher.pending_down, set())
+        self.assertEqual(self.watcher.pending_recovered, set())
+        self.assertNotIn("n1", self.watcher.lease_suspects)
+
+    def test_deleted_lease_cancels_its_timer(self) -> None:
+        self.watcher.handle_lease_event({"type": "ADDED", "object": lease("n1", time.time())})
+        self.watcher.handle_lease_event({"type": "DELETED", "object": lease("n1", time.time())})
+        self.assertEqual(len(self.watcher.timer_wheel), 0)
+        self.fire_due(30)
+        self.assertEqual(self.watcher.state.get("n1"), "True")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+import urllib.request
+
+from src.watcher.main import NodeHealthWatcher
+from src.watcher.metrics import Metric, MetricsServer, Registry
+
+
+class MetricsTests(unittest.TestCase):
+    def test_renders_prometheus_text_format(self) -> None:
+        registry = Registry()
+        counter = registry.counter("events_total", "Events.", ["type"])
+        histogram = registry.histogram("latency_seconds", "Latency.", ["sink"], buckets=(0.1, 1.0))
+        registry.gauge("depth", "Depth.", lambda: 3)
+        counter.inc("ADDED")
+        counter.inc("ADDED")
+        counter.inc('we"ird')
+        histogram.observe(0.1, "airflow")
+        histogram.observe(0.5, "airflow")
+        histogram.observe(5.0, "airflow")
+
+        text = registry.render()
+        self.assertIn("# TYPE events_total counter\n", text)
+        self.assertIn('events_total{type="ADDED"} 2\n', text)
+        self.assertIn('events_total{type="we\\"ird"} 1\n', text)
+        self.assertIn('latency_seconds_bucket{sink="airflow",le="0.1"} 1\n', text)
+        self.assertIn('latency_seconds_bucket{sink="airflow",le="1"} 2\n', text)
+        self.assertIn('latency_seconds_bucket{sink="airflow",le="+Inf"} 3\n', text)
+        self.assertIn('latency_seconds_sum{sink="airflow"} 5.6\n', text)
+        self.assertIn('latency_seconds_count{sink="airflow"} 3\n', text)
+        self.assertIn("depth 3\n", text)
+
+    def test_metric_without_samples_cannot_be_instantiated(self) -> None:
+        with self.assertRaises(TypeError):
+            Metric("untyped", "No samples.")  # type: ignore[abstract]
+
+    def test_server_serves_metrics_and_404(self) -> None:
+        registry = Registry()
+        registry.counter("up_total", "Up.").inc()
+        server = MetricsServer(registry, 0, host="127.0.0.1")
+        server.start()
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5) as response:
+                self.assertEqual(response.status, 200)
+                self.assertIn("version=0.0.4", response.headers["Content-Type"])
+                self.assertIn("up_total 1", response.read().decode("utf-8"))
+            with self.assertRaises(urllib.error.HTTPError) as raised:
+                urllib.request.urlopen(f"http://127.0.0.1:{server.port}/nope", timeout=5)
+            self.assertEqual(raised.exception.code, 404)
+        finally:
+            server.stop()
+
+    def test_watcher_records_transitions_flushes_and_gauges(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.monkeypatch.setenv("INCIDENT_LOG_PATH", os.path.join(tmpdir, "incidents.ndjson"))
+            watcher = NodeHealthWatcher()
+            watcher.node_states = {"a": "True", "b": "True"}
+            watcher.apply_node_status("a", "False")
+            watcher.apply_node_status("b", "False")
+
+            text = watcher.metrics.registry.render()
+            self.assertIn('node_health_transitions_total{transition="node_became_non_ready"} 2\n', text)
+            self.assertIn("node_health_pending_down 2\n", text)
+            self.assertIn("node_health_nodes_down 2\n", text)
+
+            watcher.flush_if_due(force=True)
+            watcher.incident_log.close()
+            text = watcher.metrics.registry.render()
+            self.assertIn('node_health_flushes_total{event="incident"} 1\n', text)
+            self.assertIn("node_health_pending_down 0\n", text)
+            self.assertIn("node_health_dispatch_queue_depth 1\n", text)
+            self.assertEqual(watcher.metrics.build_payload.count(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import random
+import tempfile
+import unittest
+from typing import Dict
+from unittest import mock
+
+from src.watcher.main import NodeHealthWatcher
+from src.watcher.state import TABLE_BLOCK_NODES, NodeStateStore
+
+
+class NodeIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.monkeypatch.setenv("INCIDENT_LOG_PATH", os.path.join(self.tmpdir.name, "incidents.ndjson"))
+        self.watcher = NodeHealthWatcher()
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def assert_index_matches_scan(self) -> None:
+        states: Dict[str, str] = self.watcher.node_states
+        payload = self.watcher.build_payload()
+        expected_down = sorted(name for name, status in states.items() if status != "True")
+        expected_table = ["node\tready_status"] + [f"{name}\t{states[name]}" for name in sorted(states)]
+        self.assertEqual(payload["nodes_down_current"], ",".join(expected_down))
+        self.assertEqual(payload["nodes_table"], "\n".join(expected_table))
+
+    def test_index_tracks_updates_and_deletions(self) -> None:
+        randomizer = random.Random(7)
+        self.watcher.node_states = {f"n{index:03d}": "True" for index in range(0, 200, 2)}
+        self.assert_index_matches_scan()
+
+        for _ in range(2000):
+            name = f"n{randomizer.randrange(200):03d}"
+            if randomizer.random() < 0.1:
+                self.watcher.forget_node(name)
+            else:
+                self.watcher.apply_node_status(name, randomizer.choice(["True", "False", "Unknown"]))
+        self.assert_index_matches_scan()
+
+    def test_flush_rerenders_only_changed_table_blocks(self) -> None:
+        self.watcher.node_states = {f"n{index:05d}": "True" for index in range(10 * TABLE_BLOCK_NODES)}
+        self.watcher.build_payload()
+
+        with mock.patch.object(NodeStateStore, "render_block", autospec=True, side_effect=NodeStateStore.render_block) as render:
+            self.watcher.apply_node_status("n00300", "False")
+            self.watcher.build_payload()
+            self.assertEqual(render.call_count, 1)
+            self.assert_index_matches_scan()
+
+            render.reset_mock()
+            self.watcher.apply_node_status(f"n{10 * TABLE_BLOCK_NODES:05d}", "True")
+            self.watcher.forget_node(f"n{9 * TABLE_BLOCK_NODES + 1:05d}")
+            self.watcher.build_payload()
+            self.assertEqual(render.call_count, 1)
+        self.assert_index_matches_scan()
+
+    def test_reassigning_node_states_rebuilds_index(self) -> None:
+        self.watcher.apply_node_status("a", "False")
+        self.watcher.node_states = {"b": "Unknown", "c": "True"}
+        self.assertEqual(self.watcher.state.down_names, ["b"])
+        self.assertEqual(self.watcher.state.sorted_names, ["b", "c"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from typing import Dict, List, Optional
+from unittest import mock
+
+from src.watcher.dispatch import DispatchJob
+from src.watcher.main import NodeHealthWatcher
+from src.watcher.outbox import Outbox
+
+
+class OutboxTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "outbox.ndjson"
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def test_unacked_entries_are_replayed_after_reopen(self) -> None:
+        outbox = Outbox(self.path)
+        outbox.load()
+        first = outbox.put({"event": "incident"}, ["airflow", "github"])
+        second = outbox.put({"event": "recovery"}, ["airflow"])
+        outbox.ack(first.entry_id, "github")
+        outbox.ack(second.entry_id, "airflow")
+        outbox.close()
+
+        with self.path.open("a", encoding="utf-8") as handle:
+            handle.write('{"op": "put", "id": "torn"')
+
+        reopened = Outbox(self.path)
+        entries = reopened.load()
+        self.assertEqual([(entry.entry_id, entry.sinks, entry.payload) for entry in entries], [(first.entry_id, ["airflow"], {"event": "incident"})])
+
+    def test_new_entry_is_not_due_until_its_dispatch_finishes(self) -> None:
+        outbox = Outbox(self.path)
+        outbox.load()
+        entry = outbox.put({"event": "incident"}, ["github"])
+        self.assertTrue(entry.in_flight)
+        self.assertEqual(outbox.due(entry.created_at + 3600), [])
+
+    def test_group_commit_shares_fsyncs(self) -> None:
+        outbox = Outbox(self.path)
+        outbox.load()
+        real_fsync = os.fsync
+        release = threading.Event()
+        fsyncs: List[int] = []
+
+        def slow_fsync(fd: int) -> None:
+            fsyncs.append(fd)
+            release.wait(2)
+            real_fsync(fd)
+
+        with mock.patch("src.watcher.outbox.os.fsync", side_effect=slow_fsync):
+            leader = threading.Thread(target=lambda: outbox.sync(outbox.put({"n": "0"}, ["airflow"]).seq))
+            leader.start()
+            while not fsyncs:
+                pass
+            followers = []
+            for index in range(1, 9):
+                entry = outbox.put({"n": str(index)}, ["airflow"])
+                thread = threading.Thread(target=outbox.sync, args=(entry.seq,))
+                thread.start()
+                followers.append(thread)
+            release.set()
+            leader.join(5)
+            for thread in followers:
+                thread.join(5)
+
+        self.assertEqual(len(fsyncs), 2)
+        self.assertEqual(len(self.path.read_text(encoding="utf-8").splitlines()), 9)
+
+    def test_compaction_keeps_only_outstanding_entries(self) -> None:
+        outbox = Outbox(self.path, compact_threshold=3)
+        outbox.load()
+        keep = outbox.put({"n": "keep"}, ["github"])
+        for index in range(3):
+            entry = outbox.put({"n": str(index)}, ["airflow"])
+            outbox.ack(entry.entry_id, "airflow")
+        self.assertTrue(outbox.maybe_compact())
+        self.assertEqual(len(self.path.read_text(encoding="utf-8").splitlines()), 1)
+
+        outbox.ack(keep.entry_id, "github")
+        outbox.close()
+        self.assertEqual(Outbox(self.path).load(), [])
+
+
+class WatcherOutboxTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        env = {
+            "INCIDENT_LOG_PATH": os.path.join(self.tmpdir.name, "incidents.ndjson"),
+            "OUTBOX_PATH": os.path.join(self.tmpdir.name, "outbox.ndjson"),
+            "AIRFLOW_BASE_URL": "http://airflow.invalid",
+            "AIRFLOW_USERNAME": "user",
+            "AIRFLOW_PASSWORD": "pass",
+        }
+        for name, value in env.items():
+            self.monkeypatch.setenv(name, value)
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def test_failed_dispatch_survives_restart_and_is_redelivered(self) -> None:
+        before = NodeHealthWatcher()
+        before.open_outbox()
+        before.node_states = {"n1": "False"}
+        before.pending_down = {"n1"}
+        before.trigger_airflow = lambda payload, deadline=None: False  # type: ignore[method-assign]
+        before.flush_if_due(force=True)
+        job = before.dispatch_queue._items[0][1]
+        before.dispatch_job(job, 0.0)
+        self.assertIsNotNone(before.outbox)
+        self.assertEqual(len(before.outbox.entries), 1)  # type: ignore[union-attr]
+
+        after = NodeHealthWatcher()
+        after.open_outbox()
+        delivered: List[Dict[str, str]] = []
+
+        def airflow(payload: Dict[str, str], deadline: Optional[float] = None) -> bool:
+            delivered.append(payload)
+            return True
+
+        after.trigger_airflow = airflow  # type: ignore[method-assign]
+        after.retry_outbox()
+        redelivery: DispatchJob = after.dispatch_queue._items[0][1]
+        self.assertEqual(redelivery.sinks, ("airflow",))
+        after.dispatch_job(redelivery, 0.0)
+
+        self.assertEqual(delivered, [job.payload])
+        self.assertEqual(after.outbox.entries, {})  # type: ignore[union-attr]
+
+    def test_flushed_entry_is_durable_before_checkpoint_drops_pending_state(self) -> None:
+        self.monkeypatch.setenv("CHECKPOINT_PATH", os.path.join(self.tmpdir.name, "checkpoint.json"))
+        outbox_path = Path(self.tmpdir.name) / "outbox.ndjson"
+        watcher = NodeHealthWatcher()
+        watcher.open_outbox()
+        watcher.node_states = {"n1": "True", "n2": "True"}
+
+        watcher.apply_node_status("n1", "False")
+        watcher.flush_if_due(force=True)
+        self.assertEqual(outbox_path.read_text(encoding="utf-8"), "")
+        self.assertTrue(watcher.save_checkpoint())
+        self.assertEqual(len(Outbox(outbox_path).load()), 1)
+
+        watcher.dispatch_queue.max_size = 1
+        watcher.apply_node_status("n2", "False")
+        watcher.flush_if_due(force=True)
+        self.assertEqual(len(Outbox(outbox_path).load()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,8 +9,8 @@ class PhaseAPayloadTests(unittest.TestCase):
     def test_phase_a_payload_and_incident_log(self) -> None:
         with tempfile.TemporaryDirectory() as tmpdir:
             log_path = os.path.join(tmpdir, "incidents.ndjson")
-            os.environ["CLUSTER_NAME"] = "pi-k3s"
-            os.environ["INCIDENT_LOG_PATH"] = log_path
+            self.monkeypatch.setenv("CLUSTER_NAME", "pi-k3s")
+            self.monkeypatch.setenv("INCIDENT_LOG_PATH", log_path)
 
             watcher = NodeHealthWatcher()
             watcher.node_states = {"n1": "False", "n2": "True"}
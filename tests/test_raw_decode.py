@@ -0,0 +1,99 @@
+import json
+import os
+import tempfile
+import unittest
+from typing import Any, Dict, Iterator, List
+
+from kubernetes.client.rest import ApiException
+
+from src.watcher.main import NodeHealthWatcher
+
+
+def raw_node(name: str, ready: str, resource_version: str) -> Dict[str, Any]:
+    return {
+        "kind": "Node",
+        "metadata": {"name": name, "resourceVersion": resource_version},
+        "status": {
+            "conditions": [{"type": "MemoryPressure", "status": "False"}, {"type": "Ready", "status": ready}],
+            "images": [{"names": ["registry.example.com/big:latest"], "sizeBytes": 1}],
+        },
+    }
+
+
+class FakeStreamResponse:
+    def __init__(self, events: List[Dict[str, Any]]) -> None:
+        self.body = "".join(json.dumps(event) + "\n" for event in events).encode("utf-8")
+        self.closed = False
+
+    def stream(self, amt: Any = None, decode_content: bool = False) -> Iterator[bytes]:
+        for start in range(0, len(self.body), 64):
+            yield self.body[start : start + 64]
+
+    def close(self) -> None:
+        self.closed = True
+
+    def release_conn(self) -> None:
+        pass
+
+
+class FakeCoreV1Api:
+    def __init__(self, response: FakeStreamResponse) -> None:
+        self.response = response
+        self.kwargs: Dict[str, Any] = {}
+
+    def list_node(self, **kwargs: Any) -> FakeStreamResponse:
+        self.kwargs = kwargs
+        return self.response
+
+
+class RawDecodeTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.monkeypatch.setenv("INCIDENT_LOG_PATH", os.path.join(self.tmpdir.name, "incidents.ndjson"))
+        self.monkeypatch.setenv("WATCH_DECODE_MODE", "raw")
+        self.watcher = NodeHealthWatcher()
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def test_raw_stream_feeds_transitions(self) -> None:
+        self.watcher.node_states = {"n1": "True"}
+        self.watcher.resource_version = "10"
+        response = FakeStreamResponse(
+            [
+                {"type": "MODIFIED", "object": raw_node("n1", "False", "11")},
+                {"type": "BOOKMARK", "object": {"kind": "Node", "metadata": {"resourceVersion": "15"}}},
+            ]
+        )
+        api = FakeCoreV1Api(response)
+
+        for event in self.watcher.stream_raw_events(api):
+            self.watcher.handle_raw_watch_event(event)
+
+        self.assertTrue(api.kwargs["watch"])
+        self.assertFalse(api.kwargs["_preload_content"])
+        self.assertEqual(api.kwargs["resource_version"], "10")
+        self.assertTrue(response.closed)
+        self.assertEqual(self.watcher.node_states, {"n1": "False"})
+        self.assertEqual(self.watcher.pending_down, {"n1"})
+        self.assertEqual(self.watcher.resource_version, "15")
+
+    def test_raw_deleted_and_error_events(self) -> None:
+        self.watcher.node_states = {"n1": "True"}
+        self.watcher.handle_raw_watch_event({"type": "DELETED", "object": raw_node("n1", "True", "12")})
+        self.assertEqual(self.watcher.node_states, {})
+
+        with self.assertRaises(ApiException) as ctx:
+            self.watcher.handle_raw_watch_event(
+                {"type": "ERROR", "object": {"kind": "Status", "code": 410, "reason": "Expired", "message": "too old"}}
+            )
+        self.assertEqual(ctx.exception.status, 410)
+
+    def test_rejects_unknown_decode_mode(self) -> None:
+        self.monkeypatch.setenv("WATCH_DECODE_MODE", "fast")
+        with self.assertRaises(ValueError):
+            NodeHealthWatcher()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+from src.watcher.state import Bitset, NodeStateStore
+
+
+class BitsetTests(unittest.TestCase):
+    def test_add_discard_iterate(self) -> None:
+        bits = Bitset()
+        for index in (3, 17, 64, 3):
+            bits.add(index)
+        bits.discard(17)
+        bits.discard(1000)
+        self.assertEqual(list(bits), [3, 64])
+        self.assertEqual(len(bits), 2)
+        self.assertIn(64, bits)
+        self.assertNotIn(17, bits)
+        bits.clear()
+        self.assertEqual(list(bits), [])
+
+
+class NodeStateStoreTests(unittest.TestCase):
+    def test_interns_names_and_stores_status_codes(self) -> None:
+        store = NodeStateStore()
+        self.assertIsNone(store.set("b", "True"))
+        self.assertIsNone(store.set("a", "Unknown"))
+        self.assertEqual(store.set("b", "False"), "True")
+
+        self.assertEqual(store.ids, {"b": 0, "a": 1})
+        self.assertEqual(store.statuses.typecode, "b")
+        self.assertEqual(store.snapshot(), {"a": "Unknown", "b": "False"})
+        self.assertEqual(list(store.items()), [("a", "Unknown"), ("b", "False")])
+        self.assertEqual(store.down_names, ["a", "b"])
+        self.assertEqual(store.nodes_table(), "node\tready_status\na\tUnknown\nb\tFalse")
+
+    def test_pending_flags_survive_deletion_until_cleared(self) -> None:
+        store = NodeStateStore()
+        store.load({"n1": "True", "n2": "True"})
+        store.set("n1", "False")
+        store.mark_down("n1")
+        store.mark_recovered("n2")
+        store.mark_down("n2")
+
+        self.assertEqual(store.remove("n1"), "False")
+        self.assertNotIn("n1", store)
+        self.assertEqual(store.pending_names(store.pending_down), ["n1", "n2"])
+        self.assertEqual(store.pending_names(store.pending_recovered), [])
+
+        store.clear_pending()
+        self.assertEqual(store.pending_count(), 0)
+        self.assertEqual(store.free_ids, [0])
+        store.set("n3", "True")
+        self.assertEqual(store.ids["n3"], 0)
+        self.assertEqual(store.snapshot(), {"n2": "True", "n3": "True"})
+
+    def test_pending_for_unknown_node_is_reported_once(self) -> None:
+        store = NodeStateStore()
+        store.set_pending(store.pending_down, ["ghost"])
+        self.assertNotIn("ghost", store)
+        self.assertEqual(store.pending_names(store.pending_down), ["ghost"])
+        store.clear_pending()
+        self.assertEqual(store.retired_ids, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
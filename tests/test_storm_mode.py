@@ -0,0 +1,44 @@
+import json
+import os
+import tempfile
+import unittest
+from typing import Any, Dict, List
+
+from src.watcher.main import NodeHealthWatcher
+
+
+def events(output: List[str], name: str) -> List[Dict[str, Any]]:
+    records = [json.loads(line.split(":", 2)[2]) for line in output]
+    return [record for record in records if record["event"] == name]
+
+
+class StormModeTests(unittest.TestCase):
+    def test_storm_mode_logs_deltas_and_summarizes_at_flush(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.monkeypatch.setenv("INCIDENT_LOG_PATH", os.path.join(tmpdir, "incidents.ndjson"))
+            self.monkeypatch.setenv("STORM_THRESHOLD", "3")
+            watcher = NodeHealthWatcher()
+            watcher.node_states = {f"n{index}": "True" for index in range(5)}
+
+            with self.assertLogs("node-health-watcher", level="INFO") as logs:
+                for index in range(5):
+                    watcher.apply_node_status(f"n{index}", "False")
+                watcher.flush_if_due(force=True)
+
+            transitions = events(logs.output, "node_transition_detected")
+            self.assertEqual(len(transitions), 5)
+            self.assertEqual(transitions[1]["pending_down"], ["n0", "n1"])
+            self.assertNotIn("pending_down", transitions[2])
+            self.assertEqual(transitions[4]["pending_down_count"], 5)
+            self.assertEqual(len(events(logs.output, "storm_mode_entered")), 1)
+
+            summary = events(logs.output, "storm_mode_summary")
+            self.assertEqual(len(summary), 1)
+            self.assertEqual(summary[0]["transitions"], 5)
+            self.assertEqual(summary[0]["nodes_down"], 5)
+            self.assertFalse(watcher.storm_active)
+            self.assertEqual(watcher.window_transitions, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
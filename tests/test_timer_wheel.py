@@ -0,0 +1,99 @@
+import os
+import tempfile
+import time
+import unittest
+from typing import Hashable, List
+
+from src.watcher.main import NodeHealthWatcher
+from src.watcher.timers import TimerWheel
+
+
+class TimerWheelTests(unittest.TestCase):
+    def fire(self, wheel: TimerWheel, seconds: float) -> None:
+        for callback, key in wheel.advance(wheel.started_at + seconds):
+            callback(key)
+
+    def test_fires_in_order_across_rotations(self) -> None:
+        wheel = TimerWheel(tick_seconds=1.0, slots=4)
+        fired: List[Hashable] = []
+        for key, delay in (("c", 9), ("a", 2), ("b", 5)):
+            wheel.schedule(key, delay, fired.append)
+
+        self.fire(wheel, 4)
+        self.assertEqual(fired, ["a"])
+        self.fire(wheel, 10)
+        self.assertEqual(fired, ["a", "b", "c"])
+        self.assertEqual(len(wheel), 0)
+
+    def test_reschedule_replaces_and_cancel_removes(self) -> None:
+        wheel = TimerWheel(tick_seconds=1.0, slots=8)
+        fired: List[Hashable] = []
+        wheel.schedule("node", 2, lambda key: fired.append("first"))
+        wheel.schedule("node", 6, lambda key: fired.append("second"))
+        wheel.schedule("other", 3, fired.append)
+        self.assertTrue(wheel.cancel("other"))
+        self.assertFalse(wheel.cancel("other"))
+
+        self.fire(wheel, 5)
+        self.assertEqual(fired, [])
+        self.fire(wheel, 7)
+        self.assertEqual(fired, ["second"])
+
+    def test_overdue_timer_fires_on_next_tick(self) -> None:
+        wheel = TimerWheel(tick_seconds=1.0, slots=8)
+        wheel.advance(wheel.started_at + 10)
+        wheel.schedule("late", -30, lambda key: None)
+        self.assertEqual([key for _, key in wheel.advance(wheel.started_at + 11)], ["late"])
+
+    def test_holds_many_timers_and_fires_each_once(self) -> None:
+        wheel = TimerWheel(tick_seconds=1.0, slots=64)
+        fired: List[Hashable] = []
+        for index in range(100_000):
+            wheel.schedule(index, 1 + index % 600, fired.append)
+        for index in range(0, 100_000, 2):
+            wheel.cancel(index)
+        self.assertEqual(len(wheel), 50_000)
+
+        self.fire(wheel, 700)
+        self.assertEqual(len(fired), 50_000)
+        self.assertEqual(len(set(fired)), 50_000)
+        self.assertTrue(all(key % 2 for key in fired))
+
+    def test_background_thread_runs_callbacks(self) -> None:
+        wheel = TimerWheel(tick_seconds=0.01, slots=16)
+        fired: List[float] = []
+        wheel.start()
+        try:
+            wheel.schedule("soon", 0.03, lambda key: fired.append(time.monotonic()))
+            deadline = time.monotonic() + 2
+            while not fired and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            wheel.stop()
+        self.assertEqual(len(fired), 1)
+
+
+class NodeDownEscalationTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.monkeypatch.setenv("INCIDENT_LOG_PATH", os.path.join(self.tmpdir.name, "incidents.ndjson"))
+        self.monkeypatch.setenv("NODE_DOWN_ESCALATION_SECONDS", "300")
+        self.watcher = NodeHealthWatcher()
+        self.watcher.node_states = {"a": "True", "b": "True"}
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def test_escalates_only_nodes_still_down(self) -> None:
+        self.watcher.apply_node_status("a", "False")
+        self.watcher.apply_node_status("b", "False")
+        self.watcher.apply_node_status("b", "True")
+        self.assertEqual(len(self.watcher.timer_wheel), 1)
+
+        for callback, key in self.watcher.timer_wheel.advance(time.monotonic() + 301):
+            callback(key)
+        self.assertEqual(self.watcher.metrics.escalations.value(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
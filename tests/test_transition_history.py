@@ -0,0 +1,85 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src.watcher.history import ENTRY_BYTES, TransitionHistory
+from src.watcher.main import NodeHealthWatcher
+from src.watcher.state import NodeStateStore
+
+
+class TransitionHistoryTests(unittest.TestCase):
+    def test_ring_keeps_last_depth_entries_oldest_first(self) -> None:
+        history = TransitionHistory(depth=3)
+        for n in range(5):
+            history.append(2, float(n), 1, 0, 100 + n)
+        self.assertEqual([entry[0] for entry in history.entries(2)], [2.0, 3.0, 4.0])
+        self.assertEqual(history.entries(2)[-1], (4.0, 1, 0, 104))
+        self.assertEqual(history.entries(0), [])
+        self.assertEqual(history.entries(9), [])
+
+    def test_memory_is_preallocated_and_bounded(self) -> None:
+        history = TransitionHistory(depth=8, max_nodes=10000)
+        before = history.nbytes
+        self.assertEqual(before, 10000 * (8 * ENTRY_BYTES + 8))
+        for n in range(30000):
+            history.append(n, float(n), 0, 1)
+        self.assertEqual(history.nbytes, before)
+        self.assertEqual(len(history), 10000)
+
+    def test_least_recently_used_node_gives_up_its_ring(self) -> None:
+        history = TransitionHistory(depth=2, max_nodes=2)
+        history.append(0, 1.0, 1, 0)
+        history.append(1, 2.0, 1, 0)
+        history.append(0, 3.0, 0, 1)
+        history.append(7, 4.0, 1, 0)
+        self.assertEqual(history.entries(1), [])
+        self.assertEqual([entry[0] for entry in history.entries(0)], [1.0, 3.0])
+        self.assertEqual(history.entries(7), [(4.0, 1, 0, 0)])
+
+        history.clear(0)
+        history.append(9, 5.0, 1, 0)
+        self.assertEqual(history.entries(7), [(4.0, 1, 0, 0)])
+        self.assertEqual(history.entries(9), [(5.0, 1, 0, 0)])
+
+    def test_store_drops_history_when_id_is_freed(self) -> None:
+        store = NodeStateStore(history_depth=4)
+        store.set("n1", "True")
+        store.set("n1", "False")
+        store.record_transition("n1", "True", "False", 10.0, "42")
+        self.assertEqual(
+            store.transition_history("n1"), [{"at": 10.0, "from": "True", "to": "False", "resource_version": "42"}]
+        )
+
+        store.remove("n1")
+        store.set("n2", "True")
+        self.assertEqual(store.ids["n2"], 0)
+        self.assertEqual(store.transition_history("n2"), [])
+
+
+class PayloadHistoryTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.monkeypatch.setenv("INCIDENT_LOG_PATH", os.path.join(self.tmpdir.name, "incidents.ndjson"))
+        self.monkeypatch.setenv("TRANSITION_HISTORY_DEPTH", "2")
+        self.watcher = NodeHealthWatcher()
+        self.watcher.node_states = {"n1": "True", "n2": "True"}
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def test_payload_carries_history_of_reported_nodes(self) -> None:
+        for rv, status in enumerate(["False", "Unknown", "True", "False"], start=10):
+            self.watcher.apply_node_status("n1", status, resource_version=str(rv))
+
+        history = json.loads(self.watcher.build_payload()["node_history"])
+        self.assertEqual(list(history), ["n1"])
+        self.assertEqual(
+            [(entry["from"], entry["to"], entry["resource_version"]) for entry in history["n1"]],
+            [("Unknown", "True", "12"), ("True", "False", "13")],
+        )
+        self.assertTrue(history["n1"][0]["at"].endswith("Z"))
+
+
+if __name__ == "__main__":
+    unittest.main()
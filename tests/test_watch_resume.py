@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from kubernetes.client import V1Node, V1NodeCondition, V1NodeStatus, V1ObjectMeta
+from kubernetes.client.rest import ApiException
+
+from fakes import FakeCoreV1Api, node_page
+from src.watcher.main import NodeHealthWatcher
+
+
+def make_node(name: str, ready: str, resource_version: str = "1") -> V1Node:
+    return V1Node(
+        metadata=V1ObjectMeta(name=name, resource_version=resource_version),
+        status=V1NodeStatus(conditions=[V1NodeCondition(type="Ready", status=ready)]),
+    )
+
+
+class WatchResumeTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.monkeypatch.setenv("INCIDENT_LOG_PATH", os.path.join(self.tmpdir.name, "incidents.ndjson"))
+        self.watcher = NodeHealthWatcher()
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def test_watch_resumes_from_last_seen_resource_version(self) -> None:
+        self.assertNotIn("resource_version", self.watcher.watch_kwargs())
+
+        self.watcher.handle_watch_event({"type": "MODIFIED", "object": make_node("n1", "True", "41")})
+        self.assertEqual(self.watcher.watch_kwargs()["resource_version"], "41")
+        self.assertTrue(self.watcher.watch_kwargs()["allow_watch_bookmarks"])
+
+        self.watcher.handle_watch_event(
+            {"type": "BOOKMARK", "object": {}, "raw_object": {"kind": "Node", "metadata": {"resourceVersion": "57"}}}
+        )
+        self.assertEqual(self.watcher.resource_version, "57")
+        self.assertEqual(self.watcher.node_states, {"n1": "True"})
+
+    def test_only_failed_streams_count_as_reconnects(self) -> None:
+        api = FakeCoreV1Api([node_page({}, "90")])
+        outcomes = [None, None, ApiException(status=410), ApiException(status=500), OSError("reset")]
+        with mock.patch.object(self.watcher, "consume_watch", side_effect=outcomes), mock.patch("time.sleep"):
+            for _ in outcomes:
+                self.watcher.watch_once(api)  # type: ignore[arg-type]
+        self.assertEqual(self.watcher.metrics.watch_reconnects.value(), 3)
+        self.assertEqual(self.watcher.resource_version, "90")
+
+    def test_resync_detects_gap_transitions_and_deletions(self) -> None:
+        self.watcher.node_states = {"n1": "True", "n2": "True", "gone": "True"}
+        api = FakeCoreV1Api([node_page({"n1": "False"}, "90", "page-2"), node_page({"n2": "True"}, "90")])
+
+        self.watcher.resync_node_state(api)
+
+        self.assertEqual(api.calls[0], {"limit": self.watcher.node_list_page_size, "_preload_content": False})
+        self.assertEqual(api.calls[1]["_continue"], "page-2")
+        self.assertEqual(self.watcher.resource_version, "90")
+        self.assertEqual(self.watcher.node_states, {"n1": "False", "n2": "True"})
+        self.assertEqual(self.watcher.pending_down, {"n1"})
+
+    def test_prime_loads_pages_and_records_list_resource_version(self) -> None:
+        self.monkeypatch.setenv("NODE_LIST_PAGE_SIZE", "2")
+        watcher = NodeHealthWatcher()
+        api = FakeCoreV1Api(
+            [
+                node_page({"n1": "True", "n2": "False"}, "120", "page-2"),
+                node_page({"n3": "Unknown"}, "120"),
+            ]
+        )
+
+        watcher.prime_node_state(api)
+
+        self.assertEqual([call["limit"] for call in api.calls], [2, 2])
+        self.assertEqual(watcher.node_states, {"n1": "True", "n2": "False", "n3": "Unknown"})
+        self.assertEqual(watcher.pending_down, set())
+        self.assertEqual(watcher.watch_kwargs()["resource_version"], "120")
+
+
+if __name__ == "__main__":
+    unittest.main()